@@ -27,6 +27,13 @@ var _screen_height: float = 648.0
 # ── Shader fondu bords pour les vignettes ──
 var _vignette_shader: Shader
 
+# ── Atlas des vignettes (généré par tools/pack_atlas.py) ──
+const ATLAS_INDEX_PATH := "res://data/atlas/timeline_atlas.json"
+const ATLAS_INDEX_VERSION := 1
+var _atlas_events: Dictionary = {}
+var _atlas_page_paths: Array = []
+var _atlas_pages: Dictionary = {}
+
 # Couleurs
 var _sign_bg := Color(0.15, 0.22, 0.35, 0.92)
 var _sign_border := Color(0.85, 0.85, 0.85, 0.8)
@@ -50,6 +57,7 @@ func _ready() -> void:
 	_screen_width = get_viewport_rect().size.x
 	_screen_height = get_viewport_rect().size.y
 	_create_vignette_shader()
+	_load_atlas_index()
 	_create_placeholders()
 	_update_loading()
 
@@ -74,10 +82,13 @@ func _create_vignette_shader() -> void:
 	_vignette_shader = Shader.new()
 	_vignette_shader.code = """shader_type canvas_item;
 uniform float fade_size : hint_range(0.0, 0.5) = 0.15;
+// Zone de la vignette dans la texture (x, y, w, h normalisés) : toute la texture hors atlas
+uniform vec4 region = vec4(0.0, 0.0, 1.0, 1.0);
 void fragment() {
 	vec4 col = texture(TEXTURE, UV);
-	float fx = smoothstep(0.0, fade_size, UV.x) * smoothstep(0.0, fade_size, 1.0 - UV.x);
-	float fy = smoothstep(0.0, fade_size, UV.y) * smoothstep(0.0, fade_size, 1.0 - UV.y);
+	vec2 uv = (UV - region.xy) / region.zw;
+	float fx = smoothstep(0.0, fade_size, uv.x) * smoothstep(0.0, fade_size, 1.0 - uv.x);
+	float fy = smoothstep(0.0, fade_size, uv.y) * smoothstep(0.0, fade_size, 1.0 - uv.y);
 	col.a *= fx * fy;
 	COLOR = col;
 }
@@ -159,6 +170,51 @@ func _unload_marker(index: int) -> void:
 	_unloaded[index] = true
 
 
+# ══════════════════════════════════════════════════════════════
+#  ATLAS DES VIGNETTES
+#  Quelques pages chargées une fois et gardées en mémoire, au lieu
+#  d'une texture par marqueur chargée / libérée au défilement
+# ══════════════════════════════════════════════════════════════
+
+func _load_atlas_index() -> void:
+	if not FileAccess.file_exists(ATLAS_INDEX_PATH):
+		return
+
+	var json := JSON.new()
+	if json.parse(FileAccess.get_file_as_string(ATLAS_INDEX_PATH)) != OK:
+		push_warning("Index d'atlas illisible : " + ATLAS_INDEX_PATH)
+		return
+
+	var data: Dictionary = json.data
+	if data.get("version", 0) != ATLAS_INDEX_VERSION:
+		return
+	_atlas_page_paths = data.get("pages", [])
+	_atlas_events = data.get("events", {})
+
+
+## Vignette de l'événement découpée dans sa page d'atlas, ou null si l'atlas
+## ne la contient pas (ou plus : photo changée depuis la génération)
+func _get_atlas_texture(index: int, photo_path: String) -> AtlasTexture:
+	var entry: Dictionary = _atlas_events.get(str(index), {})
+	if entry.is_empty() or entry.get("photo", "") != photo_path:
+		return null
+
+	var page_index: int = entry["page"]
+	if page_index < 0 or page_index >= _atlas_page_paths.size():
+		return null
+	if not _atlas_pages.has(page_index):
+		_atlas_pages[page_index] = load(_atlas_page_paths[page_index]) as Texture2D
+	var page: Texture2D = _atlas_pages[page_index]
+	if not page:
+		return null
+
+	var rect: Array = entry["rect"]
+	var atlas := AtlasTexture.new()
+	atlas.atlas = page
+	atlas.region = Rect2(rect[0], rect[1], rect[2], rect[3])
+	return atlas
+
+
 # ══════════════════════════════════════════════════════════════
 #  VIGNETTE SOUVENIR
 #  Première photo de l'événement (__1.jpg / __1.png),
@@ -166,32 +222,44 @@ func _unload_marker(index: int) -> void:
 #  dans les 2/3 supérieurs, derrière l'avion (z_index -5)
 # ══════════════════════════════════════════════════════════════
 
-func _add_vignette(parent: Node2D, ev: Dictionary, _index: int, viewport_h: float) -> void:
+func _add_vignette(parent: Node2D, ev: Dictionary, index: int, viewport_h: float) -> void:
 	var photos: Array = ev.get("photos", [])
 	if photos.is_empty():
 		return
 
-	var photo_path: String = photos[0]
-	if not ResourceLoader.exists(photo_path):
-		return
+	# L'atlas contient la vignette déjà à sa taille d'affichage
+	var atlas := _get_atlas_texture(index, photos[0])
+	var texture: Texture2D = atlas
+	var final_scale: float = 1.0
 
-	var texture := load(photo_path) as Texture2D
-	if not texture:
-		return
+	if not atlas:
+		var photo_path: String = photos[0]
+		# Vignette réduite générée par tools/fix_photos.py, si elle existe
+		var thumb_path := photo_path.replace("/photos/popup/", "/photos/thumbs/")
+		if thumb_path != photo_path and ResourceLoader.exists(thumb_path):
+			photo_path = thumb_path
+		if not ResourceLoader.exists(photo_path):
+			return
 
-	var tex_w: float = texture.get_width()
-	var tex_h: float = texture.get_height()
+		texture = load(photo_path) as Texture2D
+		if not texture:
+			return
+
+		var src_w: float = texture.get_width()
+		var src_h: float = texture.get_height()
 
-	# Calcul 1 : contrainte hauteur max 300
-	var scale_by_h: float = minf(300.0 / tex_h, 0.5)
-	var area_h: float = (tex_w * scale_by_h) * (tex_h * scale_by_h)
+		# Calcul 1 : contrainte hauteur max 300
+		var scale_by_h: float = minf(300.0 / src_h, 0.5)
+		var area_h: float = (src_w * scale_by_h) * (src_h * scale_by_h)
 
-	# Calcul 2 : contrainte largeur max 400
-	var scale_by_w: float = minf(400.0 / tex_w, 0.5)
-	var area_w: float = (tex_w * scale_by_w) * (tex_h * scale_by_w)
+		# Calcul 2 : contrainte largeur max 400
+		var scale_by_w: float = minf(400.0 / src_w, 0.5)
+		var area_w: float = (src_w * scale_by_w) * (src_h * scale_by_w)
 
-	# Choisir le scale qui donne la plus grande aire affichée
-	var final_scale: float = scale_by_h if area_h >= area_w else scale_by_w
+		# Choisir le scale qui donne la plus grande aire affichée
+		final_scale = scale_by_h if area_h >= area_w else scale_by_w
+
+	var tex_h: float = texture.get_height()
 
 	var sprite := Sprite2D.new()
 	sprite.texture = texture
@@ -213,6 +281,11 @@ func _add_vignette(parent: Node2D, ev: Dictionary, _index: int, viewport_h: floa
 	var mat := ShaderMaterial.new()
 	mat.shader = _vignette_shader
 	mat.set_shader_parameter("fade_size", 0.15)
+	if atlas:
+		var page_size := atlas.atlas.get_size()
+		mat.set_shader_parameter("region", Vector4(
+			atlas.region.position.x / page_size.x, atlas.region.position.y / page_size.y,
+			atlas.region.size.x / page_size.x, atlas.region.size.y / page_size.y))
 	sprite.material = mat
 
 	parent.add_child(sprite)
@@ -0,0 +1,53 @@
+import argparse
+import hashlib
+import os
+import sys
+
+import pytest
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools")
+sys.path.insert(0, TOOLS_DIR)
+
+import bench_make_archi  # noqa: E402
+
+REAL_TIMELINE = os.path.join(TOOLS_DIR, "..", "data", "timeline_data.json")
+
+
+def digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def test_photo_pass_leaves_real_timeline_untouched(monkeypatch):
+    pytest.importorskip("PIL")
+    pytest.importorskip("gdtoolkit")
+    before = digest(REAL_TIMELINE)
+
+    calls = []
+    run_script = bench_make_archi.run_script
+
+    def recording_run_script(script, cwd, *script_args):
+        calls.append((script, cwd, script_args))
+        run_script(script, cwd, *script_args)
+
+    monkeypatch.setattr(bench_make_archi, "run_script", recording_run_script)
+    args = argparse.Namespace(jobs=1, repeat=1, skip_photos=False)
+    result = bench_make_archi.bench_size("tiny", (2, 2, 2, 1, 5, 2), args)
+
+    assert result["photos"] == 2
+    assert "photo_pipeline" in result["seconds"]
+    assert digest(REAL_TIMELINE) == before
+
+    photo_calls = [c for c in calls if c[0] == bench_make_archi.PHOTO_PIPELINE]
+    assert photo_calls
+    for _, cwd, script_args in photo_calls:
+        timeline = script_args[script_args.index("--timeline") + 1]
+        assert os.path.commonpath([cwd, timeline]) == cwd
+
+
+def test_bench_tokens_runs_on_small_input(capsys):
+    pytest.importorskip("gdtoolkit")
+    bench_make_archi.bench_tokens(argparse.Namespace(functions=3, depth=2, repeat=1))
+    out = capsys.readouterr().out
+    assert "Function extraction on 3 functions" in out
+    assert "iterative (current)" in out
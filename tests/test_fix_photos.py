@@ -0,0 +1,82 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("PIL")
+from PIL import Image  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+
+import fix_photos  # noqa: E402
+
+
+def save_with_orientation(path, fmt, orientation):
+    exif = Image.Exif()
+    exif[274] = orientation
+    Image.new("RGB", (64, 32), (200, 40, 40)).save(path, fmt, exif=exif)
+
+
+@pytest.mark.parametrize("orientation", [1, 3, 6, 8])
+def test_read_orientation_from_jpeg_header(tmp_path, orientation):
+    path = str(tmp_path / "photo.jpg")
+    save_with_orientation(path, "JPEG", orientation)
+    assert fix_photos.read_orientation(path) == orientation
+
+
+@pytest.mark.parametrize("orientation", [3, 6])
+def test_read_orientation_from_png_exif_chunk(tmp_path, orientation):
+    path = str(tmp_path / "photo.png")
+    save_with_orientation(path, "PNG", orientation)
+    assert fix_photos.read_orientation(path) == orientation
+
+
+def test_read_orientation_without_exif(tmp_path):
+    for name, fmt in (("plain.jpg", "JPEG"), ("plain.png", "PNG")):
+        path = str(tmp_path / name)
+        Image.new("RGB", (8, 8)).save(path, fmt)
+        assert fix_photos.read_orientation(path) == 1
+
+
+def test_read_orientation_falls_back_to_pillow_on_unexpected_segments(tmp_path):
+    path = tmp_path / "odd.jpg"
+    save_with_orientation(str(path), "JPEG", 6)
+    data = path.read_bytes()
+    app0_end = 4 + int.from_bytes(data[4:6], "big")  # SOI, then APP0 marker + length
+    path.write_bytes(data[:app0_end] + b"\x00" + data[app0_end:])  # stray byte before APP1
+    assert fix_photos.read_orientation(str(path)) == 6
+
+
+def test_process_photo_reports_missing_file_instead_of_raising(tmp_path):
+    status, entry, size, pixels, derived = fix_photos.process_photo(str(tmp_path / "gone.jpg"), {})
+    assert status.startswith("error: ")
+    assert entry["result"] == status
+    assert (size, pixels, derived) == (0, 0, 0)
+
+
+def test_is_up_to_date_needs_same_stat_and_derivatives(tmp_path):
+    path = tmp_path / "photo.jpg"
+    Image.new("RGB", (8, 8)).save(str(path), "JPEG")
+    st = os.stat(path)
+    entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "result": "ok"}
+    assert fix_photos.is_up_to_date(entry, str(path), {})
+    assert not fix_photos.is_up_to_date(dict(entry, size=st.st_size + 1), str(path), {})
+    assert not fix_photos.is_up_to_date(dict(entry, result="error: boom"), str(path), {})
+    assert not fix_photos.is_up_to_date(entry, str(path), {"thumbs": (4, 4)})
+    assert not fix_photos.is_up_to_date(entry, str(tmp_path / "gone.jpg"), {})
+
+
+def test_rewrite_timeline_keeps_formatting_and_is_idempotent(tmp_path):
+    (tmp_path / "project.godot").write_text("", encoding="utf-8")
+    photos = tmp_path / "data" / "photos"
+    (photos / "popup").mkdir(parents=True)
+    (photos / "popup" / "a.jpg").write_bytes(b"")
+    timeline = tmp_path / "data" / "timeline_data.json"
+    timeline.write_text('{\n\t"photos": ["res://data/photos/a.jpg",\n    "res://data/photos/b.jpg"]\n}\n',
+                        encoding="utf-8")
+
+    assert fix_photos.rewrite_timeline(str(timeline), str(photos), "popup") == 1
+    expected = '{\n\t"photos": ["res://data/photos/popup/a.jpg",\n    "res://data/photos/b.jpg"]\n}\n'
+    assert timeline.read_text(encoding="utf-8") == expected
+    assert fix_photos.rewrite_timeline(str(timeline), str(photos), "popup") == 0
+    assert timeline.read_text(encoding="utf-8") == expected
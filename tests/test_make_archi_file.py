@@ -0,0 +1,183 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+
+import make_archi_file  # noqa: E402
+
+ENDS_IN_PASS = """extends Node
+
+
+func _ready() -> void:
+	var speed := 4
+	if speed > 2:
+		speed += 1
+	pass
+
+
+func _process(_delta: float) -> void:
+	pass
+
+
+func stop():
+	return
+"""
+
+
+@pytest.mark.parametrize("outline_only", [False, True])
+def test_function_span_includes_trailing_pass_and_return(outline_only):
+    if not outline_only:
+        pytest.importorskip("gdtoolkit")
+    analyzer = make_archi_file.GDScriptAnalyzer("spans.gd", ENDS_IN_PASS, outline_only=outline_only)
+    assert analyzer.error is None
+    spans = {fn["name"]: (fn["line"], fn["end_line"]) for fn in analyzer.functions}
+    assert spans == {"_ready": (4, 8), "_process": (11, 12), "stop": (15, 16)}
+
+
+def test_symbol_database_refuses_non_sqlite_file(tmp_path):
+    path = tmp_path / "index.json"
+    path.write_text('{"version": 2, "files": {}}\n' * 64, encoding="utf-8")
+    with pytest.raises(ValueError, match="not a usable SQLite database"):
+        make_archi_file.SymbolDatabase(str(path))
+    assert path.read_text(encoding="utf-8").startswith('{"version": 2')
+
+
+# ── Analysis cache ──
+
+def test_analyzer_key_separates_outline_and_full_mode():
+    full = make_archi_file.analyzer_key(False)
+    outline = make_archi_file.analyzer_key(True)
+    assert full != outline
+    assert full.startswith(f"{make_archi_file.CACHE_FORMAT_VERSION}/")
+
+
+def test_cache_reuses_entry_only_for_same_content_hash(tmp_path):
+    cache = make_archi_file.AnalysisCache(str(tmp_path))
+    cache.put("a.gd", "hash-1", {"functions": []})
+    cache.save()
+
+    reloaded = make_archi_file.AnalysisCache(str(tmp_path))
+    assert reloaded.get("a.gd", "hash-1") == {"functions": []}
+    assert reloaded.get("a.gd", "hash-2") is None
+    assert reloaded.get("a.gd", None) is None
+    assert (reloaded.hits, reloaded.misses) == (1, 2)
+
+
+def test_cache_is_dropped_when_format_version_changes(tmp_path, monkeypatch):
+    cache = make_archi_file.AnalysisCache(str(tmp_path))
+    cache.put("a.gd", "hash-1", {"functions": []})
+    cache.save()
+
+    monkeypatch.setattr(make_archi_file, "CACHE_FORMAT_VERSION", make_archi_file.CACHE_FORMAT_VERSION + 1)
+    assert make_archi_file.AnalysisCache(str(tmp_path)).get("a.gd", "hash-1") is None
+
+
+def test_cache_modes_do_not_share_entries(tmp_path):
+    cache = make_archi_file.AnalysisCache(str(tmp_path))
+    cache.put("a.gd", "hash-1", {"functions": []})
+    cache.save()
+    assert make_archi_file.AnalysisCache(str(tmp_path), outline_only=True).get("a.gd", "hash-1") is None
+
+
+def test_cache_prune_evicts_deleted_files(tmp_path):
+    cache = make_archi_file.AnalysisCache(str(tmp_path))
+    cache.put("a.gd", "hash-1", {})
+    cache.put("b.gd", "hash-2", {})
+    cache.prune({"b.gd"})
+    assert set(cache.entries) == {"b.gd"}
+
+
+# ── Index ──
+
+def write_project(root):
+    (root / "project.godot").write_text('[application]\nconfig/name="Tiny"\n', encoding="utf-8")
+    (root / "base.gd").write_text('class_name Base\nextends Node\n\nsignal hit(amount: int)\n', encoding="utf-8")
+    (root / "enemy.gd").write_text("extends Base\n\nfunc attack():\n\thit.emit(1)\n", encoding="utf-8")
+    (root / "boss.gd").write_text('extends "res://enemy.gd"\n', encoding="utf-8")
+    (root / "other.gd").write_text("extends Node\n", encoding="utf-8")
+
+
+def scan_project(root):
+    generator = make_archi_file.ArchitectureGenerator(str(root), outline_only=True)
+    generator.scan()
+    return generator
+
+
+@pytest.mark.parametrize("filename", ["index.json", "index.msgpack"])
+def test_index_round_trip(tmp_path, filename):
+    if filename.endswith(".msgpack"):
+        pytest.importorskip("msgpack")
+    project = tmp_path / "project"
+    project.mkdir()
+    write_project(project)
+    index = scan_project(project).build_index()
+
+    path = str(tmp_path / filename)
+    make_archi_file.write_index(index, path)
+    loaded = make_archi_file.load_index(path)
+    assert loaded == index
+    assert loaded["class_names"] == {"Base": "base.gd"}
+    assert set(loaded["scripts"]) == {"base.gd", "enemy.gd", "boss.gd", "other.gd"}
+
+
+def test_load_index_rejects_other_versions_and_formats(tmp_path):
+    path = tmp_path / "index.json"
+    path.write_text(json.dumps({"format": make_archi_file.INDEX_FORMAT,
+                                "version": make_archi_file.INDEX_FORMAT_VERSION - 1}), encoding="utf-8")
+    with pytest.raises(ValueError, match="index version"):
+        make_archi_file.load_index(str(path))
+
+    path.write_text(json.dumps({"format": "something-else", "version": 1}), encoding="utf-8")
+    with pytest.raises(ValueError, match="is not a"):
+        make_archi_file.load_index(str(path))
+
+
+# ── Impact analysis ──
+
+def test_transitive_dependents_follows_chains_once():
+    dependents = {
+        "base.gd": [("extends", "enemy.gd"), ("preload", "ui.gd")],
+        "enemy.gd": [("extends", "boss.gd"), ("script", "enemy.tscn")],
+        "boss.gd": [("preload", "base.gd")],  # cycle back to the change set
+        "enemy.tscn": [("instance", "level.tscn")],
+    }
+    affected = make_archi_file.transitive_dependents(dependents, ["base.gd"])
+    assert affected == {
+        "enemy.gd": ("extends", "base.gd", 1),
+        "ui.gd": ("preload", "base.gd", 1),
+        "boss.gd": ("extends", "enemy.gd", 2),
+        "enemy.tscn": ("script", "enemy.gd", 2),
+        "level.tscn": ("instance", "enemy.tscn", 3),
+    }
+    assert make_archi_file.transitive_dependents(dependents, ["other.gd"]) == {}
+
+
+def test_impact_closure_from_scanned_project(tmp_path):
+    write_project(tmp_path)
+    xref = scan_project(tmp_path).xref
+    affected = make_archi_file.transitive_dependents(xref.dependents, ["base.gd"])
+    assert {path: depth for path, (_, _, depth) in affected.items()} == {"enemy.gd": 1, "boss.gd": 2}
+
+
+# ── Comment stripping ──
+
+def test_strip_comments_keeps_hash_inside_strings():
+    code = (
+        'var color := "#ff0000"  # red\n'
+        "# a whole-line comment\n"
+        "\n"
+        "var tag = '#tag' # trailing\n"
+        'var doc = """line one\n'
+        "\n"
+        '# not a comment"""\n'
+    )
+    assert make_archi_file.strip_comments(code) == (
+        'var color := "#ff0000"\n'
+        "var tag = '#tag'\n"
+        'var doc = """line one\n'
+        "\n"
+        '# not a comment"""'
+    )
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("PIL")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+
+import pack_atlas  # noqa: E402
+
+
+def assert_valid_placements(sizes, placements, page_size, padding):
+    rects = {}
+    for (width, height), (page, x, y) in zip(sizes, placements):
+        assert 0 <= x and x + width <= page_size
+        assert 0 <= y and y + height <= page_size
+        rects.setdefault(page, []).append((x, y, width + padding, height + padding))
+    for page_rects in rects.values():
+        for i, (ax, ay, aw, ah) in enumerate(page_rects):
+            for bx, by, bw, bh in page_rects[i + 1:]:
+                assert ax + aw <= bx or bx + bw <= ax or ay + ah <= by or by + bh <= ay
+
+
+def test_pack_fills_pages_without_overlap():
+    sizes = [(400, 300), (225, 300), (1200, 300), (400, 100), (150, 150)] * 12
+    placements = pack_atlas.pack(sizes, 2048, 2)
+    assert len(placements) == len(sizes)
+    assert_valid_placements(sizes, placements, 2048, 2)
+    used = sum(w * h for w, h in sizes)
+    pages = max(page for page, _, _ in placements) + 1
+    assert pages == -(-used // (2048 * 2048))  # no more pages than the area strictly needs
+
+
+def test_pack_exact_fit_uses_one_page():
+    sizes = [(50, 50)] * 4
+    placements = pack_atlas.pack(sizes, 100, 0)
+    assert {page for page, _, _ in placements} == {0}
+    assert sorted((x, y) for _, x, y in placements) == [(0, 0), (0, 50), (50, 0), (50, 50)]
+
+
+def test_pack_rejects_vignette_larger_than_page():
+    with pytest.raises(ValueError):
+        pack_atlas.pack([(300, 10)], 256, 2)
+
+
+def test_display_size_matches_timeline_rules():
+    assert pack_atlas.display_size(800, 600) == (400, 300)  # capped at 50 %
+    assert pack_atlas.display_size(4000, 1000) == (1200, 300)  # height rule gives the larger area
+    assert pack_atlas.display_size(200, 100) == (100, 50)
@@ -0,0 +1,557 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for make_archi_file.py
+======================================
+
+Usage:
+    python tools/bench_make_archi.py project-config
+    python tools/bench_make_archi.py project-config --lines 200000 --repeat 5
+    python tools/bench_make_archi.py tokens
+    python tools/bench_make_archi.py tokens --functions 400 --depth 40
+    python tools/bench_make_archi.py outline
+    python tools/bench_make_archi.py startup --repeat 10
+    python tools/bench_make_archi.py suite --sizes small,medium
+    python tools/bench_make_archi.py compare .godot/archi_bench/bench-abc1234.json .godot/archi_bench/bench-def5678.json
+
+The suite generates synthetic Godot projects and times ArchitectureGenerator.scan()
+and generate(), tools/validate_json.py and the photo pipeline on each size. Results
+are stored as JSON (one file per commit) so scaling curves can be compared.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import contextlib
+import subprocess
+import tempfile
+from datetime import datetime
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import make_archi_file  # noqa: E402
+
+
+def write_synthetic_project_godot(path: str, target_lines: int):
+    """Write a project.godot with many autoloads, input actions and layer names."""
+    lines = [
+        "; Engine configuration file.",
+        "",
+        "config_version=5",
+        "",
+        "[application]",
+        "",
+        'config/name="Synthetic Benchmark"',
+        'run/main_scene="res://scenes/main.tscn"',
+        'config/features=PackedStringArray("4.5", "Mobile")',
+        "",
+        "[autoload]",
+        "",
+    ]
+    budget = max(target_lines - len(lines), 0)
+
+    # Roughly 5% autoloads, 70% input actions (multi-line values), rest layer names
+    for i in range(budget // 20):
+        lines.append(f'Singleton{i}="*res://autoload/singleton_{i}.gd"')
+
+    lines += ["", "[input]", ""]
+    action = 0
+    while len(lines) < target_lines * 0.75:
+        lines.append(f"action_{action}={{")
+        lines.append('"deadzone": 0.5,')
+        lines.append('"events": [Object(InputEventKey,"resource_local_to_scene":false,'
+                     f'"keycode":0,"physical_keycode":{4194300 + action % 100},"script":null)')
+        lines.append(', Object(InputEventJoypadButton,"button_index":0,"pressed":false,"script":null)')
+        lines.append("]")
+        lines.append("}")
+        action += 1
+
+    lines += ["", "[layer_names]", ""]
+    layer = 0
+    while len(lines) < target_lines - 4:
+        lines.append(f'2d_physics/layer_{layer}="Layer {layer}"')
+        layer += 1
+
+    lines += ["", "[rendering]", "", 'renderer/rendering_method="mobile"']
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return len(lines)
+
+
+def bench_project_config(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        line_count = write_synthetic_project_godot(os.path.join(tmp, "project.godot"), args.lines)
+        size = os.path.getsize(os.path.join(tmp, "project.godot"))
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            cfg = make_archi_file.ProjectConfigParser(tmp)
+            timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(f"ProjectConfigParser on {line_count:,} lines ({size / 1024:.0f} KiB)")
+    print(f"  sections: {len(cfg.sections)}, autoloads: {len(cfg.autoloads)}, "
+          f"input actions: {len(cfg.input_actions)}")
+    print(f"  best: {best * 1000:.1f} ms   mean: {sum(timings) / len(timings) * 1000:.1f} ms   "
+          f"({line_count / best / 1e6:.2f} M lines/s)")
+
+
+def write_synthetic_script(functions: int, depth: int) -> str:
+    """Return a GDScript with many typed functions, each nesting `depth` blocks deep."""
+    lines = ["extends Node", "class_name SyntheticBench", "", "signal ticked(delta: float)", ""]
+    for i in range(functions):
+        static = "static " if i % 10 == 0 else ""
+        lines.append(f"{static}func step_{i}(a: int, b: float = 1.5, c = null) -> Dictionary:")
+        lines.append("\tvar result := {}")
+        for level in range(depth):
+            indent = "\t" * (level + 1)
+            lines.append(f"{indent}if a > {level} and b < {level}.5:")
+            lines.append(f"{indent}\tresult[\"k{level}\"] = Vector2(a * {level}, b - {level}).normalized()")
+        lines.append("\treturn result")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def legacy_get_tokens(node) -> list:
+    """The previous recursive, list-concatenating token collector (reference only)."""
+    tokens = []
+    if isinstance(node, make_archi_file.Token):
+        tokens.append(str(node))
+    elif isinstance(node, make_archi_file.Tree):
+        for child in node.children:
+            tokens.extend(legacy_get_tokens(child))
+    return tokens
+
+
+def legacy_func_info(func_node) -> dict:
+    """Mimic the previous per-function cost: one walk per argument plus one over the whole body."""
+    info = {"name": "?", "args": []}
+    for child in func_node.children:
+        if isinstance(child, make_archi_file.Tree) and child.data == "func_header":
+            for hc in child.children:
+                if isinstance(hc, make_archi_file.Token) and hc.type == "NAME":
+                    info["name"] = str(hc)
+                elif isinstance(hc, make_archi_file.Tree) and hc.data == "func_args":
+                    info["args"] = [legacy_get_tokens(arg)[:2] for arg in hc.children]
+    info["approx_complexity"] = len(legacy_get_tokens(func_node))
+    return info
+
+
+def bench_tokens(args):
+    code = write_synthetic_script(args.functions, args.depth)
+    tree = make_archi_file.load_gdparser().parse(code)
+    analyzer = make_archi_file.GDScriptAnalyzer.__new__(make_archi_file.GDScriptAnalyzer)
+    analyzer.code, analyzer._block_ends = code, None  # spans are read from the source
+    func_nodes = [analyzer._unwrap_static(child) for child in tree.children
+                  if isinstance(child, make_archi_file.Tree) and child.data in ("func_def", "static_func_def")]
+
+    def best_of(fn):
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, 100_000))
+    try:
+        legacy = best_of(lambda: [legacy_func_info(node) for node in func_nodes])
+    finally:
+        sys.setrecursionlimit(limit)
+    current = best_of(lambda: [analyzer._extract_func_info(node) for node in func_nodes])
+
+    tokens = sum(1 for _ in analyzer._iter_tokens(tree))
+    print(f"Function extraction on {len(func_nodes)} functions, depth {args.depth} "
+          f"({code.count(chr(10)):,} lines, {tokens:,} tokens)")
+    print(f"  recursive (previous): {legacy * 1000:.1f} ms")
+    print(f"  iterative (current):  {current * 1000:.1f} ms   ({legacy / current:.2f}x)")
+
+
+def bench_outline(args):
+    code = write_synthetic_script(args.functions, args.depth)
+
+    def best_of(outline_only):
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            analyzer = make_archi_file.GDScriptAnalyzer("bench.gd", code, outline_only)
+            timings.append(time.perf_counter() - start)
+        return min(timings), analyzer
+
+    full, full_result = best_of(False)
+    outline, outline_result = best_of(True)
+    same = all(
+        [f["name"] for f in getattr(full_result, field)] == [f["name"] for f in getattr(outline_result, field)]
+        for field in ("functions", "static_functions", "signals")
+    )
+    print(f"GDScriptAnalyzer on {code.count(chr(10)):,} lines ({len(code) / 1024:.0f} KiB)")
+    print(f"  full gdtoolkit parse: {full * 1000:.1f} ms")
+    print(f"  outline scanner:      {outline * 1000:.1f} ms   ({full / outline:.1f}x)")
+    print(f"  same declarations:    {'yes' if same else 'NO'}")
+
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "make_archi_file.py")
+
+
+def parse_importtime(stderr: str) -> list[tuple[int, str]]:
+    """Return (cumulative_us, module) for the top-level imports of an -X importtime log."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # nested imports are indented
+            imports.append((int(cumulative), name.strip()))
+    return imports
+
+
+def bench_startup(args):
+    wall = []
+    imports = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", SCRIPT, "--help"],
+                              capture_output=True, text=True)
+        wall.append(time.perf_counter() - start)
+        imports = parse_importtime(proc.stderr)
+
+    # The GDScript parser is only loaded on the first full parse: time it on its own
+    load_code = ("import sys, time; sys.path.insert(0, %r); import make_archi_file; "
+                 "t = time.perf_counter(); make_archi_file.load_gdparser().parse(''); "
+                 "print(time.perf_counter() - t)" % os.path.dirname(SCRIPT))
+    parser_load = min(float(subprocess.run([sys.executable, "-c", load_code], capture_output=True,
+                                           text=True, check=True).stdout)
+                      for _ in range(args.repeat))
+
+    print(f"make_archi_file.py --help, best of {args.repeat}")
+    print(f"  wall time:   {min(wall) * 1000:.1f} ms   mean: {sum(wall) / len(wall) * 1000:.1f} ms")
+    print(f"  imports:     {sum(us for us, _ in imports) / 1000:.1f} ms (-X importtime, last run)")
+    for us, name in sorted(imports, reverse=True)[:args.top]:
+        print(f"    {us / 1000:7.1f} ms  {name}")
+    print(f"  gdtoolkit parser load (on first full parse): {parser_load * 1000:.1f} ms")
+
+
+# ─────────────────────────────────────────────
+# Benchmark suite on synthetic projects
+# ─────────────────────────────────────────────
+
+# name -> (scripts, functions per script, scenes, node tree depth, project.godot lines, photos)
+SUITE_SIZES = {
+    "small": (50, 10, 25, 4, 2_000, 8),
+    "medium": (250, 20, 120, 6, 10_000, 24),
+    "large": (1_000, 30, 500, 8, 50_000, 64),
+}
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+VALIDATE_JSON = os.path.join(TOOLS_DIR, "validate_json.py")
+PHOTO_PIPELINE = os.path.join(TOOLS_DIR, "fix_photos.py")
+
+
+def write_synthetic_module(index: int, functions: int, scripts: int) -> str:
+    """Return a realistic GDScript: class_name, signals, exports, onready vars and functions."""
+    lines = [
+        "extends Node2D",
+        f"class_name Synthetic{index}",
+        "",
+        f"signal changed_{index}(value: int)",
+        "signal finished",
+        "",
+        "enum Mode { IDLE, RUN, DONE }",
+        f"const NEXT := preload(\"res://scripts/module_{(index + 1) % scripts}.gd\")",
+        "",
+        "@export var speed: float = 120.0",
+        "@export var label := \"module\"",
+        "@onready var sprite: Sprite2D = $Body/Sprite",
+        "var _items: Array[int] = []",
+        "",
+    ]
+    for i in range(functions):
+        lines += [
+            f"func step_{i}(delta: float, count: int = {i}) -> int:",
+            "\tvar total := 0",
+            "\tfor n in range(count):",
+            "\t\tif n % 2 == 0:",
+            "\t\t\ttotal += int(speed * delta) + n",
+            "\t\telse:",
+            f"\t\t\tchanged_{index}.emit(total)",
+            "\treturn total",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def write_synthetic_scene(index: int, scripts: int, scenes: int, depth: int) -> str:
+    """Return a .tscn with a deep node tree, an attached script, a sub-scene instance and connections."""
+    child_scene = (index + 1) % scenes
+    lines = [
+        "[gd_scene load_steps=3 format=3]",
+        "",
+        f'[ext_resource type="Script" path="res://scripts/module_{index % scripts}.gd" id="1_script"]',
+        f'[ext_resource type="PackedScene" path="res://scenes/scene_{child_scene}.tscn" id="2_child"]',
+        "",
+        f'[node name="Scene{index}" type="Node2D"]',
+        'script = ExtResource("1_script")',
+        "",
+    ]
+    # Two branches per level down to `depth`, named so paths stay unique
+    parents = ["."]
+    for level in range(depth):
+        next_parents = []
+        for parent in parents:
+            for branch in range(2):
+                name = f"N{level}_{branch}"
+                lines += [f'[node name="{name}" type="Node2D" parent="{parent}"]',
+                          f"position = Vector2({level * 10}, {branch * 10})", ""]
+                next_parents.append(name if parent == "." else f"{parent}/{name}")
+        parents = next_parents[:8]  # keep the width bounded, the depth is what matters
+    if index != child_scene:
+        lines += [f'[node name="Child" parent="." instance=ExtResource("2_child")]', ""]
+    for i, parent in enumerate(parents):
+        lines.append(f'[connection signal="changed_{index % scripts}" from="{parent}" to="." method="step_{i}"]')
+    return "\n".join(lines) + "\n"
+
+
+def write_synthetic_photo(path: str, index: int, orientation: int):
+    """Write a JPEG with an EXIF orientation tag (needs Pillow)."""
+    from PIL import Image
+
+    img = Image.new("RGB", (1600, 1200), ((index * 37) % 256, (index * 91) % 256, 128))
+    exif = Image.Exif()
+    exif[274] = orientation
+    img.save(path, "JPEG", quality=90, exif=exif)
+
+
+def write_synthetic_godot_project(root: str, scripts: int, functions: int, scenes: int, depth: int,
+                                  project_lines: int, photos: int) -> dict:
+    """Create a synthetic Godot project (plus the data the other tools read) and return its size."""
+    write_synthetic_project_godot(os.path.join(root, "project.godot"), project_lines)
+
+    os.makedirs(os.path.join(root, "scripts"))
+    for i in range(scripts):
+        with open(os.path.join(root, "scripts", f"module_{i}.gd"), "w", encoding="utf-8") as f:
+            f.write(write_synthetic_module(i, functions, scripts))
+
+    os.makedirs(os.path.join(root, "scenes"))
+    for i in range(scenes):
+        with open(os.path.join(root, "scenes", f"scene_{i}.tscn"), "w", encoding="utf-8") as f:
+            f.write(write_synthetic_scene(i, scripts, scenes, depth))
+
+    # JSON data in the folders tools/validate_json.py checks
+    json_files = 0
+    for folder, fields in {"units": ["id", "name", "race", "nation", "base_stats", "mana_type"],
+                           "items": ["id", "name", "rarity", "effect"]}.items():
+        os.makedirs(os.path.join(root, "data", folder))
+        for i in range(max(scripts // 2, 1)):
+            record = {field: f"{field}_{i}" for field in fields}
+            record["base_stats"] = {"hp": i, "atk": i % 7, "tags": ["a", "b", "c"] * 5}
+            with open(os.path.join(root, "data", folder, f"{folder}_{i}.json"), "w", encoding="utf-8") as f:
+                json.dump(record, f)
+            json_files += 1
+
+    written_photos = 0
+    if photos:
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            photos = 0
+        else:
+            os.makedirs(os.path.join(root, "data", "photos"))
+            for i in range(photos):
+                write_synthetic_photo(os.path.join(root, "data", "photos", f"photo_{i}.jpg"), i, (3, 6, 8, 1)[i % 4])
+                written_photos += 1
+
+    # Timeline whose photo paths tools/fix_photos.py rewrites to the derivatives
+    events = [{"date": f"{i + 1:02d} janvier 2024", "title": f"Event {i}",
+               "photos": [f"res://data/photos/photo_{i}.jpg"]} for i in range(written_photos)]
+    with open(os.path.join(root, "data", "timeline_data.json"), "w", encoding="utf-8") as f:
+        json.dump({"title": "Synthetic", "events": events}, f, indent="\t")
+
+    return {"scripts": scripts, "functions_per_script": functions, "scenes": scenes, "depth": depth,
+            "project_godot_lines": project_lines, "json_files": json_files, "photos": written_photos}
+
+
+def time_best(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_script(script: str, cwd: str, *script_args: str):
+    subprocess.run([sys.executable, script, *script_args], cwd=cwd, stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL, check=False)
+
+
+def bench_size(name: str, spec: tuple, args) -> dict:
+    scripts, functions, scenes, depth, project_lines, photos = spec
+    result = {"size": name}
+    with tempfile.TemporaryDirectory() as tmp:
+        project = os.path.join(tmp, "project")
+        os.makedirs(project)
+        result.update(write_synthetic_godot_project(project, scripts, functions, scenes, depth,
+                                                    project_lines, 0 if args.skip_photos else photos))
+        timings = result["seconds"] = {}
+        make_archi_file.load_gdparser().parse("")  # one-off parser load is not part of any phase
+
+        def scan(outline_only=False):
+            generator = make_archi_file.ArchitectureGenerator(project, jobs=args.jobs, outline_only=outline_only)
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.scan()
+            return generator
+
+        timings["scan"] = time_best(scan, args.repeat)
+        timings["scan_outline"] = time_best(lambda: scan(outline_only=True), args.repeat)
+        generator = scan()
+        timings["generate"] = time_best(generator.generate, args.repeat)
+        result["document_chars"] = len(generator.generate())
+
+        timings["validate_json"] = time_best(lambda: run_script(VALIDATE_JSON, project), args.repeat)
+
+        if result["photos"]:
+            # The pipeline rewrites photos and the timeline in place: time one pass on a
+            # fresh copy of the inputs, always pointing it at the synthetic project's files
+            data_dir = os.path.join(project, "data")
+            photos_dir = os.path.join(data_dir, "photos")
+            timeline = os.path.join(data_dir, "timeline_data.json")
+            pristine = os.path.join(tmp, "photos_pristine")
+            shutil.copytree(photos_dir, pristine)
+            shutil.copy2(timeline, pristine + ".json")
+
+            def photo_pass():
+                shutil.rmtree(photos_dir)
+                shutil.copytree(pristine, photos_dir)
+                shutil.copy2(pristine + ".json", timeline)
+                start = time.perf_counter()
+                run_script(PHOTO_PIPELINE, project, "--dir", photos_dir, "--timeline", timeline)
+                return time.perf_counter() - start
+
+            timings["photo_pipeline"] = min(photo_pass() for _ in range(args.repeat))
+    return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=TOOLS_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_suite(args):
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SUITE_SIZES]
+    if unknown:
+        print(f"ERROR: unknown size(s) {', '.join(unknown)} (choose from {', '.join(SUITE_SIZES)})")
+        sys.exit(1)
+
+    results = {
+        "format": "godot-archi-bench",
+        "version": 1,
+        "commit": git_commit(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "gdtoolkit": make_archi_file.gdtoolkit_version(),
+        "jobs": args.jobs,
+        "repeat": args.repeat,
+        "sizes": [],
+    }
+    for name in sizes:
+        print(f"Benchmarking {name} project...", flush=True)
+        size_result = bench_size(name, SUITE_SIZES[name], args)
+        results["sizes"].append(size_result)
+        print(f"  {size_result['scripts']} scripts, {size_result['scenes']} scenes, "
+              f"{size_result['photos']} photos")
+        for metric, seconds in size_result["seconds"].items():
+            print(f"    {metric:<16} {seconds * 1000:>10.1f} ms")
+
+    output = args.output or os.path.join(args.results_dir, f"bench-{results['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results written: {output}")
+
+
+def bench_compare(args):
+    runs = []
+    for path in (args.baseline, args.candidate):
+        with open(path, "r", encoding="utf-8") as f:
+            runs.append(json.load(f))
+    baseline, candidate = ({s["size"]: s for s in run["sizes"]} for run in runs)
+
+    print(f"{'size':<8} {'metric':<16} {runs[0].get('commit') or 'baseline':>12} "
+          f"{runs[1].get('commit') or 'candidate':>12} {'ratio':>8}")
+    for size, new in candidate.items():
+        old = baseline.get(size)
+        if old is None:
+            continue
+        for metric, seconds in new["seconds"].items():
+            before = old["seconds"].get(metric)
+            if before is None:
+                continue
+            ratio = seconds / before if before else float("inf")
+            flag = "  ⚠️" if ratio > 1 + args.threshold else ""
+            print(f"{size:<8} {metric:<16} {before * 1000:>9.1f} ms {seconds * 1000:>9.1f} ms "
+                  f"{ratio:>7.2f}x{flag}")
+
+
+def main():
+    argparser = argparse.ArgumentParser(description="Microbenchmarks for make_archi_file.py")
+    sub = argparser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("project-config", help="ProjectConfigParser on a synthetic project.godot")
+    p.add_argument("--lines", type=int, default=50_000, help="Size of the synthetic project.godot (default: 50000)")
+    p.add_argument("--repeat", type=int, default=5, help="Number of timed runs (default: 5)")
+    p.set_defaults(func=bench_project_config)
+
+    p = sub.add_parser("tokens", help="GDScriptAnalyzer function extraction on a deeply nested synthetic script")
+    p.add_argument("--functions", type=int, default=200, help="Number of functions (default: 200)")
+    p.add_argument("--depth", type=int, default=30, help="Block nesting depth per function (default: 30)")
+    p.add_argument("--repeat", type=int, default=5, help="Number of timed runs (default: 5)")
+    p.set_defaults(func=bench_tokens)
+
+    p = sub.add_parser("outline", help="Full gdtoolkit parse vs --outline-only scanner on a synthetic script")
+    p.add_argument("--functions", type=int, default=200, help="Number of functions (default: 200)")
+    p.add_argument("--depth", type=int, default=5, help="Block nesting depth per function (default: 5)")
+    p.add_argument("--repeat", type=int, default=3, help="Number of timed runs (default: 3)")
+    p.set_defaults(func=bench_outline)
+
+    p = sub.add_parser("startup", help="CLI startup time and -X importtime breakdown")
+    p.add_argument("--repeat", type=int, default=5, help="Number of timed runs (default: 5)")
+    p.add_argument("--top", type=int, default=10, help="Number of slowest imports to list (default: 10)")
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("suite", help="Time the tools on synthetic Godot projects and store the results as JSON")
+    p.add_argument("--sizes", default="small,medium",
+                   help=f"Comma-separated project sizes: {', '.join(SUITE_SIZES)} (default: small,medium)")
+    p.add_argument("--repeat", type=int, default=3, help="Number of timed runs, best is kept (default: 3)")
+    p.add_argument("-j", "--jobs", type=int, default=1, help="Worker processes for scan() (default: 1)")
+    p.add_argument("--skip-photos", action="store_true", help="Do not benchmark the photo pipeline")
+    p.add_argument("--results-dir", default=os.path.join(TOOLS_DIR, "..", ".godot", "archi_bench"),
+                   help="Where results are stored as bench-<commit>.json (default: .godot/archi_bench)")
+    p.add_argument("-o", "--output", default=None, help="Explicit results file (overrides --results-dir)")
+    p.set_defaults(func=bench_suite)
+
+    p = sub.add_parser("compare", help="Compare two suite result files")
+    p.add_argument("baseline", help="Older results JSON")
+    p.add_argument("candidate", help="Newer results JSON")
+    p.add_argument("--threshold", type=float, default=0.10,
+                   help="Flag metrics slower by more than this fraction (default: 0.10)")
+    p.set_defaults(func=bench_compare)
+
+    args = argparser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+"""Applique la rotation EXIF aux photos puis supprime les métadonnées.
+   Godot ne lit pas l'EXIF → les photos apparaissent tournées sans ça.
+
+   Les photos sont traitées en parallèle (un processus par cœur par défaut) ;
+   chaque photo est décodée une seule fois puis retournée par Pillow (en C),
+   sans jamais passer les pixels par des listes Python.
+
+   Les JPEG sont tournés sans perte par jpegtran (libjpeg-turbo) quand il est
+   installé : rotation dans le domaine DCT, sans décoder ni réencoder. Si
+   l'image n'est pas alignée sur les blocs MCU (ou sans jpegtran), on revient
+   au décodage + réencodage en qualité 95.
+
+   Des versions réduites sont ensuite générées (rééchantillonnage Lanczos) :
+   data/photos/thumbs/ pour les vignettes de la timeline et data/photos/popup/
+   pour la popup. Les chemins "photos" de data/timeline_data.json sont
+   réécrits vers les versions popup (timeline.gd en déduit la vignette).
+
+   Un manifeste (data/photos/.manifest.json) garde taille, date et empreinte
+   de chaque photo déjà traitée : les relances ne font qu'un stat() par fichier
+   et ne rouvrent que les photos nouvelles ou modifiées.
+
+   Usage: python tools/fix_photos.py
+          python tools/fix_photos.py --jobs 4
+          python tools/fix_photos.py --dir chemin/vers/photos
+          python tools/fix_photos.py --force
+          python tools/fix_photos.py --no-lossless
+          python tools/fix_photos.py --thumb-size 800x600 --popup-size 720x560
+          python tools/fix_photos.py --no-derivatives
+
+   Optionnel : jpegtran (paquet libjpeg-turbo-progs, ou libjpeg-turbo sous Windows)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import struct
+import hashlib
+import argparse
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from PIL import Image
+except ImportError:
+    print("Installe Pillow : pip install Pillow")
+    sys.exit(1)
+
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PHOTOS_DIR = os.path.join(PROJECT_DIR, "data", "photos")
+TIMELINE_JSON = os.path.join(PROJECT_DIR, "data", "timeline_data.json")
+EXTENSIONS = (".jpg", ".jpeg", ".png")
+MANIFEST_NAME = ".manifest.json"
+# À incrémenter si le traitement change : toutes les photos seront retraitées
+MANIFEST_VERSION = 1
+
+# Versions réduites : sous-dossier → taille max par défaut (largeur, hauteur).
+# La vignette est affichée à 50 % max dans 400×300 (timeline.gd) ; la popup
+# affiche les photos dans 180×140 (event_popup.gd), ×4 pour les écrans denses.
+DERIVATIVES = {
+    "thumbs": (800, 600),
+    "popup": (720, 560),
+}
+
+# Tag EXIF 274 = Orientation → transposition qui remet l'image droite
+TRANSFORMS = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+# Même correction faite par jpegtran, sans perte (rotations dans le sens horaire)
+JPEGTRAN = shutil.which("jpegtran")
+JPEGTRAN_TRANSFORMS = {
+    2: ["-flip", "horizontal"],
+    3: ["-rotate", "180"],
+    4: ["-flip", "vertical"],
+    5: ["-transpose"],
+    6: ["-rotate", "90"],
+    7: ["-transverse"],
+    8: ["-rotate", "270"],
+}
+
+
+# ─────────────────────────────────────────────
+# Lecture de l'orientation (en-tête seulement)
+# ─────────────────────────────────────────────
+
+def _tiff_orientation(tiff: bytes) -> int:
+    """Tag 274 dans l'IFD0 d'un bloc TIFF (contenu d'un segment EXIF)."""
+    if tiff[:2] == b"II":
+        endian = "<"
+    elif tiff[:2] == b"MM":
+        endian = ">"
+    else:
+        return 1
+    ifd = struct.unpack_from(endian + "I", tiff, 4)[0]
+    count = struct.unpack_from(endian + "H", tiff, ifd)[0]
+    for i in range(count):
+        tag, type_, _, value = struct.unpack_from(endian + "HHI4s", tiff, ifd + 2 + i * 12)
+        if tag == 274 and type_ == 3:  # SHORT
+            return struct.unpack_from(endian + "H", value)[0]
+    return 1
+
+
+def read_orientation(filepath: str) -> int:
+    """Orientation EXIF lue dans l'en-tête du fichier, sans décoder l'image.
+
+    JPEG : segments parcourus jusqu'au début des données (SOS) ;
+    PNG : chunks parcourus jusqu'au premier IDAT. 1 si absente.
+    """
+    try:
+        with open(filepath, "rb") as f:
+            head = f.read(2)
+            if head == b"\xff\xd8":  # JPEG
+                while True:
+                    marker = f.read(2)
+                    if len(marker) < 2 or marker[0] != 0xFF:
+                        break  # segments inattendus : on laisse Pillow relire l'EXIF
+                    if marker[1] in (0xD9, 0xDA):
+                        return 1
+                    length = struct.unpack(">H", f.read(2))[0]
+                    if marker[1] == 0xE1:
+                        data = f.read(length - 2)
+                        if data[:6] == b"Exif\0\0":
+                            return _tiff_orientation(data[6:])
+                    else:
+                        f.seek(length - 2, os.SEEK_CUR)
+            elif head + f.read(6) == b"\x89PNG\r\n\x1a\n":
+                while True:
+                    header = f.read(8)
+                    if len(header) < 8:
+                        return 1
+                    length, chunk = struct.unpack(">I4s", header)
+                    if chunk == b"IDAT":
+                        return 1
+                    if chunk == b"eXIf":
+                        return _tiff_orientation(f.read(length))
+                    f.seek(length + 4, os.SEEK_CUR)  # données + CRC
+    except (OSError, struct.error):
+        pass
+    # Format inattendu ou en-tête abîmé : Pillow lit aussi l'EXIF sans décoder les pixels
+    try:
+        with Image.open(filepath) as img:
+            return img.getexif().get(274, 1)
+    except Exception:
+        return 1
+
+
+# ─────────────────────────────────────────────
+# Traitement d'une photo (dans un processus du pool)
+# ─────────────────────────────────────────────
+
+def file_hash(filepath: str) -> str:
+    digest = hashlib.sha1()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def rotate_lossless(filepath: str, orientation: int) -> bool:
+    """Tourne un JPEG sur place avec jpegtran, sans réencodage.
+
+    -copy none supprime toutes les métadonnées (dont le tag d'orientation) ;
+    -perfect fait échouer jpegtran plutôt que de rogner les bords quand
+    l'image n'est pas alignée sur les MCU : on renvoie alors False.
+    """
+    tmp_path = filepath + ".tmp"
+    cmd = [JPEGTRAN, "-copy", "none", "-perfect", *JPEGTRAN_TRANSFORMS[orientation], "-outfile", tmp_path, filepath]
+    try:
+        done = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+    except OSError:
+        done = False
+    if not done:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, filepath)
+    return True
+
+
+def fix_orientation(filepath: str, lossless: bool = True) -> tuple[str, int]:
+    """Corrige une photo sur place. Renvoie (statut, pixels réencodés).
+
+    Statut : "fixed-lossless" (JPEG tourné par jpegtran), "fixed" (décodée,
+    retournée et réencodée), "ok" (déjà droite) ou "error: ...".
+    """
+    orientation = read_orientation(filepath)
+    transform = TRANSFORMS.get(orientation)
+    if transform is None:
+        return "ok", 0
+
+    ext = os.path.splitext(filepath)[1].lower()
+    if lossless and JPEGTRAN and ext in (".jpg", ".jpeg") and rotate_lossless(filepath, orientation):
+        return "fixed-lossless", 0
+
+    try:
+        with Image.open(filepath) as img:
+            # transpose() travaille sur le buffer C de l'image : pas de liste de pixels
+            fixed = img.transpose(transform)
+    except Exception as e:
+        return f"error: {e}", 0
+
+    # Sans exif= ni icc_profile= à la sauvegarde, aucune métadonnée n'est réécrite
+    fixed.info = {}
+    tmp_path = filepath + ".tmp"
+    try:
+        if ext in (".jpg", ".jpeg"):
+            fixed.save(tmp_path, "JPEG", quality=95)
+        elif ext == ".png":
+            fixed.save(tmp_path, "PNG")
+        else:
+            fixed.save(tmp_path)
+        os.replace(tmp_path, filepath)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return f"error: {e}", 0
+    return "fixed", fixed.width * fixed.height
+
+
+def derivative_path(filepath: str, kind: str) -> str:
+    return os.path.join(os.path.dirname(filepath), kind, os.path.basename(filepath))
+
+
+def make_derivatives(filepath: str, sizes: dict[str, tuple[int, int]]) -> int:
+    """Écrit les versions réduites d'une photo (jamais agrandies). Renvoie leur nombre.
+
+    La photo n'est décodée qu'une fois : pour un JPEG, draft() laisse libjpeg
+    décoder directement à 1/2, 1/4 ou 1/8 tant que le résultat reste au moins
+    aussi grand que la plus grande des tailles demandées.
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    with Image.open(filepath) as img:
+        largest = (max(w for w, _ in sizes.values()), max(h for _, h in sizes.values()))
+        img.draft("RGB", largest)
+        img.load()
+        for kind, size in sizes.items():
+            out_path = derivative_path(filepath, kind)
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            derived = img.copy()
+            derived.thumbnail(size, Image.Resampling.LANCZOS)
+            derived.info = {}
+            tmp_path = out_path + ".tmp"
+            if ext in (".jpg", ".jpeg"):
+                derived.save(tmp_path, "JPEG", quality=90, optimize=True)
+            else:
+                derived.save(tmp_path, img.format or "PNG")
+            os.replace(tmp_path, out_path)
+    return len(sizes)
+
+
+def process_photo(filepath: str, known: dict, lossless: bool = True,
+                  sizes: dict[str, tuple[int, int]] = None) -> tuple[str, dict, int, int, int]:
+    """Traite une photo nouvelle ou modifiée.
+    Renvoie (statut, entrée du manifeste, octets lus, pixels réencodés, versions réduites écrites).
+
+    `known` est l'entrée précédente du manifeste : si seul le stat() a changé
+    (copie, touch…) mais pas le contenu, la photo n'est pas retraitée, et ses
+    versions réduites ne sont refaites que si elles manquent ou si les tailles
+    demandées ont changé. Exécutée dans un processus du pool : aucune sortie console ici.
+    """
+    try:
+        size = os.path.getsize(filepath)
+        digest = file_hash(filepath)
+    except OSError as e:  # illisible ou supprimée entre-temps : seule cette photo échoue
+        return f"error: {e}", {"result": f"error: {e}"}, 0, 0, 0
+    if known.get("hash") == digest and not known.get("result", "").startswith("error"):
+        status, pixels = "unchanged", 0
+        result = known["result"]
+    else:
+        status, pixels = fix_orientation(filepath, lossless)
+        result = status
+
+    try:
+        if status.startswith("fixed"):
+            digest = file_hash(filepath)
+        st = os.stat(filepath)
+    except OSError as e:
+        return f"error: {e}", {"result": f"error: {e}"}, size, pixels, 0
+    entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest, "result": result}
+
+    derived = 0
+    if sizes and not result.startswith("error"):
+        wanted = {kind: list(size) for kind, size in sizes.items()}
+        if (status != "unchanged" or known.get("derivatives") != wanted
+                or not all(os.path.isfile(derivative_path(filepath, kind)) for kind in sizes)):
+            try:
+                derived = make_derivatives(filepath, sizes)
+            except Exception as e:
+                entry["result"] = f"error: {e}"
+                return entry["result"], entry, size, pixels, 0
+        entry["derivatives"] = wanted
+    return status, entry, size, pixels, derived
+
+
+# ─────────────────────────────────────────────
+# Manifeste
+# ─────────────────────────────────────────────
+
+def load_manifest(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get("files", {}) if data.get("version") == MANIFEST_VERSION else {}
+
+
+def save_manifest(path: str, files: dict):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "files": dict(sorted(files.items()))}, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def is_up_to_date(entry: dict, filepath: str, sizes: dict[str, tuple[int, int]]) -> bool:
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return False  # process_photo signalera l'erreur pour cette photo
+    if (entry.get("size") != st.st_size or entry.get("mtime_ns") != st.st_mtime_ns
+            or entry.get("result", "error").startswith("error")):
+        return False
+    if entry.get("derivatives", {}) != {kind: list(size) for kind, size in sizes.items()}:
+        return False
+    return all(os.path.isfile(derivative_path(filepath, kind)) for kind in sizes)
+
+
+# ─────────────────────────────────────────────
+# Réécriture de timeline_data.json
+# ─────────────────────────────────────────────
+
+def find_project_root(path: str) -> str:
+    """Dossier contenant project.godot au-dessus de `path` (à défaut, la racine du dépôt)."""
+    current = os.path.abspath(path)
+    while True:
+        if os.path.isfile(os.path.join(current, "project.godot")):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return os.path.abspath(PROJECT_DIR)
+        current = parent
+
+
+def rewrite_timeline(json_path: str, photos_dir: str, kind: str) -> int:
+    """Fait pointer les chemins de photos du JSON vers leurs versions `kind`.
+
+    Remplacement textuel des chaînes res:// : l'indentation et l'ordre du
+    fichier (édité à la main) sont conservés. Les chemins déjà réécrits sont
+    reconnus, ceux sans version réduite sont laissés tels quels. Renvoie le
+    nombre de chemins modifiés.
+    """
+    res_dir = "res://" + os.path.relpath(photos_dir, find_project_root(photos_dir)).replace(os.sep, "/")
+    other_kinds = "|".join(re.escape(k) for k in DERIVATIVES)
+    pattern = re.compile(r'"' + re.escape(res_dir) + r'/(?:(?:' + other_kinds + r')/)?([^"/]+)"')
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    changed = 0
+
+    def replace(m: re.Match) -> str:
+        nonlocal changed
+        name = m.group(1)
+        if not os.path.isfile(os.path.join(photos_dir, kind, name)):
+            return m.group(0)
+        new = f'"{res_dir}/{kind}/{name}"'
+        changed += new != m.group(0)
+        return new
+
+    new_text = pattern.sub(replace, text)
+    if changed:
+        tmp_path = json_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            f.write(new_text)
+        os.replace(tmp_path, json_path)
+    return changed
+
+
+def parse_size(value: str) -> tuple[int, int]:
+    try:
+        width, height = (int(v) for v in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"taille invalide '{value}' (attendu : LARGEURxHAUTEUR)")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"taille invalide '{value}'")
+    return width, height
+
+
+def list_photos(photos_dir: str) -> list[str]:
+    return [
+        os.path.join(photos_dir, filename)
+        for filename in sorted(os.listdir(photos_dir))
+        if os.path.splitext(filename)[1].lower() in EXTENSIONS
+        and os.path.isfile(os.path.join(photos_dir, filename))
+    ]
+
+def update_timeline(args: argparse.Namespace, photos_dir: str, sizes: dict):
+    if not sizes or not os.path.isfile(args.timeline):
+        return
+    changed = rewrite_timeline(args.timeline, photos_dir, "popup")
+    if changed:
+        print(f"{changed} chemin(s) de photo réécrit(s) dans {os.path.basename(args.timeline)}.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Applique la rotation EXIF aux photos et supprime les métadonnées.")
+    parser.add_argument("--dir", default=PHOTOS_DIR, help="Dossier des photos (défaut : data/photos)")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Nombre de processus (0 = un par cœur, défaut : 0)")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore le manifeste et revérifie toutes les photos")
+    parser.add_argument("--no-lossless", action="store_true",
+                        help="Réencode toujours les JPEG au lieu de les tourner sans perte avec jpegtran")
+    parser.add_argument("--thumb-size", type=parse_size, default=DERIVATIVES["thumbs"], metavar="LxH",
+                        help="Taille max des vignettes de la timeline (défaut : %dx%d)" % DERIVATIVES["thumbs"])
+    parser.add_argument("--popup-size", type=parse_size, default=DERIVATIVES["popup"], metavar="LxH",
+                        help="Taille max des photos de la popup (défaut : %dx%d)" % DERIVATIVES["popup"])
+    parser.add_argument("--no-derivatives", action="store_true",
+                        help="Ne génère pas les versions réduites et ne touche pas au JSON")
+    parser.add_argument("--timeline", default=TIMELINE_JSON,
+                        help="JSON dont les chemins de photos sont réécrits (défaut : data/timeline_data.json)")
+    args = parser.parse_args()
+
+    photos_dir = os.path.abspath(args.dir)
+    if not os.path.isdir(photos_dir):
+        print(f"Dossier introuvable : {photos_dir}")
+        sys.exit(1)
+
+    sizes = {} if args.no_derivatives else {"thumbs": args.thumb_size, "popup": args.popup_size}
+    manifest_path = os.path.join(photos_dir, MANIFEST_NAME)
+    previous = {} if args.force else load_manifest(manifest_path)
+    photos = list_photos(photos_dir)
+
+    # Seuls des stat() : les photos déjà traitées et inchangées ne sont pas rouvertes
+    manifest, todo = {}, []
+    for path in photos:
+        name = os.path.basename(path)
+        entry = previous.get(name)
+        if entry and is_up_to_date(entry, path, sizes):
+            manifest[name] = entry
+        else:
+            todo.append(path)
+
+    skipped = len(photos) - len(todo)
+    if not todo:
+        save_manifest(manifest_path, manifest)  # oublie les photos supprimées
+        print(f"Rien à faire : {skipped} photo(s) déjà traitée(s).")
+        update_timeline(args, photos_dir, sizes)
+        return
+
+    jobs = min(args.jobs if args.jobs > 0 else (os.cpu_count() or 1), len(todo))
+    start = time.perf_counter()
+    count = lossless_count = errors = total_bytes = total_pixels = derived = 0
+    if not JPEGTRAN and not args.no_lossless:
+        print("  (jpegtran introuvable : les JPEG seront réencodés, installe libjpeg-turbo pour une rotation sans perte)")
+
+    # Résultats affichés au fil de l'eau, dans l'ordre où les processus les terminent ;
+    # le manifeste est sauvegardé même si le traitement est interrompu
+    try:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(process_photo, path, previous.get(os.path.basename(path), {}),
+                                   not args.no_lossless, sizes): path
+                       for path in todo}
+            for future in as_completed(futures):
+                filename = os.path.basename(futures[future])
+                status, entry, size, pixels, written = future.result()
+                manifest[filename] = entry
+                total_bytes += size
+                total_pixels += pixels
+                derived += written
+                if status == "fixed-lossless":
+                    print(f"  ✓ Corrigé : {filename} (sans perte)")
+                    count += 1
+                    lossless_count += 1
+                elif status == "fixed":
+                    print(f"  ✓ Corrigé : {filename}")
+                    count += 1
+                elif status in ("ok", "unchanged"):
+                    print(f"  · OK      : {filename}")
+                else:
+                    print(f"  ⚠ Impossible de traiter {filename}: {status[len('error: '):]}")
+                    errors += 1
+    finally:
+        save_manifest(manifest_path, manifest)
+
+    elapsed = time.perf_counter() - start
+    print(f"\n{count} photo(s) corrigée(s)" + (f" dont {lossless_count} sans perte" if lossless_count else "")
+          + (f", {errors} erreur(s)" if errors else "")
+          + (f", {skipped} déjà traitée(s) (manifeste)" if skipped else "")
+          + (f", {derived} version(s) réduite(s) écrite(s)" if derived else "") + ".")
+    print(f"{len(todo)} photo(s) vérifiée(s) en {elapsed:.2f} s avec {jobs} processus : "
+          f"{len(todo) / elapsed:.1f} photos/s, {total_bytes / elapsed / 1e6:.1f} Mo/s lus, "
+          f"{total_pixels / elapsed / 1e6:.1f} Mpx/s réencodés")
+    update_timeline(args, photos_dir, sizes)
+
+
+
+if __name__ == "__main__":
+    main()
@@ -9,29 +9,259 @@ Usage:
     python godot_architecture_generator.py /path/to/godot/project
     python godot_architecture_generator.py /path/to/godot/project -o custom_output.md
     python godot_architecture_generator.py /path/to/godot/project --full-source
+    python godot_architecture_generator.py /path/to/godot/project --full-source --strip-comments
     python godot_architecture_generator.py /path/to/godot/project --exclude addons,test
+    python godot_architecture_generator.py /path/to/godot/project --jobs 8
+    python godot_architecture_generator.py /path/to/godot/project --no-cache
+    python godot_architecture_generator.py /path/to/godot/project --incremental
+    python godot_architecture_generator.py /path/to/godot/project -o - > architecture.md
+    python godot_architecture_generator.py /path/to/godot/project --max-tokens 32000
+    python godot_architecture_generator.py /path/to/godot/project --shards documentation/archi
+    python godot_architecture_generator.py /path/to/godot/project --index documentation/archi_index.json
+    python godot_architecture_generator.py /path/to/godot/project --db documentation/archi.sqlite
+    python godot_architecture_generator.py /path/to/godot/project --watch
+    python godot_architecture_generator.py /path/to/godot/project --outline-only
+    python godot_architecture_generator.py /path/to/godot/project --profile
+    python godot_architecture_generator.py impact --project /path/to/godot/project changed.gd
 
 Requirements:
     pip install "gdtoolkit==4.*"
+    pip install tiktoken   (optional, exact token counts for --max-tokens and --shards)
 """
 
 import os
 import sys
 import re
+import json
+import hashlib
 import argparse
-import configparser
+import io
+import time
+import sqlite3
+import threading
+import contextlib
+import subprocess
+import importlib.util
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
-from typing import Optional
+from functools import lru_cache, partial
+from typing import Iterator, Optional, TextIO
 
-try:
-    from gdtoolkit.parser import parser as gdparser
-    from lark import Tree, Token
-except ImportError:
-    print("ERROR: gdtoolkit is required. Install it with:")
-    print('  pip install "gdtoolkit==4.*"')
-    sys.exit(1)
+# Heavy and optional dependencies are imported on first use, so --help, cache hits,
+# --outline-only and scene-only runs never pay for them:
+#   gdtoolkit + lark   required for the full GDScript parse (see load_gdparser)
+#   msgpack            optional, only for --index *.msgpack
+#   watchdog           optional, native file events for --watch (polling otherwise)
+gdparser = None
+Tree = Token = None
+
+
+def load_gdparser():
+    """Import gdtoolkit on first use and return its GDScript parser.
+
+    gdtoolkit builds its lark parser on the first parse and keeps the compiled
+    LALR tables pickled in its own cache directory, so after the first run this
+    is a table load rather than a grammar compile. Raises ImportError when
+    gdtoolkit is not installed.
+    """
+    global gdparser, Tree, Token
+    if gdparser is None:
+        from gdtoolkit.parser import parser
+        from lark import Tree, Token
+        gdparser = parser
+    return gdparser
+
+
+def has_module(name: str) -> bool:
+    """Check that an optional dependency is installed without importing it."""
+    return importlib.util.find_spec(name) is not None
+
+
+# ─────────────────────────────────────────────
+# GDScript Outline Scanner (declarations only)
+# ─────────────────────────────────────────────
+
+# One pass over the source: only strings, comments, brackets and line breaks are
+# significant; everything in between is copied through as plain text.
+_OUTLINE_LEXER_RE = re.compile(r'''
+      (?P<string>"""[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*"""
+               | \'\'\'[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*\'\'\'
+               | "[^"\\\n]*(?:\\.[^"\\\n]*)*"
+               | '[^'\\\n]*(?:\\.[^'\\\n]*)*')
+    | (?P<quote>["'])
+    | (?P<comment>\#[^\n]*)
+    | (?P<open>[(\[{])
+    | (?P<close>[)\]}])
+    | (?P<cont>\\\r?\n)
+    | (?P<newline>\r?\n)
+''', re.VERBOSE | re.DOTALL)
+
+# Whitespace runs outside string literals, collapsed when physical lines are joined
+_JOINED_WS_RE = re.compile(r'("[^"\\\n]*(?:\\.[^"\\\n]*)*"|\'[^\'\\\n]*(?:\\.[^\'\\\n]*)*\')|\s+')
+_ANNOTATION_RE = re.compile(r'@(\w+)\s*(?:\((?:[^()]|\([^()]*\))*\))?\s*')
+_CLASS_NAME_RE = re.compile(r'class_name\s+(\w+)(?:\s+extends\s+("[^"]*"|\w+))?')
+_EXTENDS_RE = re.compile(r'extends\s+("[^"]*"|\w+)')
+_INNER_CLASS_RE = re.compile(r'class\s+(\w+)(?:\s+extends\s+("[^"]*"|\w+))?\s*:')
+_SIGNAL_RE = re.compile(r'signal\s+(\w+)\s*(?:\((.*)\))?')
+_VAR_RE = re.compile(r'(static\s+)?var\s+(\w+)\s*(.*)$')
+_FUNC_RE = re.compile(r'(static\s+)?func\s+(\w+)\s*\(')
+_ENUM_RE = re.compile(r'enum\s*(\w+)?\s*\{(.*)\}')
+_CONST_RE = re.compile(r'const\s+(\w+)\s*(.*)$')
+_ARG_RE = re.compile(r'(\w+)\s*(.*)$')
+_RETURN_TYPE_RE = re.compile(r'\s*->\s*([^:]+?)\s*:')
+_BODY_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|\w+')
+
+
+def iter_logical_lines(code: str, strict: bool = False) -> Iterator[tuple[int, int, int, str]]:
+    """Yield (line, end_line, indent, text) for each logical GDScript line.
+
+    Comments are dropped, bracketed and backslash continuations are joined into
+    one line, strings are kept verbatim and blank lines are skipped. With
+    strict=True a ValueError is raised on unbalanced brackets or unterminated
+    strings.
+    """
+    parts: list[str] = []
+    depth = 0
+    line = start = 1
+    pos = 0
+
+    def flush():
+        text = "".join(parts)
+        parts.clear()
+        stripped = text.strip()
+        if not stripped:
+            return None
+        indent = len(text[:len(text) - len(text.lstrip())].expandtabs(4))
+        if line > start:
+            stripped = _JOINED_WS_RE.sub(lambda m: m.group(1) or " ", stripped)
+        return start, line, indent, stripped
+
+    for m in _OUTLINE_LEXER_RE.finditer(code):
+        parts.append(code[pos:m.start()])
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == "newline" and not depth:
+            logical = flush()
+            if logical:
+                yield logical
+            line += 1
+            start = line
+        elif kind in ("newline", "cont"):
+            parts.append(" ")
+            line += 1
+        elif kind == "string":
+            parts.append(m.group())
+            line += m.group().count("\n")
+        elif kind == "open":
+            depth += 1
+            parts.append(m.group())
+        elif kind == "close":
+            if depth:
+                depth -= 1
+            elif strict:
+                raise ValueError(f"line {line}: unbalanced '{m.group()}'")
+            parts.append(m.group())
+        elif kind == "quote":
+            if strict:
+                raise ValueError(f"line {line}: unterminated string")
+            parts.append(m.group())
+        # comments are dropped
+
+    if strict and depth:
+        raise ValueError(f"line {line}: {depth} unclosed bracket(s) at end of file")
+    parts.append(code[pos:])
+    logical = flush()
+    if logical:
+        yield logical
+
+
+def _closing_bracket(text: str, open_pos: int) -> int:
+    """Return the index of the bracket closing text[open_pos] (or len(text) if none)."""
+    depth = 0
+    quote = None
+    i = open_pos
+    while i < len(text):
+        c = text[i]
+        if quote:
+            if c == "\\":
+                i += 1
+            elif c == quote:
+                quote = None
+        elif c in "\"'":
+            quote = c
+        elif c in "([{":
+            depth += 1
+        elif c in ")]}":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(text)
+
+
+def _split_top_level(text: str) -> list[str]:
+    """Split on commas that are not inside brackets or strings; empty items are dropped."""
+    items = []
+    depth = 0
+    quote = None
+    last = 0
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if quote:
+            if c == "\\":
+                i += 1
+            elif c == quote:
+                quote = None
+        elif c in "\"'":
+            quote = c
+        elif c in "([{":
+            depth += 1
+        elif c in ")]}":
+            depth -= 1
+        elif c == "," and depth == 0:
+            items.append(text[last:i].strip())
+            last = i + 1
+        i += 1
+    items.append(text[last:].strip())
+    return [item for item in items if item]
+
+
+def _split_declaration(rest: str) -> tuple[Optional[str], Optional[str]]:
+    """Split the part after a declared name into (type, default).
+
+    Handles `: Type = value`, `: Type`, `:= value` and `= value`.
+    """
+    rest = rest.strip()
+    if rest.startswith(":="):
+        return None, rest[2:].strip() or None
+    if rest.startswith(":"):
+        type_, _, default = rest[1:].partition("=")
+        return type_.strip() or None, default.strip() or None
+    if rest.startswith("="):
+        return None, rest[1:].strip() or None
+    return None, None
+
+
+def strip_comments(code: str) -> str:
+    """Remove comments, trailing whitespace and blank lines from GDScript source.
+
+    Uses the outline lexer, so `#` inside strings is kept, and so are blank
+    lines inside multi-line strings.
+    """
+    parts: list[str] = []
+    pos = 0
+    for m in _OUTLINE_LEXER_RE.finditer(code):
+        parts.append(code[pos:m.start()])
+        pos = m.end()
+        if m.lastgroup == "string":
+            parts.append(m.group().replace("\n", "\0"))  # not a line break for the filter below
+        elif m.lastgroup != "comment":
+            parts.append(m.group())
+    parts.append(code[pos:])
+    lines = (line.rstrip() for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line).replace("\0", "\n")
 
 
 # ─────────────────────────────────────────────
@@ -41,11 +271,20 @@ except ImportError:
 class GDScriptAnalyzer:
     """Analyzes a .gd file using gdtoolkit's parser to extract structured info."""
 
-    def __init__(self, filepath: str, code: str):
+    # Attributes kept in the picklable summary (source code and parse tree are dropped)
+    SUMMARY_FIELDS = (
+        "filepath", "error", "class_name", "extends", "is_tool", "signals", "enums",
+        "constants", "exports", "onready_vars", "variables", "functions",
+        "inner_classes", "static_functions", "preloads",
+    )
+
+    def __init__(self, filepath: str, code: str, outline_only: bool = False):
         self.filepath = filepath
         self.code = code
+        self.outline_only = outline_only
         self.tree = None
         self.error = None
+        self._block_ends: Optional[dict[int, int]] = None
 
         self.class_name: Optional[str] = None
         self.extends: Optional[str] = None
@@ -63,88 +302,154 @@ class GDScriptAnalyzer:
 
         self._parse()
 
+    def to_dict(self) -> dict:
+        """Return the extracted info as a plain, picklable dict."""
+        return {field: getattr(self, field) for field in self.SUMMARY_FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "GDScriptAnalyzer":
+        """Rebuild an analyzer from a to_dict() summary without re-parsing."""
+        analyzer = cls.__new__(cls)
+        analyzer.code = None
+        analyzer.tree = None
+        for field in cls.SUMMARY_FIELDS:
+            setattr(analyzer, field, data[field])
+        return analyzer
+
     def _parse(self):
+        if self.outline_only:
+            try:
+                lines = list(iter_logical_lines(self.code, strict=True))
+            except ValueError:
+                pass  # the scanner cannot make sense of it: let gdtoolkit decide
+            else:
+                self._outline_parse(lines)
+                return
         try:
-            self.tree = gdparser.parse(self.code)
+            self.tree = load_gdparser().parse(self.code)
             self._extract_from_tree(self.tree)
         except Exception as e:
             self.error = str(e)
-            # Fallback: regex-based extraction
-            self._fallback_parse()
-
-    def _get_tokens(self, node, depth=0) -> list[str]:
-        """Recursively collect all token values from a subtree."""
-        tokens = []
-        if isinstance(node, Token):
-            tokens.append(str(node))
-        elif isinstance(node, Tree):
-            for child in node.children:
-                tokens.extend(self._get_tokens(child, depth + 1))
-        return tokens
+            # Fallback: declaration scanner
+            self._outline_parse(iter_logical_lines(self.code))
+
+    @staticmethod
+    def _iter_tokens(node) -> Iterator["Token"]:
+        """Yield the Tokens of a subtree in source order, without recursion."""
+        stack = [node]
+        pop, extend = stack.pop, stack.extend
+        while stack:
+            node = pop()
+            if isinstance(node, Token):
+                yield node
+            elif isinstance(node, Tree):
+                extend(reversed(node.children))
+
+    def _get_tokens(self, node) -> list[str]:
+        """Collect all token values from a subtree."""
+        return [str(token) for token in self._iter_tokens(node)]
 
     def _get_first_token(self, node) -> Optional[str]:
         """Get the first Token value from a subtree."""
-        if isinstance(node, Token):
-            return str(node)
-        if isinstance(node, Tree):
-            for child in node.children:
-                result = self._get_first_token(child)
-                if result is not None:
-                    return result
-        return None
+        token = next(self._iter_tokens(node), None)
+        return str(token) if token is not None else None
 
-    def _extract_func_args(self, func_args_node) -> list[dict]:
-        """Extract function arguments from a func_args node."""
-        args = []
-        if not isinstance(func_args_node, Tree):
-            return args
-        for child in func_args_node.children:
-            if isinstance(child, Tree):
-                tokens = self._get_tokens(child)
-                if child.data == "func_arg_typed" and len(tokens) >= 2:
-                    args.append({"name": tokens[0], "type": tokens[1]})
-                elif child.data == "func_arg_untyped" and len(tokens) >= 1:
-                    args.append({"name": tokens[0], "type": None})
-                elif child.data in ("func_arg_typed_default", "func_arg_inf_typed_default"):
-                    name = tokens[0] if tokens else "?"
-                    type_ = tokens[1] if len(tokens) > 2 else None
-                    args.append({"name": name, "type": type_})
+    @staticmethod
+    def _func_arg_info(rule: str, tokens: list[str]) -> Optional[dict]:
+        """Build an argument entry from a func_arg_* rule and its token values."""
+        if not tokens:
+            return None
+        # func_arg_typed: name, type[, default...]  —  func_arg_regular / func_arg_inf: name[, default...]
+        if rule.startswith("func_arg_typed") and len(tokens) >= 2:
+            return {"name": tokens[0], "type": tokens[1]}
+        return {"name": tokens[0], "type": None}
+
+    @staticmethod
+    def _count_tokens(node) -> int:
+        """Count the Tokens of a subtree in one iterative pass."""
+        count = 0
+        stack = [node]
+        pop, push = stack.pop, stack.append
+        while stack:
+            for child in pop().children:
+                if isinstance(child, Tree):
+                    push(child)
                 else:
-                    if tokens:
-                        args.append({"name": tokens[0], "type": None})
-        return args
+                    count += 1
+        return count
+
+    @staticmethod
+    def _last_token(node) -> Optional["Token"]:
+        """Return the last Token of a subtree in source order (descends the right edge)."""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Token):
+                return node
+            if isinstance(node, Tree):
+                stack.extend(node.children)
+        return None
+
+    def _block_end_line(self, line: int) -> Optional[int]:
+        """Last line of the indented block introduced by the logical line starting at `line`.
+
+        Spans come from indentation, as in the outline scanner: the tree drops
+        keyword tokens such as a trailing `pass` or bare `return`, so its last
+        token can stop a line short. All blocks are computed in one pass.
+        Returns None without source (the caller then uses the last token).
+        """
+        if getattr(self, "code", None) is None:
+            return None
+        if getattr(self, "_block_ends", None) is None:
+            self._block_ends = {}
+            open_blocks: list[tuple[int, int]] = []  # (indent, start line)
+            last_end = 0
+            for start, end, indent, _ in iter_logical_lines(self.code):
+                while open_blocks and open_blocks[-1][0] >= indent:
+                    self._block_ends[open_blocks.pop()[1]] = last_end
+                open_blocks.append((indent, start))
+                last_end = end
+            for _, start in open_blocks:
+                self._block_ends[start] = last_end
+        return self._block_ends.get(line)
 
     def _extract_func_info(self, func_node) -> dict:
-        """Extract function information from a func_def node."""
+        """Extract function information from a func_def node.
+
+        The header (name, args, return type) is read directly from func_header; the
+        whole function is then walked once to count tokens for approx_complexity.
+        The line span starts at the first header token and ends with the indented body.
+        """
         info = {"name": "?", "args": [], "return_type": None, "is_static": False, "is_coroutine": False}
+        first = None
 
-        # Check annotations preceding (handled at parent level)
         for child in func_node.children:
-            if isinstance(child, Tree) and child.data == "func_header":
-                header_children = child.children
-                for i, hc in enumerate(header_children):
-                    if isinstance(hc, Token) and hc.type == "NAME":
+            if not (isinstance(child, Tree) and child.data == "func_header"):
+                continue
+            for hc in child.children:
+                if isinstance(hc, Token):
+                    if first is None:
+                        first = hc
+                    if hc.type == "NAME" and info["name"] == "?":
                         info["name"] = str(hc)
-                    elif isinstance(hc, Tree) and hc.data == "func_args":
-                        info["args"] = self._extract_func_args(hc)
-                    elif isinstance(hc, Token) and str(hc) == "void":
-                        info["return_type"] = "void"
-                    elif isinstance(hc, Tree) and hc.data in ("func_typed_return", "type"):
-                        info["return_type"] = " ".join(self._get_tokens(hc))
-                # Last element might be the return type as a simple token
-                if info["return_type"] is None:
-                    for hc in reversed(header_children):
-                        if isinstance(hc, Token) and hc.type == "NAME" and str(hc) != info["name"]:
-                            # Could be a return type
-                            info["return_type"] = str(hc)
-                            break
-                        elif isinstance(hc, Tree):
-                            break
-
-        # Count approximate lines
-        func_tokens = self._get_tokens(func_node)
-        info["approx_complexity"] = len(func_tokens)
-
+                    elif hc.type in ("TYPE_HINT", "NAME") or str(hc) == "void":
+                        info["return_type"] = str(hc)
+                elif hc.data == "func_args":
+                    for arg in hc.children:
+                        if isinstance(arg, Tree):
+                            arg_info = self._func_arg_info(arg.data, self._get_tokens(arg))
+                            if arg_info:
+                                info["args"].append(arg_info)
+                elif hc.data in ("func_typed_return", "type"):
+                    info["return_type"] = " ".join(self._get_tokens(hc))
+            break
+
+        info["approx_complexity"] = self._count_tokens(func_node)
+        info["line"] = first.line if first is not None else None
+        info["end_line"] = self._block_end_line(first.line) if first is not None else None
+        if info["end_line"] is None:
+            last = self._last_token(func_node)
+            info["end_line"] = (last.end_line or last.line) if last is not None else None
         return info
 
     @staticmethod
@@ -226,6 +531,15 @@ class GDScriptAnalyzer:
                 info["value"] = self._clean_expr(" ".join(tokens[1:]))
         return info
 
+    @staticmethod
+    def _unwrap_static(node: "Tree") -> "Tree":
+        """Return the func_def wrapped by a static_func_def node (or the node itself)."""
+        if node.data == "static_func_def":
+            for child in node.children:
+                if isinstance(child, Tree) and child.data == "func_def":
+                    return child
+        return node
+
     def _extract_inner_class(self, class_node) -> dict:
         """Extract inner class info."""
         info = {"name": "?", "extends": None, "functions": [], "variables": []}
@@ -238,8 +552,9 @@ class GDScriptAnalyzer:
                     info["extends"] = self._get_first_token(child)
                 elif child.data == "annotation":
                     pending_annotations.append(self._get_first_token(child))
-                elif child.data == "func_def":
-                    fi = self._extract_func_info(child)
+                elif child.data in ("func_def", "static_func_def"):
+                    fi = self._extract_func_info(self._unwrap_static(child))
+                    fi["is_static"] = child.data == "static_func_def"
                     info["functions"].append(fi)
                     pending_annotations = []
                 elif child.data == "class_var_stmt":
@@ -248,7 +563,7 @@ class GDScriptAnalyzer:
                     pending_annotations = []
         return info
 
-    def _extract_from_tree(self, tree: Tree):
+    def _extract_from_tree(self, tree: "Tree"):
         """Walk the top-level parse tree and extract all components."""
         pending_annotations = []
 
@@ -290,9 +605,9 @@ class GDScriptAnalyzer:
                     self.variables.append(var_info)
                 pending_annotations = []
 
-            elif data == "func_def":
-                func_info = self._extract_func_info(child)
-                if "static" in pending_annotations:
+            elif data in ("func_def", "static_func_def"):
+                func_info = self._extract_func_info(self._unwrap_static(child))
+                if data == "static_func_def" or "static" in pending_annotations:
                     func_info["is_static"] = True
                     self.static_functions.append(func_info)
                 else:
@@ -319,73 +634,224 @@ class GDScriptAnalyzer:
         for match in re.finditer(r'(?:preload|load)\s*\(\s*["\']([^"\']+)["\']\s*\)', self.code):
             self.preloads.append(match.group(1))
 
-    def _fallback_parse(self):
-        """Regex-based fallback when gdtoolkit parser fails."""
-        lines = self.code.split("\n")
-
-        for line in lines:
-            stripped = line.strip()
+    def _outline_parse(self, lines):
+        """Extract declarations from logical lines without building a parse tree.
 
-            m = re.match(r'^class_name\s+(\w+)', stripped)
-            if m:
-                self.class_name = m.group(1)
+        Used for --outline-only and as the fallback when gdtoolkit fails. Function
+        bodies, property getters/setters and lambdas are skipped by indentation;
+        defaults and values are kept as source text.
+        """
+        scopes: list[tuple[int, Optional[dict]]] = []  # (indent, inner class info) for open class bodies
+        block_indent = None  # indent of the declaration whose indented body is being skipped
+        current_func = None
+        pending_annotations = []
 
-            m = re.match(r'^extends\s+(\w+)', stripped)
-            if m:
-                self.extends = m.group(1)
+        for line, end_line, indent, text in lines:
+            if block_indent is not None:
+                if indent > block_indent:
+                    if current_func is not None:
+                        current_func["end_line"] = end_line
+                        current_func["approx_complexity"] += len(_BODY_TOKEN_RE.findall(text))
+                    continue
+                block_indent = current_func = None
+
+            while scopes and indent <= scopes[-1][0]:
+                scopes.pop()
+            in_class = bool(scopes)
+            target = scopes[-1][1] if scopes else None
+
+            while text.startswith("@"):
+                m = _ANNOTATION_RE.match(text)
+                if not m:
+                    break
+                if m.group(1) == "tool" and not in_class:
+                    self.is_tool = True
+                else:
+                    pending_annotations.append(m.group(1))
+                text = text[m.end():]
+            if not text:
+                continue  # annotation on its own line: applies to the next declaration
 
-            if stripped.startswith("@tool") or stripped == "tool":
+            if text == "tool" and not in_class:
                 self.is_tool = True
+                continue
 
-            m = re.match(r'^signal\s+(\w+)(?:\(([^)]*)\))?', stripped)
+            m = _FUNC_RE.match(text)
             if m:
-                sig = {"name": m.group(1), "args": []}
-                if m.group(2):
-                    for arg in m.group(2).split(","):
-                        parts = arg.strip().split(":")
-                        sig["args"].append({
-                            "name": parts[0].strip(),
-                            "type": parts[1].strip() if len(parts) > 1 else None
-                        })
-                self.signals.append(sig)
-
-            m = re.match(r'^@export.*var\s+(\w+)\s*(?::\s*(\w+))?', stripped)
+                func_info = self._outline_func_info(m, text, line, end_line)
+                if target is not None:
+                    func_info["is_static"] = bool(m.group(1))
+                    target["functions"].append(func_info)
+                elif in_class:
+                    pass  # nested inner class: not reported
+                elif m.group(1) or "static" in pending_annotations:
+                    func_info["is_static"] = True
+                    self.static_functions.append(func_info)
+                else:
+                    self.functions.append(func_info)
+                block_indent, current_func = indent, func_info
+                pending_annotations = []
+                continue
+
+            m = _VAR_RE.match(text)
             if m:
-                self.exports.append({"name": m.group(1), "type": m.group(2), "default": None, "annotations": ["export"]})
+                rest = m.group(3)
+                if rest.endswith(":") and not rest.endswith(":="):
+                    # property with get/set block, or a multi-line lambda
+                    rest = rest[:-1]
+                    block_indent = indent
+                var_type, default = _split_declaration(rest)
+                var_info = {"name": m.group(2), "type": var_type, "default": default}
+                if target is not None:
+                    target["variables"].append(var_info)
+                elif not in_class:
+                    var_info["annotations"] = list(pending_annotations)
+                    if "export" in pending_annotations:
+                        self.exports.append(var_info)
+                    elif "onready" in pending_annotations:
+                        self.onready_vars.append(var_info)
+                    else:
+                        self.variables.append(var_info)
+                pending_annotations = []
                 continue
 
-            m = re.match(r'^@onready\s+var\s+(\w+)\s*(?::\s*(\w+))?', stripped)
+            m = _INNER_CLASS_RE.match(text)
             if m:
-                self.onready_vars.append({"name": m.group(1), "type": m.group(2), "default": None, "annotations": ["onready"]})
+                info = None
+                if not in_class:
+                    info = {"name": m.group(1), "extends": m.group(2), "functions": [], "variables": []}
+                    self.inner_classes.append(info)
+                scopes.append((indent, info))
+                pending_annotations = []
                 continue
 
-            m = re.match(r'^var\s+(\w+)\s*(?::\s*(\w+))?', stripped)
+            # Anything else consumes the pending annotations
+            pending_annotations = []
+
+            m = _EXTENDS_RE.match(text)
             if m:
-                self.variables.append({"name": m.group(1), "type": m.group(2), "default": None, "annotations": []})
+                if target is not None:
+                    target["extends"] = m.group(1)
+                elif not in_class:
+                    self.extends = m.group(1)
+                continue
+
+            if in_class:
+                continue
 
-            m = re.match(r'^(?:static\s+)?func\s+(\w+)\s*\(([^)]*)\)\s*(?:->\s*(\w+))?', stripped)
+            m = _CLASS_NAME_RE.match(text)
             if m:
-                args = []
-                if m.group(2).strip():
-                    for arg in m.group(2).split(","):
-                        parts = arg.strip().split(":")
-                        args.append({"name": parts[0].strip(), "type": parts[1].strip() if len(parts) > 1 else None})
-                fi = {"name": m.group(1), "args": args, "return_type": m.group(3), "is_static": "static" in stripped}
-                if fi["is_static"]:
-                    self.static_functions.append(fi)
-                else:
-                    self.functions.append(fi)
+                self.class_name = m.group(1)
+                if m.group(2):
+                    self.extends = m.group(2)
+                continue
 
-            m = re.match(r'^const\s+(\w+)', stripped)
+            m = _SIGNAL_RE.match(text)
             if m:
-                self.constants.append({"name": m.group(1), "type": None, "value": None})
+                args = [self._outline_arg_info(arg) for arg in _split_top_level(m.group(2) or "")]
+                self.signals.append({"name": m.group(1), "args": args})
+                continue
 
-            m = re.match(r'^enum\s+(\w+)', stripped)
+            m = _ENUM_RE.match(text)
             if m:
-                self.enums.append({"name": m.group(1), "values": []})
+                values = [item.partition("=")[0].strip() for item in _split_top_level(m.group(2))]
+                self.enums.append({"name": m.group(1), "values": values})
+                continue
+
+            m = _CONST_RE.match(text)
+            if m:
+                const_type, value = _split_declaration(m.group(2))
+                self.constants.append({"name": m.group(1), "type": const_type, "value": value})
 
         self._extract_preloads()
 
+    @staticmethod
+    def _outline_arg_info(arg: str) -> dict:
+        """Build an argument entry from `name`, `name: Type`, `name := value` or `name = value`."""
+        m = _ARG_RE.match(arg)
+        if not m:
+            return {"name": arg, "type": None}
+        return {"name": m.group(1), "type": _split_declaration(m.group(2))[0]}
+
+    @staticmethod
+    def _outline_func_info(m: re.Match, text: str, line: int, end_line: int) -> dict:
+        """Build function info from a `func name(` match over a logical line."""
+        open_pos = m.end() - 1
+        close_pos = _closing_bracket(text, open_pos)
+        args = [GDScriptAnalyzer._outline_arg_info(arg) for arg in _split_top_level(text[open_pos + 1:close_pos])]
+        ret = _RETURN_TYPE_RE.match(text, close_pos + 1)
+        return {
+            "name": m.group(2), "args": args, "return_type": ret.group(1) if ret else None,
+            "is_static": bool(m.group(1)), "is_coroutine": False,
+            "approx_complexity": len(_BODY_TOKEN_RE.findall(text, close_pos + 1)),
+            "line": line, "end_line": end_line,
+        }
+
+
+# ─────────────────────────────────────────────
+# Godot Text Resource Tokenizer (.tscn / .tres)
+# ─────────────────────────────────────────────
+
+SECTION_TAGS = (b"gd_scene", b"gd_resource", b"ext_resource", b"sub_resource",
+                b"node", b"connection", b"editable", b"resource")
+
+_SECTION_HEADER_RE = re.compile(rb'\[(' + b"|".join(SECTION_TAGS) + rb')(?=[\s\]])(.*)\]\s*$')
+_HEADER_ATTR_RE = re.compile(r'(\w+)=("(?:[^"\\]|\\.)*"|\w+\([^)]*\)|\[[^\]]*\]|[^\s\]]+)')
+_RESOURCE_REF_RE = re.compile(r'^(?:Ext|Sub)Resource\(\s*"?([^")\s]+)"?\s*\)$')
+_QUOTED_ITEM_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+
+def _header_value(raw: str):
+    """Convert a header/property value: strings are unquoted, ExtResource("id") becomes
+    the id, ["a", "b"] becomes a list; anything else is kept as written."""
+    if raw.startswith('"') and raw.endswith('"') and len(raw) >= 2:
+        return raw[1:-1].replace('\\"', '"')
+    if raw.startswith("["):
+        return _QUOTED_ITEM_RE.findall(raw)
+    m = _RESOURCE_REF_RE.match(raw)
+    if m:
+        return m.group(1)
+    return raw
+
+
+def iter_resource_sections(data: bytes, body_keys: tuple[str, ...] = ("script",)):
+    """Tokenize a .tscn/.tres file in a single pass over its section headers.
+
+    Yields (tag, attrs, props) for every `[tag key=value ...]` header. Property
+    bodies are not decoded: the scanner jumps from header to header with
+    bytes.find(), and only looks up the `body_keys` properties inside each body.
+    """
+    size = len(data)
+    pos = 0 if data.startswith(b"[") else data.find(b"\n[") + 1
+    if pos == 0 and not data.startswith(b"["):
+        return
+    needles = [(key, b"\n" + key.encode() + b" = ") for key in body_keys]
+
+    while True:
+        eol = data.find(b"\n", pos)
+        if eol < 0:
+            eol = size
+        next_header = data.find(b"\n[", eol)
+        body_end = size if next_header < 0 else next_header
+
+        m = _SECTION_HEADER_RE.match(data, pos, eol)
+        if m:
+            attrs = {key: _header_value(value) for key, value in
+                     _HEADER_ATTR_RE.findall(m.group(2).decode("utf-8", "replace"))}
+            props = {}
+            for key, needle in needles:
+                start = data.find(needle, eol, body_end)
+                if start >= 0:
+                    value_start = start + len(needle)
+                    value_end = data.find(b"\n", value_start, body_end)
+                    raw = data[value_start:body_end if value_end < 0 else value_end]
+                    props[key] = _header_value(raw.decode("utf-8", "replace").strip())
+            yield m.group(1).decode(), attrs, props
+
+        if next_header < 0:
+            break
+        pos = next_header + 1
+
 
 # ─────────────────────────────────────────────
 # Scene (.tscn) Parser
@@ -394,6 +860,11 @@ class GDScriptAnalyzer:
 class TscnParser:
     """Parses a Godot .tscn file to extract scene structure."""
 
+    SUMMARY_FIELDS = (
+        "filepath", "nodes", "ext_resources", "sub_resources", "connections",
+        "root_type", "root_name", "script_path", "error",
+    )
+
     def __init__(self, filepath: str):
         self.filepath = filepath
         self.nodes: list[dict] = []
@@ -407,75 +878,71 @@ class TscnParser:
 
         self._parse()
 
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.SUMMARY_FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TscnParser":
+        scene = cls.__new__(cls)
+        for field in cls.SUMMARY_FIELDS:
+            setattr(scene, field, data[field])
+        return scene
+
     def _parse(self):
         try:
-            with open(self.filepath, "r", encoding="utf-8", errors="replace") as f:
-                content = f.read()
+            with open(self.filepath, "rb") as f:
+                data = f.read()
         except Exception as e:
             self.error = str(e)
             return
 
-        # Parse ext_resource entries
-        for m in re.finditer(
-            r'\[ext_resource\s+(?:type="([^"]*)")?\s*(?:path="([^"]*)")?\s*(?:uid="[^"]*")?\s*(?:id="([^"]*)")?\]',
-            content
-        ):
-            self.ext_resources.append({
-                "type": m.group(1),
-                "path": m.group(2),
-                "id": m.group(3)
-            })
-
-        # Also handle different ordering of attributes
-        for m in re.finditer(
-            r'\[ext_resource\s+path="([^"]*)"\s+type="([^"]*)"\s+id=(\S+)\]',
-            content
-        ):
-            self.ext_resources.append({
-                "type": m.group(2),
-                "path": m.group(1),
-                "id": m.group(3)
-            })
-
-        # Parse sub_resource entries
-        for m in re.finditer(r'\[sub_resource\s+type="([^"]*)"', content):
-            self.sub_resources.append({"type": m.group(1)})
-
-        # Parse node entries
-        for m in re.finditer(
-            r'\[node\s+([^\]]+)\]',
-            content
-        ):
-            attrs_str = m.group(1)
-            node = {}
-            for attr_m in re.finditer(r'(\w+)="([^"]*)"', attrs_str):
-                node[attr_m.group(1)] = attr_m.group(2)
-
-            self.nodes.append(node)
+        for tag, attrs, props in iter_resource_sections(data):
+            if tag == "ext_resource":
+                self.ext_resources.append({
+                    "type": attrs.get("type"),
+                    "path": attrs.get("path"),
+                    "id": attrs.get("id"),
+                    "uid": attrs.get("uid"),
+                })
+            elif tag == "sub_resource":
+                self.sub_resources.append({"type": attrs.get("type"), "id": attrs.get("id")})
+            elif tag == "node":
+                node = dict(attrs)
+                if "script" in props:
+                    node["script"] = props["script"]
+                self.nodes.append(node)
+            elif tag == "connection":
+                self.connections.append({
+                    "signal": attrs.get("signal"),
+                    "from": attrs.get("from"),
+                    "to": attrs.get("to"),
+                    "method": attrs.get("method"),
+                })
+
+        # Resolve ExtResource ids on nodes to resource paths
+        ext_paths = {res["id"]: res["path"] for res in self.ext_resources}
+        for node in self.nodes:
+            if "instance" in node:
+                node["instance_path"] = ext_paths.get(node["instance"])
+            if "script" in node:
+                # Ids that are not ext_resources point at built-in (sub_resource) scripts
+                node["script_path"] = ext_paths.get(node["script"], "(built-in)")
 
         # Identify root
         if self.nodes:
             root = self.nodes[0]
             self.root_type = root.get("type", "?")
             self.root_name = root.get("name", "?")
+            # Script attached to root
+            self.script_path = root.get("script_path")
 
-        # Find script attached to root
-        for res in self.ext_resources:
-            if res.get("type") in ("Script", "GDScript"):
-                self.script_path = res.get("path")
-                break
-
-        # Parse connections
-        for m in re.finditer(
-            r'\[connection\s+signal="([^"]*)"\s+from="([^"]*)"\s+to="([^"]*)"\s+method="([^"]*)"',
-            content
-        ):
-            self.connections.append({
-                "signal": m.group(1),
-                "from": m.group(2),
-                "to": m.group(3),
-                "method": m.group(4)
-            })
+    @staticmethod
+    def node_path(node: dict) -> str:
+        """NodePath of a node relative to the scene root ("." for the root)."""
+        parent = node.get("parent")
+        if parent is None:
+            return "."
+        return node.get("name", "?") if parent == "." else f"{parent}/{node.get('name', '?')}"
 
     def get_node_tree_text(self, indent=2) -> str:
         """Build a visual tree representation of the scene nodes."""
@@ -499,15 +966,64 @@ class TscnParser:
 
             prefix = " " * indent * depth + ("└─ " if depth > 0 else "")
             type_label = f" ({type_})" if type_ else ""
-            inst_label = f" [Instance]" if instance else ""
+            inst_label = ""
+            if instance:
+                inst_label = f" [Instance: {node['instance_path']}]" if node.get("instance_path") else " [Instance]"
 
             # Check if this node has a script
-            script_label = ""
+            script_label = f" [Script: {node['script_path']}]" if node.get("script_path") else ""
             lines.append(f"{prefix}{name}{type_label}{inst_label}{script_label}")
 
         return "\n".join(lines)
 
 
+# ─────────────────────────────────────────────
+# Scene Instancing Graph
+# ─────────────────────────────────────────────
+
+def res_path(relpath: str) -> str:
+    """Project-relative path -> res:// path."""
+    return "res://" + relpath.replace(os.sep, "/")
+
+
+class SceneGraph:
+    """Resolved scene-instancing and script-attachment graph across all scenes.
+
+    Built in a single pass over every scene's nodes (linear in the number of
+    nodes and ext_resources). All keys and values are res:// paths.
+    """
+
+    def __init__(self, tscn_files: dict[str, TscnParser]):
+        self.instances: dict[str, list[str]] = {}       # scene -> scenes it instances
+        self.instanced_by: dict[str, list[str]] = defaultdict(list)
+        self.scripts: dict[str, list[dict]] = {}        # scene -> [{"node", "script"}]
+        self.script_users: dict[str, list[str]] = defaultdict(list)
+
+        for relpath, scene in tscn_files.items():
+            scene_res = res_path(relpath)
+            instances, scripts = [], []
+            for node in scene.nodes:
+                target = node.get("instance_path")
+                if target and target not in instances:
+                    instances.append(target)
+                    self.instanced_by[target].append(scene_res)
+                script = node.get("script_path")
+                if script:
+                    scripts.append({"node": TscnParser.node_path(node), "script": script})
+                    if scene_res not in self.script_users[script]:
+                        self.script_users[script].append(scene_res)
+            self.instances[scene_res] = instances
+            self.scripts[scene_res] = scripts
+
+    def to_dict(self) -> dict:
+        return {
+            "instances": {k: v for k, v in sorted(self.instances.items()) if v},
+            "instanced_by": dict(sorted(self.instanced_by.items())),
+            "scripts": {k: v for k, v in sorted(self.scripts.items()) if v},
+            "script_users": dict(sorted(self.script_users.items())),
+        }
+
+
 # ─────────────────────────────────────────────
 # Resource (.tres) Parser
 # ─────────────────────────────────────────────
@@ -515,6 +1031,8 @@ class TscnParser:
 class TresParser:
     """Parses a .tres file header to identify resource type."""
 
+    SUMMARY_FIELDS = ("filepath", "resource_type", "class_name", "script_path")
+
     def __init__(self, filepath: str):
         self.filepath = filepath
         self.resource_type: Optional[str] = None
@@ -523,40 +1041,290 @@ class TresParser:
 
         self._parse()
 
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.SUMMARY_FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TresParser":
+        resource = cls.__new__(cls)
+        for field in cls.SUMMARY_FIELDS:
+            setattr(resource, field, data[field])
+        return resource
+
     def _parse(self):
         try:
-            with open(self.filepath, "r", encoding="utf-8", errors="replace") as f:
-                # Only read first 20 lines
-                header_lines = []
-                for i, line in enumerate(f):
-                    if i > 30:
-                        break
-                    header_lines.append(line)
-                header = "".join(header_lines)
+            with open(self.filepath, "rb") as f:
+                data = f.read()
         except Exception:
             return
 
-        m = re.search(r'\[gd_resource\s+type="([^"]*)"', header)
-        if m:
-            self.resource_type = m.group(1)
+        ext_paths = {}
+        for tag, attrs, props in iter_resource_sections(data):
+            if tag == "gd_resource":
+                self.resource_type = attrs.get("type")
+                # Godot 4 writes the custom class as script_class
+                self.class_name = attrs.get("script_class") or attrs.get("class_name")
+            elif tag == "ext_resource":
+                ext_paths[attrs.get("id")] = attrs.get("path")
+            elif tag == "resource" and "script" in props:
+                self.script_path = ext_paths.get(props["script"], props["script"])
 
-        m = re.search(r'class_name\s*=\s*"([^"]*)"', header)
-        if m:
-            self.class_name = m.group(1)
 
-        m = re.search(r'script/source\s*=\s*"([^"]*)"', header)
-        if m:
-            self.script_path = m.group(1)
+# ─────────────────────────────────────────────
+# Cross-Reference Index
+# ─────────────────────────────────────────────
 
-        m = re.search(r'script\s*=\s*ExtResource\(\s*"([^"]*)"\s*\)', header)
-        if m:
-            self.script_path = m.group(1)
+def rel_path(path: str) -> Optional[str]:
+    """res:// path -> project-relative path (None for other schemes, e.g. uid:// or built-ins)."""
+    if not path or not path.startswith("res://"):
+        return None
+    return os.path.normpath(path[len("res://"):])
+
+
+class CrossReference:
+    """Signal and dependency cross-reference, built once per model change.
+
+    Signals are keyed by (defining script, signal name), so same-named signals
+    declared in different scripts never collide. Scene connections are resolved
+    to the script that emits them (through attached scripts, instanced scenes
+    and the extends chain) and to the script and method that receive them.
+
+    Dependencies are file -> file edges between project-relative paths, kept in
+    both directions so "who depends on X" is a single dict lookup:
+        extends    script -> base script (class_name or path)
+        preload    script -> preloaded/loaded file
+        instance   scene -> instanced scene
+        script     scene/resource -> attached script
+        resource   scene -> other external resource
+        signal     scene -> script declaring a signal it connects to
+    """
+
+    def __init__(self, gd_files: dict[str, GDScriptAnalyzer], tscn_files: dict[str, TscnParser],
+                 tres_files: dict[str, TresParser], class_name_map: dict[str, str], scene_graph: SceneGraph):
+        self.gd_files = gd_files
+        self.tscn_files = tscn_files
+        self.class_name_map = class_name_map
+        self.scene_graph = scene_graph
+
+        self.signals: dict[tuple[str, str], dict] = {}                         # (script, signal) -> declaration
+        self.signal_connections: dict[tuple[str, str], list[dict]] = defaultdict(list)
+        self.signal_scenes: dict[tuple[str, str], list[str]] = defaultdict(list)
+        self.signal_targets: dict[tuple[str, str], list[tuple[Optional[str], str]]] = defaultdict(list)
+        self.unresolved_connections: list[dict] = []  # built-in signals or nodes we cannot type
+        self.dependencies: dict[str, list[tuple[str, str]]] = defaultdict(list)  # file -> [(kind, target)]
+        self.dependents: dict[str, list[tuple[str, str]]] = defaultdict(list)    # file -> [(kind, source)]
+
+        self._extends: dict[str, Optional[str]] = {}
+        self._scene_nodes: dict[str, dict[str, dict]] = {}
+
+        for relpath, gd in gd_files.items():
+            for sig in gd.signals:
+                self.signals[(relpath, sig["name"])] = sig
+            base = self.base_script(relpath)
+            if base:
+                self._link(relpath, "extends", base)
+            for target in gd.preloads:
+                self._link(relpath, "preload", rel_path(target))
+
+        for relpath, tres in tres_files.items():
+            self._link(relpath, "script", rel_path(tres.script_path))
+
+        for relpath, scene in tscn_files.items():
+            scene_res = res_path(relpath)
+            instanced = {rel_path(target) for target in scene_graph.instances.get(scene_res, [])}
+            for res in scene.ext_resources:
+                target = rel_path(res.get("path"))
+                if target in instanced:
+                    kind = "instance"
+                elif res.get("type") in ("Script", "GDScript"):
+                    kind = "script"
+                else:
+                    kind = "resource"
+                self._link(relpath, kind, target)
+            for conn in scene.connections:
+                self._add_connection(relpath, conn)
+
+    def _link(self, source: str, kind: str, target: Optional[str]):
+        if not target or target == source or (kind, target) in self.dependencies[source]:
+            return
+        self.dependencies[source].append((kind, target))
+        self.dependents[target].append((kind, source))
+
+    def base_script(self, relpath: str) -> Optional[str]:
+        """Project script a script extends (by class_name or path), if any."""
+        if relpath not in self._extends:
+            gd = self.gd_files.get(relpath)
+            base = gd.extends.strip("\"'") if gd and gd.extends else None
+            self._extends[relpath] = rel_path(base) if base and base.startswith("res://") \
+                else self.class_name_map.get(base)
+        return self._extends[relpath]
+
+    def signal_owner(self, script: Optional[str], name: str) -> Optional[str]:
+        """Script declaring signal `name` for instances of `script`, following extends."""
+        seen = set()
+        while script and script not in seen:
+            if (script, name) in self.signals:
+                return script
+            seen.add(script)
+            script = self.base_script(script)
+        return None
+
+    def node_script(self, scene_relpath: str, node_path: str, _depth: int = 0) -> Optional[str]:
+        """Script attached to the node at `node_path` in a scene, looking into instanced scenes."""
+        if _depth > 32:  # instancing cycle
+            return None
+        nodes = self._scene_nodes.get(scene_relpath)
+        if nodes is None:
+            scene = self.tscn_files.get(scene_relpath)
+            nodes = {TscnParser.node_path(node): node for node in scene.nodes} if scene else {}
+            self._scene_nodes[scene_relpath] = nodes
+
+        # Longest prefix that is a node of this scene; the rest lives in an instanced scene
+        parts = [] if node_path in (".", "") else node_path.split("/")
+        for cut in range(len(parts), -1, -1):
+            node = nodes.get("/".join(parts[:cut]) or ".")
+            if node is None:
+                continue
+            if cut == len(parts) and node.get("script_path"):
+                return rel_path(node["script_path"])
+            instance = rel_path(node.get("instance_path"))
+            if instance:
+                return self.node_script(instance, "/".join(parts[cut:]) or ".", _depth + 1)
+            return None
+        return None
+
+    def _add_connection(self, scene_relpath: str, conn: dict):
+        emitter = self.signal_owner(self.node_script(scene_relpath, conn.get("from") or "."), conn.get("signal"))
+        target = self.node_script(scene_relpath, conn.get("to") or ".")
+        record = {**conn, "scene": scene_relpath, "emitter": emitter, "target_script": target}
+        if emitter is None:
+            self.unresolved_connections.append(record)
+            return
+        key = (emitter, conn["signal"])
+        self.signal_connections[key].append(record)
+        if scene_relpath not in self.signal_scenes[key]:
+            self.signal_scenes[key].append(scene_relpath)
+        if (target, conn.get("method")) not in self.signal_targets[key]:
+            self.signal_targets[key].append((target, conn.get("method")))
+        self._link(scene_relpath, "signal", emitter)
+
+    def impact(self, changed: list[str]) -> dict[str, tuple[str, str, int]]:
+        """Files transitively affected by changing `changed` (see transitive_dependents)."""
+        return transitive_dependents(self.dependents, changed)
+
+    def to_dict(self) -> dict:
+        return {
+            "signals": [
+                {"script": script, "signal": name,
+                 "scenes": self.signal_scenes.get((script, name), []),
+                 "targets": [{"script": t, "method": m} for t, m in self.signal_targets.get((script, name), [])]}
+                for script, name in sorted(self.signals)
+            ],
+            "unresolved_connections": [
+                {k: conn.get(k) for k in ("scene", "signal", "from", "to", "method", "target_script")}
+                for conn in self.unresolved_connections
+            ],
+            "dependencies": {k: [list(edge) for edge in v] for k, v in sorted(self.dependencies.items()) if v},
+            "dependents": {k: [list(edge) for edge in v] for k, v in sorted(self.dependents.items())},
+        }
+
+
+def transitive_dependents(dependents: dict[str, list], changed: list[str]) -> dict[str, tuple[str, str, int]]:
+    """Breadth-first closure over a reverse-dependency map.
+
+    `dependents` maps a file to its (kind, source) edges, as in CrossReference
+    or the index's "xref" block. Returns affected file -> (edge kind, file it was
+    reached from, distance from the change set); changed files are not included.
+    """
+    seen = set(changed)
+    affected = {}
+    frontier = list(dict.fromkeys(changed))
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for path in frontier:
+            for kind, source in dependents.get(path, ()):
+                if source not in seen:
+                    seen.add(source)
+                    affected[source] = (kind, path, depth)
+                    next_frontier.append(source)
+        frontier = next_frontier
+    return affected
 
 
 # ─────────────────────────────────────────────
 # Project Configuration Parser
 # ─────────────────────────────────────────────
 
+_QUOTED_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_STRING_TAIL_RE = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"')
+
+
+def iter_project_settings(lines):
+    """Tokenize project.godot (Godot's INI-like ConfigFile format) in one linear pass.
+
+    Yields (section, key, raw_value) tuples. Keys before the first [section]
+    belong to section "". Values spanning several lines (dictionaries, arrays,
+    Object(...) lists) are joined until their brackets are balanced.
+    """
+    section = ""
+    key = None
+    value_parts: list[str] = []
+    depth = 0
+    in_string = False  # inside a string value that continues on the next line
+
+    for line in lines:
+        if key is None:
+            stripped = line.strip()
+            if not stripped or stripped[0] in ";#":
+                continue
+            if stripped[0] == "[" and stripped[-1] == "]":
+                section = stripped[1:-1].strip()
+                continue
+            eq = stripped.find("=")
+            if eq < 0:
+                continue
+            key = stripped[:eq].strip()
+            chunk = stripped[eq + 1:].strip()
+        else:
+            chunk = line.rstrip("\r\n")
+
+        # Track bracket depth outside of strings to find where the value ends
+        rest = chunk
+        if in_string:
+            m = _STRING_TAIL_RE.match(chunk)
+            if m is None:
+                value_parts.append(chunk)
+                continue
+            in_string = False
+            rest = chunk[m.end():]
+        bare = _QUOTED_RE.sub("", rest)
+        quote = bare.find('"')
+        if quote >= 0:
+            in_string = True
+            bare = bare[:quote]
+        depth += (bare.count("{") + bare.count("[") + bare.count("(")
+                  - bare.count("}") - bare.count("]") - bare.count(")"))
+
+        value_parts.append(chunk)
+        if depth <= 0 and not in_string:
+            yield section, key, "\n".join(value_parts)
+            key = None
+            value_parts = []
+            depth = 0
+
+    if key is not None:
+        yield section, key, "\n".join(value_parts)
+
+
+def unquote_setting(value: str) -> str:
+    """Strip the quotes from a string setting value."""
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
 class ProjectConfigParser:
     """Parses project.godot to extract project settings."""
 
@@ -569,6 +1337,7 @@ class ProjectConfigParser:
         self.input_actions: list[str] = []
         self.features: list[str] = []
         self.render_method = None
+        self.sections: dict[str, dict[str, str]] = {}  # section -> key -> raw value
 
         self._parse()
 
@@ -579,48 +1348,639 @@ class ProjectConfigParser:
 
         try:
             with open(config_path, "r", encoding="utf-8", errors="replace") as f:
-                content = f.read()
+                for section, key, value in iter_project_settings(f):
+                    self.sections.setdefault(section, {})[key] = value
         except Exception:
             return
 
+        application = self.sections.get("application", {})
+
         # Project name
-        m = re.search(r'config/name="([^"]*)"', content)
-        if m:
-            self.project_name = m.group(1)
+        if "config/name" in application:
+            self.project_name = unquote_setting(application["config/name"])
 
         # Main scene
-        m = re.search(r'run/main_scene="([^"]*)"', content)
-        if m:
-            self.main_scene = m.group(1)
+        if "run/main_scene" in application:
+            self.main_scene = unquote_setting(application["run/main_scene"])
 
         # Godot features / version hints
-        for fm in re.finditer(r'config/features=PackedStringArray\(([^)]+)\)', content):
-            features_str = fm.group(1)
-            self.features = [f.strip().strip('"') for f in features_str.split(",")]
+        m = re.match(r'PackedStringArray\(([^)]+)\)', application.get("config/features", ""))
+        if m:
+            self.features = [f.strip().strip('"') for f in m.group(1).split(",")]
 
         # Renderer
-        m = re.search(r'rendering/renderer/rendering_method(?:\.mobile)?="([^"]*)"', content)
-        if m:
-            self.render_method = m.group(1)
-
-        # Autoloads
-        for m in re.finditer(r'(\w+)="\*?res://([^"]*)"', content):
-            section_before = content[:m.start()]
-            if "[autoload]" in section_before:
-                last_section = re.findall(r'\[([^\]]+)\]', section_before)
-                if last_section and last_section[-1] == "autoload":
-                    self.autoloads.append({
-                        "name": m.group(1),
-                        "path": "res://" + m.group(2)
-                    })
+        rendering = self.sections.get("rendering", {})
+        for key in ("renderer/rendering_method", "renderer/rendering_method.mobile"):
+            if key in rendering:
+                self.render_method = unquote_setting(rendering[key])
+                break
+
+        # Autoloads ("*" prefix marks autoloads registered as singletons)
+        for name, value in self.sections.get("autoload", {}).items():
+            path = unquote_setting(value).lstrip("*")
+            if path.startswith("res://"):
+                self.autoloads.append({"name": name, "path": path})
 
         # Input map actions
-        for m in re.finditer(r'^(\w+)=\{', content, re.MULTILINE):
-            section_before = content[:m.start()]
-            if "[input]" in section_before:
-                last_section = re.findall(r'\[([^\]]+)\]', section_before)
-                if last_section and last_section[-1] == "input":
-                    self.input_actions.append(m.group(1))
+        for name, value in self.sections.get("input", {}).items():
+            if value.startswith("{"):
+                self.input_actions.append(name)
+
+
+# ─────────────────────────────────────────────
+# File Analysis Workers
+# ─────────────────────────────────────────────
+
+ANALYZERS = {
+    ".gd": GDScriptAnalyzer,
+    ".tscn": TscnParser,
+    ".tres": TresParser,
+}
+
+
+def analyze_file(task: tuple[str, str, str], outline_only: bool = False) -> tuple[str, str, Optional[dict]]:
+    """Analyze one project file and return a picklable (ext, relpath, summary) tuple.
+
+    Module-level so it can be sent to a process pool. The summary is None when
+    the file could not be read. With outline_only, scripts go through the
+    declaration scanner instead of the full gdtoolkit parse.
+    """
+    ext, filepath, relpath = task
+    if ext == ".gd":
+        try:
+            with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+                code = f.read()
+        except Exception:
+            return ext, relpath, None
+        return ext, relpath, GDScriptAnalyzer(relpath, code, outline_only).to_dict()
+    return ext, relpath, ANALYZERS[ext](filepath).to_dict()
+
+
+def _init_worker(outline_only: bool):
+    """Process pool initializer: load the GDScript parser before any file is analyzed."""
+    if not outline_only:
+        with contextlib.suppress(ImportError):
+            load_gdparser().parse("")
+
+
+def analyze_file_timed(task: tuple[str, str, str], outline_only: bool = False) -> tuple[str, str, Optional[dict], float]:
+    """analyze_file() plus the time it took, for --profile."""
+    start = time.perf_counter()
+    return (*analyze_file(task, outline_only), time.perf_counter() - start)
+
+
+# ─────────────────────────────────────────────
+# Parse Cache
+# ─────────────────────────────────────────────
+
+# Bump whenever analyzer output changes, so stale summaries are never reused
+CACHE_FORMAT_VERSION = 5
+
+
+@lru_cache(maxsize=None)
+def gdtoolkit_version() -> str:
+    # Read the version from the dist-info directory name first: importing
+    # importlib.metadata alone costs more than the rest of a cached run.
+    for entry in sys.path:
+        try:
+            names = os.listdir(entry or ".")
+        except OSError:
+            continue
+        for name in names:
+            if name.startswith("gdtoolkit-") and name.endswith(".dist-info"):
+                return name[len("gdtoolkit-"):-len(".dist-info")]
+    try:
+        from importlib.metadata import version
+        return version("gdtoolkit")
+    except Exception:
+        return "4.x"
+
+
+def analyzer_key(outline_only: bool = False) -> str:
+    """Identify the analyzer producing summaries: stored data from another key is stale."""
+    key = f"{CACHE_FORMAT_VERSION}/gdtoolkit-{gdtoolkit_version()}"
+    return key + "/outline" if outline_only else key
+
+
+def file_digest(filepath: str) -> Optional[str]:
+    """Content hash used to validate cache entries (None if unreadable)."""
+    try:
+        with open(filepath, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class AnalysisCache:
+    """On-disk cache of analyzer summaries, keyed by file content hash.
+
+    Entries are stored per relative path together with the hash of the file they
+    were extracted from; an entry is only reused when the hash still matches. The
+    whole cache is dropped when the format or the gdtoolkit version changes.
+    """
+
+    FILENAME = "analysis_cache.json"
+    OUTLINE_FILENAME = "analysis_cache.outline.json"
+
+    def __init__(self, cache_dir: str, outline_only: bool = False):
+        self.cache_dir = cache_dir
+        # Outline summaries live in their own file so switching modes does not thrash the cache
+        self.path = os.path.join(cache_dir, self.OUTLINE_FILENAME if outline_only else self.FILENAME)
+        self.key = analyzer_key(outline_only)
+        self.entries: dict[str, dict] = {}  # relpath -> {"hash": ..., "summary": ...}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get("key") == self.key:
+            self.entries = data.get("entries", {})
+        else:
+            self._dirty = True
+
+    def get(self, relpath: str, digest: Optional[str]) -> Optional[dict]:
+        entry = self.entries.get(relpath)
+        if digest is not None and entry and entry.get("hash") == digest:
+            self.hits += 1
+            return entry["summary"]
+        self.misses += 1
+        return None
+
+    def put(self, relpath: str, digest: Optional[str], summary: Optional[dict]):
+        if digest is None or summary is None:
+            return
+        self.entries[relpath] = {"hash": digest, "summary": summary}
+        self._dirty = True
+
+    def prune(self, live_relpaths: set[str]):
+        """Evict entries for files that no longer exist in the project."""
+        stale = [relpath for relpath in self.entries if relpath not in live_relpaths]
+        for relpath in stale:
+            del self.entries[relpath]
+        if stale:
+            self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": self.key, "entries": self.entries}, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+# ─────────────────────────────────────────────
+# Incremental State (git)
+# ─────────────────────────────────────────────
+
+def git_output(args: list[str], cwd: str) -> Optional[str]:
+    """Run a git command in cwd and return its stdout, or None if git fails."""
+    try:
+        return subprocess.check_output(["git", *args], cwd=cwd, stderr=subprocess.DEVNULL).decode("utf-8", "replace")
+    except Exception:
+        return None
+
+
+def walk_order_key(relpath: str) -> tuple:
+    """Sort key reproducing the scan() walk order: files before subdirectories, by name."""
+    parts = Path(relpath).parts
+    return tuple((1, part) for part in parts[:-1]) + ((0, parts[-1]),)
+
+
+# ─────────────────────────────────────────────
+# Architecture Index (JSON / MessagePack)
+# ─────────────────────────────────────────────
+
+INDEX_FORMAT = "godot-archi-index"
+# Bump on any incompatible change to the index layout
+INDEX_FORMAT_VERSION = 2
+MSGPACK_EXTENSIONS = (".msgpack", ".mpk")
+
+
+def _import_msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise RuntimeError("MessagePack index needs msgpack: pip install msgpack") from None
+    return msgpack
+
+
+def write_index(index: dict, path: str):
+    """Write an index as compact JSON, or MessagePack for *.msgpack / *.mpk paths."""
+    tmp_path = path + ".tmp"
+    if path.lower().endswith(MSGPACK_EXTENSIONS):
+        msgpack = _import_msgpack()
+        with open(tmp_path, "wb") as f:
+            f.write(msgpack.packb(index, use_bin_type=True))
+    else:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def load_index(path: str) -> dict:
+    """Load an index written by write_index(), checking its format and version."""
+    if path.lower().endswith(MSGPACK_EXTENSIONS):
+        msgpack = _import_msgpack()
+        with open(path, "rb") as f:
+            index = msgpack.unpackb(f.read(), raw=False)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+
+    if index.get("format") != INDEX_FORMAT:
+        raise ValueError(f"{path} is not a {INDEX_FORMAT} file")
+    if index.get("version") != INDEX_FORMAT_VERSION:
+        raise ValueError(f"{path} has index version {index.get('version')}, expected {INDEX_FORMAT_VERSION}")
+    return index
+
+
+# ─────────────────────────────────────────────
+# Symbol Database (SQLite)
+# ─────────────────────────────────────────────
+
+class SymbolDatabase:
+    """Indexed SQLite view of the analyzer output, updated incrementally by file hash.
+
+    Example queries:
+        -- who connects to event_closed?
+        SELECT scene, from_node, to_node, method FROM connections WHERE signal = 'event_closed';
+        -- which scenes instance player.tscn?
+        SELECT scene FROM ext_resources WHERE path = 'res://objects/player/player.tscn';
+        -- where is class_name Player declared?
+        SELECT path FROM class_names WHERE class_name = 'Player';
+        -- what depends directly on player.gd?
+        SELECT source, kind FROM dependencies WHERE target = 'objects/player/player.gd';
+        -- which handlers receive player.gd's dive_landed?
+        SELECT scene, target_script, method FROM signal_links
+            WHERE emitter = 'objects/player/player.gd' AND signal = 'dive_landed';
+    """
+
+    # Bump when the schema or the stored columns change; the database is then rebuilt
+    SCHEMA_VERSION = 3
+
+    SCHEMA = """
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE files (path TEXT PRIMARY KEY, kind TEXT NOT NULL, hash TEXT);
+        CREATE TABLE scripts (
+            path TEXT PRIMARY KEY, class_name TEXT, extends TEXT, is_tool INTEGER, error TEXT
+        );
+        CREATE INDEX idx_scripts_class_name ON scripts (class_name);
+        CREATE INDEX idx_scripts_extends ON scripts (extends);
+        CREATE VIEW class_names AS
+            SELECT class_name, path FROM scripts WHERE class_name IS NOT NULL;
+        CREATE TABLE functions (
+            path TEXT NOT NULL, name TEXT NOT NULL, args TEXT, return_type TEXT,
+            is_static INTEGER, complexity INTEGER, line INTEGER, end_line INTEGER
+        );
+        CREATE INDEX idx_functions_name ON functions (name);
+        CREATE INDEX idx_functions_path ON functions (path);
+        CREATE TABLE signals (path TEXT NOT NULL, name TEXT NOT NULL, args TEXT);
+        CREATE INDEX idx_signals_name ON signals (name);
+        CREATE INDEX idx_signals_path ON signals (path);
+        CREATE TABLE connections (
+            scene TEXT NOT NULL, signal TEXT, from_node TEXT, to_node TEXT, method TEXT
+        );
+        CREATE INDEX idx_connections_signal ON connections (signal);
+        CREATE INDEX idx_connections_method ON connections (method);
+        CREATE INDEX idx_connections_scene ON connections (scene);
+        CREATE TABLE ext_resources (scene TEXT NOT NULL, res_id TEXT, type TEXT, path TEXT);
+        CREATE INDEX idx_ext_resources_path ON ext_resources (path);
+        CREATE INDEX idx_ext_resources_scene ON ext_resources (scene);
+        CREATE TABLE preloads (path TEXT NOT NULL, target TEXT NOT NULL);
+        CREATE INDEX idx_preloads_target ON preloads (target);
+        CREATE INDEX idx_preloads_path ON preloads (path);
+        CREATE TABLE dependencies (source TEXT NOT NULL, kind TEXT NOT NULL, target TEXT NOT NULL);
+        CREATE INDEX idx_dependencies_source ON dependencies (source);
+        CREATE INDEX idx_dependencies_target ON dependencies (target);
+        CREATE TABLE signal_links (
+            emitter TEXT NOT NULL, signal TEXT NOT NULL, scene TEXT NOT NULL,
+            from_node TEXT, to_node TEXT, target_script TEXT, method TEXT
+        );
+        CREATE INDEX idx_signal_links_signal ON signal_links (emitter, signal);
+        CREATE INDEX idx_signal_links_target ON signal_links (target_script, method);
+    """
+
+    # Tables holding per-file rows, with the column naming the owning file
+    FILE_TABLES = {
+        "scripts": "path", "functions": "path", "signals": "path", "preloads": "path",
+        "connections": "scene", "ext_resources": "scene",
+    }
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self._ensure_schema()
+
+    def close(self):
+        self.conn.close()
+
+    def _ensure_schema(self):
+        try:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        except sqlite3.DatabaseError:
+            row = None
+        if row and row[0] == str(self.SCHEMA_VERSION):
+            return
+
+        # Unknown or outdated layout: drop everything and recreate
+        try:
+            with self.conn:
+                objects = self.conn.execute(
+                    "SELECT type, name FROM sqlite_master WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%'"
+                ).fetchall()
+                for obj_type, name in objects:
+                    self.conn.execute(f'DROP {obj_type.upper()} IF EXISTS "{name}"')
+                self.conn.executescript(self.SCHEMA)
+                self.conn.execute("INSERT INTO meta (key, value) VALUES ('schema_version', ?)",
+                                  (str(self.SCHEMA_VERSION),))
+        except sqlite3.DatabaseError as e:
+            # Not a SQLite file (or a corrupt one): never overwrite what might be someone's data
+            self.conn.close()
+            raise ValueError(f"'{self.db_path}' is not a usable SQLite database ({e}); "
+                             f"remove it or pick another --db path") from e
+
+    def sync(self, generator: "ArchitectureGenerator") -> tuple[int, int]:
+        """Bring the database in line with the generator's model.
+
+        Only files whose content hash changed are rewritten; rows of files that
+        disappeared are deleted. When the analyzer differs from the one that
+        filled the database (outline vs full mode, new format version), every
+        file is rewritten. Returns (updated, removed) file counts.
+        """
+        key = analyzer_key(generator.outline_only)
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'analyzer'").fetchone()
+        known = dict(self.conn.execute("SELECT path, hash FROM files")) if row and row[0] == key else {}
+        stored = [path for (path,) in self.conn.execute("SELECT path FROM files")]
+        current = {}
+        for kind, files in (("script", generator.gd_files), ("scene", generator.tscn_files),
+                            ("resource", generator.tres_files)):
+            for relpath in files:
+                digest = generator.file_hashes.get(relpath) or file_digest(
+                    os.path.join(generator.project_path, relpath))
+                current[relpath] = (kind, digest)
+
+        removed = [relpath for relpath in stored if relpath not in current]
+        updated = [relpath for relpath, (_, digest) in current.items()
+                   if digest is None or known.get(relpath) != digest]
+
+        with self.conn:
+            for relpath in removed + updated:
+                self._delete_file(relpath)
+            for relpath in updated:
+                kind, digest = current[relpath]
+                self.conn.execute("INSERT INTO files (path, kind, hash) VALUES (?, ?, ?)", (relpath, kind, digest))
+                if kind == "script":
+                    self._insert_script(relpath, generator.gd_files[relpath])
+                elif kind == "scene":
+                    self._insert_scene(relpath, generator.tscn_files[relpath])
+            if updated or removed:
+                self._insert_xref(generator.xref)
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('analyzer', ?)", (key,))
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('updated', ?)",
+                              (datetime.now().isoformat(timespec="seconds"),))
+
+        return len(updated), len(removed)
+
+    def _delete_file(self, relpath: str):
+        self.conn.execute("DELETE FROM files WHERE path = ?", (relpath,))
+        for table, column in self.FILE_TABLES.items():
+            self.conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (relpath,))
+
+    def _insert_script(self, relpath: str, gd: GDScriptAnalyzer):
+        self.conn.execute(
+            "INSERT INTO scripts (path, class_name, extends, is_tool, error) VALUES (?, ?, ?, ?, ?)",
+            (relpath, gd.class_name, gd.extends, int(gd.is_tool), gd.error),
+        )
+        self.conn.executemany(
+            "INSERT INTO functions (path, name, args, return_type, is_static, complexity, line, end_line)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(relpath, fn["name"], json.dumps(fn.get("args", [])), fn.get("return_type"),
+              int(fn.get("is_static", False)), fn.get("approx_complexity"), fn.get("line"), fn.get("end_line"))
+             for fn in gd.functions + gd.static_functions],
+        )
+        self.conn.executemany(
+            "INSERT INTO signals (path, name, args) VALUES (?, ?, ?)",
+            [(relpath, sig["name"], json.dumps(sig.get("args", []))) for sig in gd.signals],
+        )
+        self.conn.executemany(
+            "INSERT INTO preloads (path, target) VALUES (?, ?)",
+            [(relpath, target) for target in gd.preloads],
+        )
+
+    def _insert_xref(self, xref: CrossReference):
+        """Rewrite the cross-file tables: any file change can re-resolve their rows."""
+        self.conn.execute("DELETE FROM dependencies")
+        self.conn.execute("DELETE FROM signal_links")
+        self.conn.executemany(
+            "INSERT INTO dependencies (source, kind, target) VALUES (?, ?, ?)",
+            [(source, kind, target) for source, edges in xref.dependencies.items() for kind, target in edges],
+        )
+        self.conn.executemany(
+            "INSERT INTO signal_links (emitter, signal, scene, from_node, to_node, target_script, method)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(emitter, signal, c["scene"], c.get("from"), c.get("to"), c.get("target_script"), c.get("method"))
+             for (emitter, signal), conns in xref.signal_connections.items() for c in conns],
+        )
+
+    def _insert_scene(self, relpath: str, scene: TscnParser):
+        self.conn.executemany(
+            "INSERT INTO connections (scene, signal, from_node, to_node, method) VALUES (?, ?, ?, ?, ?)",
+            [(relpath, c.get("signal"), c.get("from"), c.get("to"), c.get("method")) for c in scene.connections],
+        )
+        self.conn.executemany(
+            "INSERT INTO ext_resources (scene, res_id, type, path) VALUES (?, ?, ?, ?)",
+            [(relpath, r.get("id"), r.get("type"), r.get("path")) for r in scene.ext_resources],
+        )
+
+
+# ─────────────────────────────────────────────
+# Profiling (--profile)
+# ─────────────────────────────────────────────
+
+class Profiler:
+    """Records wall time and memory per phase, and analysis time per file.
+
+    Phases nest (e.g. each _section_* renderer inside "render"). Memory is the
+    process max RSS at the end of each phase, which is free to measure; with
+    trace_memory=True it is the tracemalloc peak within the phase instead, which
+    is exact but slows allocation-heavy phases (parsing) down several times and
+    does not see -j worker processes.
+    """
+
+    def __init__(self, trace_memory: bool = False, with_cprofile: bool = False):
+        self.trace_memory = trace_memory
+        self.records: list[dict] = []  # {"name", "depth", "start", "duration", "peak"}
+        self.file_times: list[tuple[float, str]] = []  # (seconds, relpath)
+        self._stack: list[dict] = []
+        self._origin = time.perf_counter()
+        self.cprofile = None
+        if with_cprofile:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        if trace_memory:
+            import tracemalloc
+            self._tracemalloc = tracemalloc
+            tracemalloc.start()
+
+    @staticmethod
+    def _max_rss() -> int:
+        try:
+            import resource
+        except ImportError:  # Windows
+            return 0
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024  # bytes on macOS, KiB elsewhere
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        if self.trace_memory:
+            if self._stack:
+                # Fold the parent's peak so far into it before resetting the peak counter
+                parent = self._stack[-1]
+                parent["peak"] = max(parent["peak"], self._tracemalloc.get_traced_memory()[1])
+            self._tracemalloc.reset_peak()
+        record = {"name": name, "depth": len(self._stack),
+                  "start": time.perf_counter() - self._origin, "duration": 0.0, "peak": 0}
+        self.records.append(record)
+        self._stack.append(record)
+        try:
+            yield record
+        finally:
+            record["duration"] = time.perf_counter() - self._origin - record["start"]
+            peak = self._tracemalloc.get_traced_memory()[1] if self.trace_memory else self._max_rss()
+            record["peak"] = max(record["peak"], peak)
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], record["peak"])
+
+    def record_files(self, results) -> list[tuple[str, str, Optional[dict]]]:
+        """Strip the timing from analyze_file_timed() results and keep it."""
+        stripped = []
+        for ext, relpath, summary, seconds in results:
+            self.file_times.append((seconds, relpath))
+            stripped.append((ext, relpath, summary))
+        return stripped
+
+    def stop(self):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        if self.trace_memory:
+            self._tracemalloc.stop()
+
+    def report(self, top: int = 10):
+        memory = "peak traced memory" if self.trace_memory else "max RSS"
+        print(f"\n⏱️  Profile (wall time, {memory})")
+        print(f"  {'Phase':<40} {'Time':>10} {'Memory':>10}")
+        for record in self.records:
+            label = "  " * record["depth"] + record["name"]
+            print(f"  {label:<40} {record['duration'] * 1000:>7.1f} ms "
+                  f"{record['peak'] / (1024 * 1024):>6.1f} MiB")
+        if self.file_times:
+            total = sum(seconds for seconds, _ in self.file_times)
+            print(f"\n  Slowest files ({len(self.file_times)} analyzed, {total * 1000:.1f} ms total):")
+            for seconds, relpath in sorted(self.file_times, reverse=True)[:top]:
+                print(f"    {seconds * 1000:>7.1f} ms  {relpath}")
+
+    def dump(self, path: str):
+        """Write a Chrome trace (*.json, for chrome://tracing or Perfetto) or cProfile stats."""
+        if path.lower().endswith(".json"):
+            events = [{"name": r["name"], "cat": "phase", "ph": "X", "pid": 1, "tid": 1,
+                       "ts": round(r["start"] * 1e6), "dur": round(r["duration"] * 1e6),
+                       "args": {"traced_peak_bytes" if self.trace_memory else "max_rss_bytes": r["peak"]}}
+                      for r in self.records]
+            trace = {
+                "traceEvents": events,
+                "displayTimeUnit": "ms",
+                "otherData": {"file_times_ms": {relpath: round(seconds * 1000, 3)
+                                                for seconds, relpath in sorted(self.file_times, reverse=True)}},
+            }
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(trace, f, indent=1)
+        elif self.cprofile is not None:
+            self.cprofile.dump_stats(path)
+        else:
+            raise RuntimeError("cProfile stats need the profiler to be created with with_cprofile=True")
+
+
+# ─────────────────────────────────────────────
+# Token Counting
+# ─────────────────────────────────────────────
+
+# Word, number, punctuation-run and newline pieces, roughly how BPE tokenizers pre-split text
+_TOKEN_PIECE_RE = re.compile(r" ?[A-Za-z]+| ?\d{1,3}| ?[^\sA-Za-z\d]+|\n+|\s+")
+
+
+def approx_token_count(text: str) -> int:
+    """Tokenizer-free count: BPE pre-split pieces, long words counting once per ~6 letters."""
+    return sum(1 + (len(piece) - 1) // 6 if piece[-1:].isalpha() else 1
+               for piece in _TOKEN_PIECE_RE.findall(text))
+
+
+class TokenCounter:
+    """Counts LLM tokens with tiktoken when it is installed (and its encoding is available
+    locally), falling back to approx_token_count otherwise.
+
+    Counts are memoized by content hash and, with a cache path, persisted between
+    runs, so unchanged sections and shards are never tokenized twice.
+    """
+
+    ENCODING = "o200k_base"
+
+    def __init__(self, cache_path: Optional[str] = None):
+        self.cache_path = cache_path
+        self._encoding = None
+        self.name = "approx"
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding(self.ENCODING)
+            self.name = f"tiktoken/{self.ENCODING}"
+        except ImportError:
+            pass
+        except Exception as e:  # e.g. the encoding is not cached and there is no network
+            print(f"WARNING: tiktoken could not load {self.ENCODING} ({type(e).__name__}), "
+                  f"using approximate token counts")
+
+        self.counts: dict[str, int] = {}
+        self._used: set[str] = set()
+        if cache_path:
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("tokenizer") == self.name:
+                    self.counts = data.get("counts", {})
+            except (OSError, ValueError):
+                pass
+
+    def count(self, text: str) -> int:
+        key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        self._used.add(key)
+        if key not in self.counts:
+            self.counts[key] = (len(self._encoding.encode(text, disallowed_special=()))
+                                if self._encoding is not None else approx_token_count(text))
+        return self.counts[key]
+
+    def save(self):
+        """Persist the counts used by this run (older entries are dropped)."""
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with open(self.cache_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"tokenizer": self.name,
+                       "counts": {k: v for k, v in self.counts.items() if k in self._used}},
+                      f, separators=(",", ":"))
+        os.replace(self.cache_path + ".tmp", self.cache_path)
 
 
 # ─────────────────────────────────────────────
@@ -631,10 +1991,25 @@ class ArchitectureGenerator:
     """Main orchestrator: scans project and generates the architecture document."""
 
     def __init__(self, project_path: str, exclude_dirs: list[str] = None,
-                 include_full_source: bool = False):
+                 include_full_source: bool = False, jobs: int = 1,
+                 cache_dir: Optional[str] = None, outline_only: bool = False,
+                 profiler: Optional[Profiler] = None, strip_source_comments: bool = False):
         self.project_path = os.path.abspath(project_path)
         self.exclude_dirs = set(exclude_dirs or [".godot", ".git", "__pycache__", ".import"])
         self.include_full_source = include_full_source
+        self.strip_source_comments = strip_source_comments
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        self.outline_only = outline_only
+        self.profiler = profiler
+        self.cache = AnalysisCache(cache_dir, outline_only) if cache_dir else None
+
+        # Incremental regeneration state
+        self.file_hashes: dict[str, str] = {}  # relpath -> content hash
+        self.git_commit: Optional[str] = None
+        self.untracked: list[str] = []
+        self.dirty: list[str] = []  # tracked files modified relative to git_commit
+        self.fragments: dict[str, dict] = {}  # section -> relpath -> [signature, rendered]
+        self._rendered: dict[str, dict] = defaultdict(dict)
 
         self.gd_files: dict[str, GDScriptAnalyzer] = {}
         self.tscn_files: dict[str, TscnParser] = {}
@@ -643,84 +2018,743 @@ class ArchitectureGenerator:
         self.project_config: Optional[ProjectConfigParser] = None
 
         self.class_name_map: dict[str, str] = {}  # class_name -> file_path
+        self._scene_graph: Optional[SceneGraph] = None
+        self._xref: Optional[CrossReference] = None
+        self._token_counter: Optional[TokenCounter] = None
+        self._source_dedup: Optional[tuple[dict, dict]] = None
+
+    def phase(self, name: str):
+        """Context manager timing a phase for --profile (a no-op without a profiler)."""
+        return self.profiler.phase(name) if self.profiler is not None else contextlib.nullcontext()
 
     def scan(self):
         """Scan the entire project."""
         print(f"Scanning project: {self.project_path}")
 
         # Parse project.godot
-        self.project_config = ProjectConfigParser(self.project_path)
+        with self.phase("project.godot"):
+            self.project_config = ProjectConfigParser(self.project_path)
+        if self.cache is not None:
+            with self.phase("git baseline"):
+                self._record_git_baseline()
 
+        tasks = []
         file_count = 0
-        for root, dirs, files in os.walk(self.project_path):
-            # Filter excluded directories
-            dirs[:] = [d for d in dirs if d not in self.exclude_dirs]
-
-            for filename in sorted(files):
-                filepath = os.path.join(root, filename)
-                relpath = os.path.relpath(filepath, self.project_path)
-                ext = os.path.splitext(filename)[1].lower()
-
-                if ext == ".gd":
-                    self._analyze_gd(filepath, relpath)
-                elif ext == ".tscn":
-                    self._analyze_tscn(filepath, relpath)
-                elif ext == ".tres":
-                    self._analyze_tres(filepath, relpath)
-                elif ext not in (".uid", ".import", ".tmp"):
-                    self.other_files[ext].append(relpath)
-
-                file_count += 1
+        with self.phase("walk"):
+            for root, dirs, files in os.walk(self.project_path):
+                # Filter excluded directories (sorted so the walk order is stable)
+                dirs[:] = sorted(d for d in dirs if d not in self.exclude_dirs)
+
+                for filename in sorted(files):
+                    filepath = os.path.join(root, filename)
+                    relpath = os.path.relpath(filepath, self.project_path)
+                    ext = os.path.splitext(filename)[1].lower()
+
+                    if ext in ANALYZERS:
+                        tasks.append((ext, filepath, relpath))
+                    elif ext not in (".uid", ".import", ".tmp"):
+                        self.other_files[ext].append(relpath)
+
+                    file_count += 1
+
+        results = self._analyze_cached(tasks)
+        with self.phase("merge"):
+            for ext, relpath, summary in results:
+                self._merge(ext, relpath, summary)
 
         print(f"  Found {len(self.gd_files)} scripts, {len(self.tscn_files)} scenes, "
               f"{len(self.tres_files)} resources, {file_count} total files")
 
-    def _analyze_gd(self, filepath: str, relpath: str):
-        try:
-            with open(filepath, "r", encoding="utf-8", errors="replace") as f:
-                code = f.read()
-        except Exception:
-            return
+    def _analyze_cached(self, tasks: list[tuple[str, str, str]], trusted: frozenset = frozenset(),
+                        live: Optional[set[str]] = None) -> list[tuple[str, str, Optional[dict]]]:
+        """Analyze files, reusing cached summaries for files whose content is unchanged.
+
+        Files in `trusted` are known to be unchanged (e.g. from git) and are not re-hashed.
+        Cache entries outside `live` (default: the task paths) are evicted.
+        """
+        if self.cache is None:
+            return self._run_analysis(tasks)
+
+        hits, misses = self.cache.hits, self.cache.misses
+        results: list = [None] * len(tasks)
+        digests: list[Optional[str]] = [None] * len(tasks)
+        pending = []
+        with self.phase("hash + cache lookup"):
+            for i, (ext, filepath, relpath) in enumerate(tasks):
+                entry = self.cache.entries.get(relpath) if relpath in trusted else None
+                digests[i] = entry["hash"] if entry else file_digest(filepath)
+                if digests[i] is not None:
+                    self.file_hashes[relpath] = digests[i]
+                summary = self.cache.get(relpath, digests[i])
+                if summary is not None:
+                    results[i] = (ext, relpath, summary)
+                else:
+                    pending.append(i)
+
+        analyzed = self._run_analysis([tasks[i] for i in pending])
+        for i, result in zip(pending, analyzed):
+            results[i] = result
+            self.cache.put(result[1], digests[i], result[2])
+
+        with self.phase("cache save"):
+            self.cache.prune(live if live is not None else {relpath for _, _, relpath in tasks})
+            self.cache.save()
+        print(f"  Cache: {self.cache.hits - hits} reused, {self.cache.misses - misses} analyzed")
+        return results
+
+    # ── Incremental Regeneration ──
+
+    STATE_FILENAME = "archi_state.json"
 
-        analyzer = GDScriptAnalyzer(relpath, code)
-        self.gd_files[relpath] = analyzer
+    def _state_path(self) -> str:
+        return os.path.join(self.cache.cache_dir, self.STATE_FILENAME)
 
-        if analyzer.class_name:
-            self.class_name_map[analyzer.class_name] = relpath
+    def _state_key(self) -> str:
+        return f"{self.cache.key}|{','.join(sorted(self.exclude_dirs))}|{int(self.include_full_source)}"
 
-    def _analyze_tscn(self, filepath: str, relpath: str):
-        self.tscn_files[relpath] = TscnParser(filepath)
+    def _record_git_baseline(self):
+        """Remember HEAD, untracked and dirty files, so the next incremental run knows what to diff.
 
-    def _analyze_tres(self, filepath: str, relpath: str):
-        self.tres_files[relpath] = TresParser(filepath)
+        Dirty files must be re-checked next time even if they are reverted in
+        the meantime: the diff against HEAD would then no longer report them.
+        """
+        head = git_output(["rev-parse", "HEAD"], self.project_path)
+        self.git_commit = head.strip() if head else None
+        untracked = git_output(["ls-files", "--others", "--exclude-standard"], self.project_path)
+        self.untracked = [os.path.normpath(p) for p in untracked.splitlines() if p] if untracked else []
+        dirty = git_output(["diff", "--name-only", "--no-renames", "--relative", "HEAD"], self.project_path)
+        self.dirty = [os.path.normpath(p) for p in dirty.splitlines() if p] if dirty else []
+
+    def _is_excluded(self, relpath: str) -> bool:
+        return any(part in self.exclude_dirs for part in Path(relpath).parts[:-1])
+
+    def scan_incremental(self) -> bool:
+        """Update the project model from the last recorded state using git diff.
+
+        Only files reported by `git diff --name-only` since the recorded commit
+        (plus files untracked or dirty at either run) are re-checked; everything else comes from the
+        parse cache. Falls back to a full scan() and returns False when there is
+        no usable state.
+        """
+        state = self._load_state()
+        if state is None or not state.get("commit"):
+            print("  No incremental state found, running a full scan")
+            self.scan()
+            return False
+
+        diff = git_output(["diff", "--name-only", "--no-renames", "--relative", state["commit"]],
+                          self.project_path)
+        if diff is None:
+            print(f"  git diff against {state['commit'][:7]} failed, running a full scan")
+            self.scan()
+            return False
+
+        print(f"Scanning project (incremental since {state['commit'][:7]}): {self.project_path}")
+        self.project_config = ProjectConfigParser(self.project_path)
+        self._record_git_baseline()
+        self.fragments = state.get("fragments", {})
+
+        changed = {os.path.normpath(p) for p in diff.splitlines() if p}
+        changed.update(self.untracked)
+        changed.update(state.get("untracked", []))
+        changed.update(state.get("dirty", []))
+
+        files = {relpath: os.path.splitext(relpath)[1].lower() for relpath in state["files"]}
+        others = {relpath: ext for ext, paths in state["other_files"].items() for relpath in paths}
+        self._apply_changed_paths(files, others, changed)
+
+        tasks = [(ext, os.path.join(self.project_path, relpath), relpath)
+                 for relpath, ext in sorted(files.items(), key=lambda item: walk_order_key(item[0]))]
+        trusted = frozenset(relpath for relpath in files if relpath not in changed)
+        for ext, relpath, summary in self._analyze_cached(tasks, trusted):
+            self._merge(ext, relpath, summary)
+
+        for relpath, ext in sorted(others.items(), key=lambda item: walk_order_key(item[0])):
+            self.other_files[ext].append(relpath)
+
+        print(f"  {len(changed)} changed file(s); found {len(self.gd_files)} scripts, "
+              f"{len(self.tscn_files)} scenes, {len(self.tres_files)} resources")
+        return True
+
+    def _apply_changed_paths(self, files: dict[str, str], others: dict[str, str], changed: set[str]):
+        """Update relpath -> ext maps of analyzable and other files for re-checked paths."""
+        for relpath in changed:
+            files.pop(relpath, None)
+            others.pop(relpath, None)
+            if self._is_excluded(relpath) or not os.path.isfile(os.path.join(self.project_path, relpath)):
+                continue
+            ext = os.path.splitext(relpath)[1].lower()
+            if ext in ANALYZERS:
+                files[relpath] = ext
+            elif ext not in (".uid", ".import", ".tmp"):
+                others[relpath] = ext
+
+    def refresh(self, changed: set[str]):
+        """Re-analyze only the given paths (added, modified or deleted) in the in-memory model.
+
+        Unchanged files keep their analyzer objects, and fragments rendered by
+        the previous write() are reused for them.
+        """
+        if "project.godot" in changed:
+            self.project_config = ProjectConfigParser(self.project_path)
+
+        files = {relpath: os.path.splitext(relpath)[1].lower()
+                 for relpath in [*self.gd_files, *self.tscn_files, *self.tres_files]}
+        others = {relpath: ext for ext, paths in self.other_files.items() for relpath in paths}
+        self._apply_changed_paths(files, others, changed)
+
+        previous = {**self.gd_files, **self.tscn_files, **self.tres_files}
+        tasks = [(ext, os.path.join(self.project_path, relpath), relpath)
+                 for relpath, ext in files.items() if relpath in changed]
+        analyzed = {relpath: summary for _, relpath, summary in self._analyze_cached(tasks, live=set(files))}
+
+        self.gd_files, self.tscn_files, self.tres_files = {}, {}, {}
+        self.class_name_map = {}
+        self.other_files = defaultdict(list)
+        self._scene_graph = self._xref = self._source_dedup = None
+        for relpath, ext in sorted(files.items(), key=lambda item: walk_order_key(item[0])):
+            if relpath in analyzed:
+                self._merge(ext, relpath, analyzed[relpath])
+            elif relpath in previous:
+                self._add(ext, relpath, previous[relpath])
+        for relpath, ext in sorted(others.items(), key=lambda item: walk_order_key(item[0])):
+            self.other_files[ext].append(relpath)
+
+        for relpath in changed:
+            if relpath not in files:
+                self.file_hashes.pop(relpath, None)
+        self.fragments, self._rendered = self._rendered, defaultdict(dict)
+
+    def _load_state(self) -> Optional[dict]:
+        if self.cache is None:
+            return None
+        try:
+            with open(self._state_path(), "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return state if state.get("key") == self._state_key() else None
+
+    def save_state(self):
+        """Persist the file list, git baseline and rendered fragments for --incremental."""
+        if self.cache is None:
+            return
+        state = {
+            "key": self._state_key(),
+            "commit": self.git_commit,
+            "untracked": sorted(self.untracked),
+            "dirty": sorted(self.dirty),
+            "files": sorted([*self.gd_files, *self.tscn_files, *self.tres_files], key=walk_order_key),
+            "other_files": self.other_files,
+            "fragments": self._rendered,
+        }
+        if self._token_counter is not None:
+            self._token_counter.save()
+        os.makedirs(self.cache.cache_dir, exist_ok=True)
+        tmp_path = self._state_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(tmp_path, self._state_path())
+
+    def _fragment(self, section: str, relpath: str, extra: str, render):
+        """Return a per-file rendered fragment, reusing the previous run's output when
+        the file hash and `extra` (any cross-file input) are unchanged."""
+        digest = self.file_hashes.get(relpath)
+        if digest is None:
+            return render()
+
+        signature = hashlib.sha1(f"{digest}\0{extra}".encode("utf-8")).hexdigest() if extra else digest
+        cached = self.fragments.get(section, {}).get(relpath)
+        if cached and cached[0] == signature:
+            value = cached[1]
+        else:
+            value = render()
+        self._rendered[section][relpath] = [signature, value]
+        return value
+
+    def _run_analysis(self, tasks: list[tuple[str, str, str]]) -> list[tuple[str, str, Optional[dict]]]:
+        """Analyze files serially or on a process pool, returning results in task order."""
+        timed = self.profiler is not None
+        analyze = partial(analyze_file_timed if timed else analyze_file, outline_only=self.outline_only)
+        serial = self.jobs <= 1 or len(tasks) < 2
+        if timed and serial and not self.outline_only and any(task[0] == ".gd" for task in tasks):
+            # Load the parser up front so its one-off cost is not charged to the first script
+            with self.phase("gdtoolkit load"), contextlib.suppress(ImportError):
+                load_gdparser().parse("")
+        with self.phase("parse"):
+            results = self._map_analysis(analyze, tasks)
+        return self.profiler.record_files(results) if timed else results
+
+    def _map_analysis(self, analyze, tasks: list[tuple[str, str, str]]) -> list:
+        if self.jobs <= 1 or len(tasks) < 2:
+            return list(map(analyze, tasks))
+
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Forked workers would inherit --profile's tracing hooks: start them clean instead
+        context = multiprocessing.get_context("spawn") if self.profiler is not None else None
+        start_method = context.get_start_method() if context else multiprocessing.get_start_method()
+        if not self.outline_only and start_method == "fork" and any(task[0] == ".gd" for task in tasks):
+            # Build the GDScript parser once so forked workers inherit it instead of each loading it
+            with contextlib.suppress(ImportError):
+                load_gdparser().parse("")
+
+        workers = min(self.jobs, len(tasks))
+        chunksize = max(1, len(tasks) // (workers * 4))
+        print(f"  Analyzing {len(tasks)} files with {workers} workers")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(self.outline_only,)) as pool:
+            # Executor.map preserves submission order, so merging stays deterministic
+            return list(pool.map(analyze, tasks, chunksize=chunksize))
+
+    def _merge(self, ext: str, relpath: str, summary: Optional[dict]):
+        if summary is not None:
+            self._add(ext, relpath, ANALYZERS[ext].from_dict(summary))
+
+    @property
+    def scene_graph(self) -> SceneGraph:
+        """Scene instancing / script attachment graph, built once per model change."""
+        if self._scene_graph is None:
+            self._scene_graph = SceneGraph(self.tscn_files)
+        return self._scene_graph
+
+    @property
+    def xref(self) -> CrossReference:
+        """Signal / dependency cross-reference shared by every section and export."""
+        if self._xref is None:
+            self._xref = CrossReference(self.gd_files, self.tscn_files, self.tres_files,
+                                        self.class_name_map, self.scene_graph)
+        return self._xref
+
+    def _add(self, ext: str, relpath: str, parsed):
+        self._scene_graph = self._xref = self._source_dedup = None
+        if ext == ".gd":
+            self.gd_files[relpath] = parsed
+            if parsed.class_name:
+                self.class_name_map[parsed.class_name] = relpath
+        elif ext == ".tscn":
+            self.tscn_files[relpath] = parsed
+        elif ext == ".tres":
+            self.tres_files[relpath] = parsed
+
+    def build_index(self) -> dict:
+        """Collect everything the analyzers extracted into a plain, versioned dict."""
+        cfg = self.project_config
+
+        def without_filepath(summary: dict) -> dict:
+            return {k: v for k, v in summary.items() if k != "filepath"}
+
+        return {
+            "format": INDEX_FORMAT,
+            "version": INDEX_FORMAT_VERSION,
+            "generated": datetime.now().isoformat(timespec="seconds"),
+            "gdtoolkit": gdtoolkit_version(),
+            "project": {
+                "name": cfg.project_name if cfg else None,
+                "main_scene": cfg.main_scene if cfg else None,
+                "features": cfg.features if cfg else [],
+                "render_method": cfg.render_method if cfg else None,
+                "autoloads": cfg.autoloads if cfg else [],
+                "input_actions": cfg.input_actions if cfg else [],
+            },
+            "class_names": dict(sorted(self.class_name_map.items())),
+            "scripts": {relpath: without_filepath(gd.to_dict()) for relpath, gd in sorted(self.gd_files.items())},
+            "scenes": {relpath: without_filepath(scene.to_dict()) for relpath, scene in sorted(self.tscn_files.items())},
+            "resources": {relpath: without_filepath(tres.to_dict()) for relpath, tres in sorted(self.tres_files.items())},
+            "preloads": [[relpath, target] for relpath, gd in sorted(self.gd_files.items()) for target in gd.preloads],
+            "scene_graph": self.scene_graph.to_dict(),
+            "xref": self.xref.to_dict(),
+        }
+
+    def _read_source(self, relpath: str) -> str:
+        """Read a script's source from disk (summaries do not keep the code)."""
+        filepath = os.path.join(self.project_path, relpath)
+        try:
+            with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+                return f.read()
+        except Exception as e:
+            return f"# (could not read source: {e})"
 
     # ── Markdown Generation ──
 
     def generate(self) -> str:
         """Generate the full architecture markdown document."""
-        sections = []
-
-        sections.append(self._header())
-        sections.append(self._section_project_overview())
-        sections.append(self._section_directory_tree())
-        sections.append(self._section_autoloads())
-        sections.append(self._section_class_registry())
-        sections.append(self._section_scene_map())
-        sections.append(self._section_scripts_detail())
-        sections.append(self._section_signal_map())
-        sections.append(self._section_resource_list())
-        sections.append(self._section_asset_summary())
-        sections.append(self._section_dependency_graph())
+        buffer = io.StringIO()
+        self.write(buffer)
+        return buffer.getvalue()
+
+    def write(self, out: TextIO, sections: Optional[list[Iterator[str]]] = None) -> int:
+        """Stream the architecture document (or the given sections) to a text file handle.
+
+        Sections are generators of lines, so nothing is accumulated: each line is
+        written as soon as it is rendered. Returns the number of characters written.
+        """
+        written = 0
+        for section in self._sections() if sections is None else sections:
+            with self.phase(section.__name__):
+                lines = iter(section)
+                first = next(lines, None)
+                if first is None:
+                    continue  # empty sections are skipped entirely
+                chunk = first if written == 0 else "\n\n" + first
+                out.write(chunk)
+                written += len(chunk)
+                for line in lines:
+                    out.write("\n")
+                    out.write(line)
+                    written += len(line) + 1
+                out.flush()
+        return written
+
+    def _sections(self) -> list[Iterator[str]]:
+        sections = [
+            self._header(),
+            self._section_project_overview(),
+            self._section_directory_tree(),
+            self._section_autoloads(),
+            self._section_class_registry(),
+            self._section_scene_map(),
+            self._section_scripts_detail(),
+            self._section_signal_map(),
+            self._section_resource_list(),
+            self._section_asset_summary(),
+            self._section_dependency_graph(),
+        ]
         if self.include_full_source:
             sections.append(self._section_full_source())
         sections.append(self._footer())
+        return sections
+
+    # ── Token-Budgeted Summary ──
+
+    TOKEN_COUNTS_FILENAME = "token_counts.json"
+
+    @property
+    def token_counter(self) -> TokenCounter:
+        if self._token_counter is None:
+            cache_path = os.path.join(self.cache.cache_dir, self.TOKEN_COUNTS_FILENAME) if self.cache else None
+            self._token_counter = TokenCounter(cache_path)
+        return self._token_counter
+
+    def _public_api_block(self, relpath: str, gd: GDScriptAnalyzer) -> Optional[str]:
+        """Compact outline of what other scripts can use: class, signals, exports, public functions."""
+        lines = [f"### `{relpath}`"]
+        header_parts = []
+        if gd.class_name:
+            header_parts.append(f"**class_name** `{gd.class_name}`")
+        if gd.extends:
+            header_parts.append(f"**extends** `{gd.extends}`")
+        if header_parts:
+            lines.append(" | ".join(header_parts))
+
+        def args_of(item: dict) -> str:
+            return ", ".join(f"{a['name']}: {a['type']}" if a.get('type') else a['name'] for a in item.get('args', []))
+
+        for sig in gd.signals:
+            lines.append(f"- signal `{sig['name']}({args_of(sig)})`")
+        for var in gd.exports:
+            type_str = f": {var['type']}" if var.get('type') else ""
+            lines.append(f"- @export `{var['name']}{type_str}`")
+        for func in gd.functions + gd.static_functions:
+            if func['name'].startswith("_"):
+                continue
+            ret = f" -> {func['return_type']}" if func.get('return_type') else ""
+            static = "static " if func.get('is_static') else ""
+            lines.append(f"- {static}func `{func['name']}({args_of(func)}){ret}`")
+        return "\n".join(lines) if len(lines) > 1 else None
 
-        return "\n\n".join(s for s in sections if s)
+    @staticmethod
+    def _function_source(source_lines: list[str], line: Optional[int]) -> Optional[str]:
+        """Source of the function whose header starts at 1-based `line`, delimited by indentation."""
+        if not line or line > len(source_lines):
+            return None
+        header = source_lines[line - 1]
+        indent = len(header) - len(header.lstrip())
+        end = line
+        for i in range(line, len(source_lines)):
+            text = source_lines[i]
+            if text.strip() and len(text) - len(text.lstrip()) <= indent:
+                break
+            if text.strip():
+                end = i + 1
+        return "\n".join(source_lines[line - 1:end])
+
+    def _budget_blocks(self) -> list[dict]:
+        """Candidate blocks for --max-tokens, each with a rank (lower = more important)
+        and a document position."""
+        def section(rank: int, order: tuple, lines: Iterator[str]) -> Optional[dict]:
+            text = "\n".join(lines)
+            return {"rank": (rank,), "order": order, "text": text} if text else None
+
+        blocks = [
+            section(0, (0,), self._header()),
+            section(0, (1,), self._section_project_overview()),
+            section(1, (3,), self._section_autoloads()),
+            section(2, (4,), self._section_class_registry()),
+            section(4, (7,), self._section_signal_map()),
+            section(6, (10,), self._section_dependency_graph()),
+            section(7, (5,), self._section_scene_map()),
+            section(8, (2,), self._section_directory_tree()),
+            section(9, (8,), self._section_resource_list()),
+            section(9, (9,), self._section_asset_summary()),
+        ]
+
+        for relpath, gd in sorted(self.gd_files.items()):
+            text = self._public_api_block(relpath, gd)
+            if text:
+                blocks.append({"rank": (3, relpath), "order": (6, relpath), "text": text,
+                               "heading": (6, "## 6. Scripts (public API)")})
 
-    def _header(self) -> str:
+        # Function bodies, most complex first; outline summaries fall back to body size
+        functions = []
+        for relpath, gd in self.gd_files.items():
+            source_lines = self._read_source(relpath).splitlines()
+            for func in gd.functions + gd.static_functions:
+                body = self._function_source(source_lines, func.get("line"))
+                if body and self.strip_source_comments:
+                    body = strip_comments(body)
+                if body:
+                    complexity = func.get("approx_complexity") or 0
+                    functions.append((complexity, len(body), relpath, func, body))
+        for complexity, size, relpath, func, body in functions:
+            blocks.append({
+                "rank": (5, -complexity, -size, relpath, func["line"]),
+                "order": (11, relpath, func["line"]),
+                "text": f"### `{relpath}` — `{func['name']}()` (complexity {complexity})\n```gdscript\n{body}\n```",
+                "heading": (11, "## 11. Key Functions (by complexity)"),
+            })
+
+        if self.include_full_source:
+            duplicates, _ = self.source_dedup
+            for relpath in sorted(self.gd_files):
+                if relpath in duplicates:
+                    continue  # the first copy lists it
+                blocks.append({"rank": (10, relpath), "order": (12, relpath),
+                               "text": "\n".join(self._render_full_source(relpath)).rstrip(),
+                               "heading": (12, "## 📝 Full Source Code")})
+        return [block for block in blocks if block]
+
+    def _assemble_budgeted(self, chosen: list[dict]) -> str:
+        parts, headings = [], set()
+        for block in sorted(chosen, key=lambda b: b["order"]):
+            heading = block.get("heading")
+            if heading and heading not in headings:
+                headings.add(heading)
+                parts.append(heading[1])
+            parts.append(block["text"])
+        return "\n\n".join(parts)
+
+    def generate_budgeted(self, max_tokens: int) -> tuple[str, int]:
+        """Render the most important content that fits in `max_tokens` tokens.
+
+        Blocks are taken greedily by rank (header and overview, autoloads, class
+        registry, public API, signals, then function bodies by approx_complexity,
+        then the remaining sections) and skipped when they do not fit. The result
+        is laid out in the usual section order and re-counted as a whole, dropping
+        the least important blocks if joining them cost more than estimated.
+        Returns (document, token count).
+        """
+        counter = self.token_counter
+        blocks = self._budget_blocks()
+        footer_reserve = 40  # budget line appended below
+
+        chosen, used, headings = [], 0, set()
+        for block in sorted(blocks, key=lambda b: b["rank"]):
+            heading = block.get("heading")
+            cost = counter.count(block["text"] + "\n\n")
+            if heading and heading not in headings:
+                cost += counter.count(heading[1] + "\n\n")
+            if used + cost + footer_reserve > max_tokens:
+                continue
+            chosen.append(block)
+            used += cost
+            if heading:
+                headings.add(heading)
+
+        while True:
+            omitted = len(blocks) - len(chosen)
+            footer = (f"---\n\n> **Token budget:** {{used:,}} / {max_tokens:,} tokens ({counter.name}), "
+                      f"{len(chosen)} blocks included, {omitted} omitted.")
+            body = self._assemble_budgeted(chosen)
+            total = counter.count(body + "\n\n" + footer.format(used=max_tokens))
+            if total <= max_tokens or not chosen:
+                return body + "\n\n" + footer.format(used=total), total
+            chosen.remove(max(chosen, key=lambda b: b["rank"]))
+
+    # ── Sharded Output ──
+
+    SHARD_INDEX = "index.md"
+    SHARD_MANIFEST = "shards.json"
+    # Bump when the shard layout changes, so unchanged inputs still get rewritten
+    SHARD_FORMAT_VERSION = 1
+    SHARD_HEADER_TOKENS = 100  # title, back link and section headings of a shard
+
+    def _shard_entries(self, relpath: str) -> list[tuple[str, list[str]]]:
+        """Per-file blocks a shard holds, as (section, lines) pairs."""
+        entries = []
+        if relpath in self.tscn_files:
+            scene = self.tscn_files[relpath]
+            entries.append(("scene", self._fragment("scene", relpath, "",
+                                                    lambda: self._render_scene_entry(relpath, scene))))
+        if relpath in self.gd_files:
+            gd = self.gd_files[relpath]
+            entries.append(("script", self._fragment("script", relpath, "",
+                                                     lambda: self._render_script_detail(relpath, gd))))
+            if self.include_full_source:
+                entries.append(("source", self._render_full_source(relpath)))
+        return entries
+
+    def _plan_shards(self, by: str, max_tokens: int, sizes: dict[str, int]) -> list[tuple[str, str, list[str]]]:
+        """Group scripts and scenes into (filename, title, relpaths) shards.
+
+        "dir" puts each top-level directory in its own shard; "tokens" packs files
+        in walk order (so directories stay together) up to `max_tokens` per shard.
+        """
+        relpaths = sorted({*self.tscn_files, *self.gd_files}, key=walk_order_key)
+        if by == "dir":
+            groups: dict[str, list[str]] = {}
+            for relpath in relpaths:
+                parts = Path(relpath).parts
+                groups.setdefault(parts[0] if len(parts) > 1 else "", []).append(relpath)
+            return [((re.sub(r"[^\w.-]", "_", top) or "_root") + ".md", f"{top}/" if top else "(project root)", paths)
+                    for top, paths in groups.items()]
+
+        budget = max_tokens - self.SHARD_HEADER_TOKENS
+        shards, current, used = [], [], 0
+        for relpath in relpaths:
+            if current and used + sizes[relpath] > budget:
+                shards.append(current)
+                current, used = [], 0
+            current.append(relpath)
+            used += sizes[relpath]
+        if current:
+            shards.append(current)
+        return [(f"part-{i:03d}.md", f"part {i} ({paths[0]} … {paths[-1]})", paths)
+                for i, paths in enumerate(shards, 1)]
+
+    def _project_name(self) -> str:
+        return self.project_config.project_name if self.project_config else "Godot Project"
+
+    def _shard_signature(self, title: str, entries: list[tuple[str, list[str]]]) -> str:
+        """Hash of everything a shard is rendered from, to skip rewriting unchanged shards.
+
+        The per-file blocks are hashed as rendered rather than by file hash: they
+        also depend on other files (full-source duplicates name their first copy),
+        and per-file fragments are cheap to rebuild from the fragment cache.
+        """
+        digest = hashlib.sha1(f"{self.SHARD_FORMAT_VERSION}|{self._project_name()}|{title}".encode("utf-8"))
+        for section, block in entries:
+            digest.update(f"\0{section}\0".encode("utf-8"))
+            digest.update("\n".join(block).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _render_shard(self, title: str, entries: list[tuple[str, list[str]]]) -> str:
+        blocks = [f"# 🎮 Project Architecture: {self._project_name()} — {title}\n\n"
+                  f"> Shard of [`{self.SHARD_INDEX}`]({self.SHARD_INDEX}), which holds the project-wide sections."]
+        for section, heading in (("scene", "## 5. Scene Map"), ("script", "## 6. Scripts Detail"),
+                                 ("source", "## 📝 Full Source Code")):
+            lines = [line for kind, block in entries if kind == section for line in block]
+            if lines:
+                blocks.append("\n".join([heading, "", *lines]))
+        return "\n\n".join(blocks)
+
+    def write_shards(self, out_dir: str, by: str = "dir", max_tokens: int = 100_000) -> list[dict]:
+        """Write the document as an index file plus one shard per directory or token budget.
+
+        Project-wide sections go to index.md with a table of shards; per-file scene
+        and script sections go to the shards. shards.json maps every shard to its
+        files for consumers that only load what they need. Shards whose content is
+        unchanged since the last run are not rewritten or re-counted, the rest are
+        written concurrently. Returns the manifest's shard entries.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        os.makedirs(out_dir, exist_ok=True)
+        manifest_path = os.path.join(out_dir, self.SHARD_MANIFEST)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                previous = {entry["file"]: entry for entry in json.load(f).get("shards", [])}
+        except (OSError, ValueError):
+            previous = {}
+
+        entries, sizes = {}, {}
+        if by == "tokens":
+            # Packing needs every file's rendered size up front
+            for relpath in sorted({*self.tscn_files, *self.gd_files}):
+                entries[relpath] = self._shard_entries(relpath)
+                sizes[relpath] = sum(self.token_counter.count("\n".join(block)) for _, block in entries[relpath])
+
+        shards, pending = [], []
+        for filename, title, relpaths in self._plan_shards(by, max_tokens, sizes):
+            shard_entries = [entry for relpath in relpaths
+                             for entry in entries.get(relpath) or self._shard_entries(relpath)]
+            signature = self._shard_signature(title, shard_entries)
+            old = previous.get(filename)
+            if old and old["signature"] == signature and os.path.isfile(os.path.join(out_dir, filename)):
+                shards.append(old)
+                continue
+            text = self._render_shard(title, shard_entries)
+            shard = {"file": filename, "title": title, "files": relpaths, "signature": signature,
+                     "chars": len(text), "tokens": self.token_counter.count(text)}
+            shards.append(shard)
+            pending.append((os.path.join(out_dir, filename), text))
+
+        def write_file(job):
+            path, text = job
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(path + ".tmp", path)
+
+        with ThreadPoolExecutor(max_workers=min(8, len(pending) or 1)) as pool:
+            list(pool.map(write_file, pending))
+
+        live = {shard["file"] for shard in shards}
+        for filename in previous:
+            if filename not in live:
+                with contextlib.suppress(OSError):
+                    os.remove(os.path.join(out_dir, filename))
+
+        index_path = os.path.join(out_dir, self.SHARD_INDEX)
+        with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+            self.write(f, self._index_sections(shards))
+        os.replace(index_path + ".tmp", index_path)
+
+        with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"version": self.SHARD_FORMAT_VERSION, "by": by, "index": self.SHARD_INDEX,
+                       "shards": shards}, f, ensure_ascii=False, indent=1)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+        print(f"  Shards: {len(pending)} written, {len(shards) - len(pending)} unchanged")
+        return shards
+
+    def _index_sections(self, shards: list[dict]) -> list[Iterator[str]]:
+        return [
+            self._header(),
+            self._section_project_overview(),
+            self._section_directory_tree(),
+            self._section_autoloads(),
+            self._section_class_registry(),
+            self._section_shard_table(shards),
+            self._section_signal_map(),
+            self._section_resource_list(),
+            self._section_asset_summary(),
+            self._section_dependency_graph(),
+            self._footer(),
+        ]
+
+    def _section_shard_table(self, shards: list[dict]) -> Iterator[str]:
+        yield "## 5–6. Scenes and Scripts (shards)"
+        yield ""
+        yield "| Shard | Contents | Files | Tokens |"
+        yield "|-------|----------|-------|---------|"
+        for shard in shards:
+            yield f"| [`{shard['file']}`]({shard['file']}) | {shard['title']} | {len(shard['files'])} | {shard['tokens']:,} |"
+
+    def _header(self) -> Iterator[str]:
         name = self.project_config.project_name if self.project_config else "Godot Project"
         now = datetime.now().strftime("%Y-%m-%d %H:%M")
-        return f"""# 🎮 Project Architecture: {name}
+        yield f"""# 🎮 Project Architecture: {name}
 
 > **Generated:** {now}
 > **Path:** `{self.project_path}`
@@ -729,38 +2763,35 @@ class ArchitectureGenerator:
 ---"""
 
     def _get_gdtoolkit_version(self) -> str:
-        try:
-            from importlib.metadata import version
-            return version("gdtoolkit")
-        except Exception:
-            return "4.x"
+        return gdtoolkit_version()
 
-    def _section_project_overview(self) -> str:
+    def _section_project_overview(self) -> Iterator[str]:
         cfg = self.project_config
         if not cfg:
-            return ""
+            return
 
-        lines = ["## 1. Project Overview", ""]
-        lines.append(f"| Property | Value |")
-        lines.append(f"|----------|-------|")
-        lines.append(f"| **Project Name** | {cfg.project_name} |")
+        yield "## 1. Project Overview"
+        yield ""
+        yield f"| Property | Value |"
+        yield f"|----------|-------|"
+        yield f"| **Project Name** | {cfg.project_name} |"
         if cfg.features:
-            lines.append(f"| **Engine Features** | {', '.join(cfg.features)} |")
+            yield f"| **Engine Features** | {', '.join(cfg.features)} |"
         if cfg.main_scene:
-            lines.append(f"| **Main Scene** | `{cfg.main_scene}` |")
+            yield f"| **Main Scene** | `{cfg.main_scene}` |"
         if cfg.render_method:
-            lines.append(f"| **Renderer** | {cfg.render_method} |")
-        lines.append(f"| **Scripts** | {len(self.gd_files)} |")
-        lines.append(f"| **Scenes** | {len(self.tscn_files)} |")
-        lines.append(f"| **Resources (.tres)** | {len(self.tres_files)} |")
+            yield f"| **Renderer** | {cfg.render_method} |"
+        yield f"| **Scripts** | {len(self.gd_files)} |"
+        yield f"| **Scenes** | {len(self.tscn_files)} |"
+        yield f"| **Resources (.tres)** | {len(self.tres_files)} |"
 
         if cfg.input_actions:
-            lines.append(f"| **Input Actions** | {', '.join(f'`{a}`' for a in cfg.input_actions)} |")
-
-        return "\n".join(lines)
+            yield f"| **Input Actions** | {', '.join(f'`{a}`' for a in cfg.input_actions)} |"
 
-    def _section_directory_tree(self) -> str:
-        lines = ["## 2. Directory Structure", "", "```"]
+    def _section_directory_tree(self) -> Iterator[str]:
+        yield "## 2. Directory Structure"
+        yield ""
+        yield "```"
 
         all_files = (
             list(self.gd_files.keys()) +
@@ -788,19 +2819,19 @@ class ArchitectureGenerator:
         for entry in entries:
             if entry not in seen:
                 seen.add(entry)
-                lines.append(entry)
+                yield entry
 
-        lines.append("```")
-        return "\n".join(lines)
+        yield "```"
 
-    def _section_autoloads(self) -> str:
+    def _section_autoloads(self) -> Iterator[str]:
         cfg = self.project_config
         if not cfg or not cfg.autoloads:
-            return ""
+            return
 
-        lines = ["## 3. Autoloads (Singletons)", ""]
-        lines.append("| Name | Path | Type |")
-        lines.append("|------|------|------|")
+        yield "## 3. Autoloads (Singletons)"
+        yield ""
+        yield "| Name | Path | Type |"
+        yield "|------|------|------|"
 
         for al in cfg.autoloads:
             # Try to find the type
@@ -811,222 +2842,240 @@ class ArchitectureGenerator:
                 type_info = gd.extends or ""
                 if gd.class_name:
                     type_info = f"{gd.class_name} (extends {gd.extends})" if gd.extends else gd.class_name
-            lines.append(f"| **{al['name']}** | `{al['path']}` | {type_info} |")
-
-        return "\n".join(lines)
+            yield f"| **{al['name']}** | `{al['path']}` | {type_info} |"
 
-    def _section_class_registry(self) -> str:
+    def _section_class_registry(self) -> Iterator[str]:
         if not self.class_name_map:
-            return ""
+            return
 
-        lines = ["## 4. Class Registry (class_name)", ""]
-        lines.append("| Class Name | File | Extends |")
-        lines.append("|------------|------|---------|")
+        yield "## 4. Class Registry (class_name)"
+        yield ""
+        yield "| Class Name | File | Extends |"
+        yield "|------------|------|---------|"
 
         for cname, fpath in sorted(self.class_name_map.items()):
             gd = self.gd_files.get(fpath)
             ext = gd.extends if gd else "?"
-            lines.append(f"| `{cname}` | `{fpath}` | `{ext}` |")
-
-        return "\n".join(lines)
+            yield f"| `{cname}` | `{fpath}` | `{ext}` |"
 
-    def _section_scene_map(self) -> str:
+    def _section_scene_map(self) -> Iterator[str]:
         if not self.tscn_files:
-            return ""
+            return
 
-        lines = ["## 5. Scene Map", ""]
+        yield "## 5. Scene Map"
+        yield ""
 
         for relpath, scene in sorted(self.tscn_files.items()):
-            lines.append(f"### `{relpath}`")
-            if scene.error:
-                lines.append(f"  ⚠️ Parse error: {scene.error}")
-                continue
-
-            lines.append(f"- **Root:** {scene.root_name} ({scene.root_type})")
-            if scene.script_path:
-                lines.append(f"- **Script:** `{scene.script_path}`")
-
-            # Node tree
-            tree_text = scene.get_node_tree_text()
-            if tree_text:
-                lines.append(f"\n```")
-                lines.append(tree_text)
-                lines.append("```")
-
-            # Connections
-            if scene.connections:
-                lines.append("\n**Signal Connections:**")
-                for conn in scene.connections:
-                    lines.append(f"- `{conn['from']}`.{conn['signal']} → `{conn['to']}`.{conn['method']}()")
+            yield from self._fragment("scene", relpath, "",
+                                      lambda: self._render_scene_entry(relpath, scene))
+
+    def _render_scene_entry(self, relpath: str, scene: TscnParser) -> list[str]:
+        lines = [f"### `{relpath}`"]
+        if scene.error:
+            lines.append(f"  ⚠️ Parse error: {scene.error}")
+            return lines
+
+        lines.append(f"- **Root:** {scene.root_name} ({scene.root_type})")
+        if scene.script_path:
+            lines.append(f"- **Script:** `{scene.script_path}`")
+
+        # Node tree
+        tree_text = scene.get_node_tree_text()
+        if tree_text:
+            lines.append(f"\n```")
+            lines.append(tree_text)
+            lines.append("```")
 
-            # External resources
-            non_script_res = [r for r in scene.ext_resources if r.get("type") not in ("Script", "GDScript", None)]
-            if non_script_res:
-                lines.append("\n**External Resources:**")
-                for res in non_script_res:
-                    lines.append(f"- [{res.get('type', '?')}] `{res.get('path', '?')}`")
+        # Connections
+        if scene.connections:
+            lines.append("\n**Signal Connections:**")
+            for conn in scene.connections:
+                lines.append(f"- `{conn['from']}`.{conn['signal']} → `{conn['to']}`.{conn['method']}()")
 
-            lines.append("")
+        # External resources
+        non_script_res = [r for r in scene.ext_resources if r.get("type") not in ("Script", "GDScript", None)]
+        if non_script_res:
+            lines.append("\n**External Resources:**")
+            for res in non_script_res:
+                lines.append(f"- [{res.get('type', '?')}] `{res.get('path', '?')}`")
 
-        return "\n".join(lines)
+        lines.append("")
+        return lines
 
-    def _section_scripts_detail(self) -> str:
+    def _section_scripts_detail(self) -> Iterator[str]:
         if not self.gd_files:
-            return ""
+            return
 
-        lines = ["## 6. Scripts Detail", ""]
+        yield "## 6. Scripts Detail"
+        yield ""
 
         for relpath, gd in sorted(self.gd_files.items()):
-            lines.append(f"### `{relpath}`")
-
-            if gd.error:
-                lines.append(f"⚠️ Parser error (used regex fallback): {gd.error[:100]}")
-
-            # Header info
-            header_parts = []
-            if gd.is_tool:
-                header_parts.append("🔧 @tool")
-            if gd.class_name:
-                header_parts.append(f"**class_name** `{gd.class_name}`")
-            if gd.extends:
-                header_parts.append(f"**extends** `{gd.extends}`")
-            if header_parts:
-                lines.append(" | ".join(header_parts))
-
-            # Enums
-            if gd.enums:
-                lines.append("\n**Enums:**")
-                for enum in gd.enums:
-                    name = enum['name'] or '(anonymous)'
-                    vals = ", ".join(enum.get('values', []))
-                    lines.append(f"- `{name}` {{ {vals} }}")
-
-            # Constants
-            if gd.constants:
-                lines.append("\n**Constants:**")
-                for const in gd.constants:
-                    val = f" = {const['value']}" if const.get('value') else ""
-                    lines.append(f"- `{const['name']}`{val}")
-
-            # Signals
-            if gd.signals:
-                lines.append("\n**Signals:**")
-                for sig in gd.signals:
-                    args_str = ", ".join(
-                        f"{a['name']}: {a['type']}" if a.get('type') else a['name']
-                        for a in sig.get('args', [])
-                    )
-                    lines.append(f"- `{sig['name']}({args_str})`")
-
-            # Exports
-            if gd.exports:
-                lines.append("\n**Exports:**")
-                for var in gd.exports:
-                    type_str = f": {var['type']}" if var.get('type') else ""
-                    default_str = f" = {var['default']}" if var.get('default') else ""
-                    lines.append(f"- `{var['name']}{type_str}{default_str}`")
-
-            # Onready vars
-            if gd.onready_vars:
-                lines.append("\n**@onready Variables:**")
-                for var in gd.onready_vars:
-                    type_str = f": {var['type']}" if var.get('type') else ""
-                    lines.append(f"- `{var['name']}{type_str}`")
-
-            # Regular variables
-            if gd.variables:
-                lines.append("\n**Variables:**")
-                for var in gd.variables:
-                    type_str = f": {var['type']}" if var.get('type') else ""
-                    default_str = f" = {var['default']}" if var.get('default') else ""
-                    lines.append(f"- `{var['name']}{type_str}{default_str}`")
-
-            # Functions
-            all_funcs = gd.functions + gd.static_functions
-            if all_funcs:
-                lines.append("\n**Functions:**")
-                lines.append("| Function | Arguments | Returns | Notes |")
-                lines.append("|----------|-----------|---------|-------|")
-                for func in all_funcs:
-                    args_str = ", ".join(
-                        f"{a['name']}: {a['type']}" if a.get('type') else a['name']
-                        for a in func.get('args', [])
-                    )
-                    ret = func.get('return_type') or "—"
-                    notes = []
-                    if func.get('is_static'):
-                        notes.append("static")
-                    name = func['name']
-                    if name.startswith("_"):
-                        notes.append("override/private")
-                    lines.append(f"| `{name}` | `({args_str})` | `{ret}` | {', '.join(notes)} |")
-
-            # Inner classes
-            if gd.inner_classes:
-                lines.append("\n**Inner Classes:**")
-                for ic in gd.inner_classes:
-                    ext = f" extends {ic['extends']}" if ic.get('extends') else ""
-                    lines.append(f"- `class {ic['name']}{ext}`")
-                    for fn in ic.get('functions', []):
-                        lines.append(f"  - func `{fn['name']}()`")
-
-            # Preloads / dependencies
-            if gd.preloads:
-                lines.append("\n**Dependencies (preload/load):**")
-                for p in gd.preloads:
-                    lines.append(f"- `{p}`")
-
-            lines.append("")
-
-        return "\n".join(lines)
-
-    def _section_signal_map(self) -> str:
-        """Global signal map across all scripts and scenes."""
-        all_signals = []
-
-        for relpath, gd in self.gd_files.items():
+            yield from self._fragment("script", relpath, "",
+                                      lambda: self._render_script_detail(relpath, gd))
+
+    def _render_script_detail(self, relpath: str, gd: GDScriptAnalyzer) -> list[str]:
+        lines = [f"### `{relpath}`"]
+
+        if gd.error:
+            lines.append(f"⚠️ Parser error (used outline fallback): {gd.error[:100]}")
+
+        # Header info
+        header_parts = []
+        if gd.is_tool:
+            header_parts.append("🔧 @tool")
+        if gd.class_name:
+            header_parts.append(f"**class_name** `{gd.class_name}`")
+        if gd.extends:
+            header_parts.append(f"**extends** `{gd.extends}`")
+        if header_parts:
+            lines.append(" | ".join(header_parts))
+
+        # Enums
+        if gd.enums:
+            lines.append("\n**Enums:**")
+            for enum in gd.enums:
+                name = enum['name'] or '(anonymous)'
+                vals = ", ".join(enum.get('values', []))
+                lines.append(f"- `{name}` {{ {vals} }}")
+
+        # Constants
+        if gd.constants:
+            lines.append("\n**Constants:**")
+            for const in gd.constants:
+                val = f" = {const['value']}" if const.get('value') else ""
+                lines.append(f"- `{const['name']}`{val}")
+
+        # Signals
+        if gd.signals:
+            lines.append("\n**Signals:**")
             for sig in gd.signals:
-                all_signals.append({"signal": sig['name'], "defined_in": relpath, "args": sig.get('args', [])})
+                args_str = ", ".join(
+                    f"{a['name']}: {a['type']}" if a.get('type') else a['name']
+                    for a in sig.get('args', [])
+                )
+                lines.append(f"- `{sig['name']}({args_str})`")
+
+        # Exports
+        if gd.exports:
+            lines.append("\n**Exports:**")
+            for var in gd.exports:
+                type_str = f": {var['type']}" if var.get('type') else ""
+                default_str = f" = {var['default']}" if var.get('default') else ""
+                lines.append(f"- `{var['name']}{type_str}{default_str}`")
+
+        # Onready vars
+        if gd.onready_vars:
+            lines.append("\n**@onready Variables:**")
+            for var in gd.onready_vars:
+                type_str = f": {var['type']}" if var.get('type') else ""
+                lines.append(f"- `{var['name']}{type_str}`")
+
+        # Regular variables
+        if gd.variables:
+            lines.append("\n**Variables:**")
+            for var in gd.variables:
+                type_str = f": {var['type']}" if var.get('type') else ""
+                default_str = f" = {var['default']}" if var.get('default') else ""
+                lines.append(f"- `{var['name']}{type_str}{default_str}`")
+
+        # Functions
+        all_funcs = gd.functions + gd.static_functions
+        if all_funcs:
+            lines.append("\n**Functions:**")
+            lines.append("| Function | Arguments | Returns | Notes |")
+            lines.append("|----------|-----------|---------|-------|")
+            for func in all_funcs:
+                args_str = ", ".join(
+                    f"{a['name']}: {a['type']}" if a.get('type') else a['name']
+                    for a in func.get('args', [])
+                )
+                ret = func.get('return_type') or "—"
+                notes = []
+                if func.get('is_static'):
+                    notes.append("static")
+                name = func['name']
+                if name.startswith("_"):
+                    notes.append("override/private")
+                lines.append(f"| `{name}` | `({args_str})` | `{ret}` | {', '.join(notes)} |")
+
+        # Inner classes
+        if gd.inner_classes:
+            lines.append("\n**Inner Classes:**")
+            for ic in gd.inner_classes:
+                ext = f" extends {ic['extends']}" if ic.get('extends') else ""
+                lines.append(f"- `class {ic['name']}{ext}`")
+                for fn in ic.get('functions', []):
+                    lines.append(f"  - func `{fn['name']}()`")
+
+        # Preloads / dependencies
+        if gd.preloads:
+            lines.append("\n**Dependencies (preload/load):**")
+            for p in gd.preloads:
+                lines.append(f"- `{p}`")
 
-        if not all_signals:
-            return ""
+        lines.append("")
+        return lines
 
-        lines = ["## 7. Global Signal Map", ""]
-        lines.append("| Signal | Defined In | Arguments | Connected In |")
-        lines.append("|--------|-----------|-----------|-------------|")
+    def _section_signal_map(self) -> Iterator[str]:
+        """Global signal map across all scripts and scenes."""
+        if not any(gd.signals for gd in self.gd_files.values()):
+            return
 
-        # Build connection map from scenes
-        signal_connections = defaultdict(list)
-        for scene_path, scene in self.tscn_files.items():
-            for conn in scene.connections:
-                signal_connections[conn['signal']].append(scene_path)
+        yield "## 7. Global Signal Map"
+        yield ""
+        yield "| Signal | Defined In | Arguments | Connected In | Handlers |"
+        yield "|--------|-----------|-----------|-------------|----------|"
 
-        for sig_info in sorted(all_signals, key=lambda x: x['signal']):
+        xref = self.xref
+        rows = []
+        for relpath, gd in self.gd_files.items():
+            if not gd.signals:
+                continue
+            # Rows also depend on which scenes and handlers connect to these signals
+            connected = ";".join(
+                f"{sig['name']}={xref.signal_scenes.get((relpath, sig['name']), [])}"
+                f"{xref.signal_targets.get((relpath, sig['name']), [])}" for sig in gd.signals
+            )
+            rows.extend(self._fragment("signals", relpath, connected,
+                                       lambda: self._render_signal_rows(relpath, gd, xref)))
+
+        for _, row in sorted(rows, key=lambda r: r[0]):
+            yield row
+
+    def _render_signal_rows(self, relpath: str, gd: GDScriptAnalyzer,
+                            xref: CrossReference) -> list[tuple[str, str]]:
+        """Return (signal name, table row) pairs for the signals a script defines."""
+        rows = []
+        for sig in gd.signals:
+            key = (relpath, sig['name'])
             args_str = ", ".join(
                 f"{a['name']}: {a['type']}" if a.get('type') else a['name']
-                for a in sig_info['args']
+                for a in sig.get('args', [])
             )
-            connected_in = ", ".join(f"`{s}`" for s in signal_connections.get(sig_info['signal'], [])) or "—"
-            lines.append(f"| `{sig_info['signal']}` | `{sig_info['defined_in']}` | `({args_str})` | {connected_in} |")
-
-        return "\n".join(lines)
-
-    def _section_resource_list(self) -> str:
+            connected_in = ", ".join(f"`{s}`" for s in xref.signal_scenes.get(key, [])) or "—"
+            handlers = ", ".join(
+                f"`{method}()`" if script is None else f"`{script}`.{method}()"
+                for script, method in xref.signal_targets.get(key, [])
+            ) or "—"
+            rows.append((sig['name'],
+                         f"| `{sig['name']}` | `{relpath}` | `({args_str})` | {connected_in} | {handlers} |"))
+        return rows
+
+    def _section_resource_list(self) -> Iterator[str]:
         if not self.tres_files:
-            return ""
+            return
 
-        lines = ["## 8. Resources (.tres)", ""]
-        lines.append("| File | Type | Script |")
-        lines.append("|------|------|--------|")
+        yield "## 8. Resources (.tres)"
+        yield ""
+        yield "| File | Type | Script |"
+        yield "|------|------|--------|"
 
         for relpath, tres in sorted(self.tres_files.items()):
             rtype = tres.resource_type or "?"
             script = f"`{tres.script_path}`" if tres.script_path else "—"
-            lines.append(f"| `{relpath}` | {rtype} | {script} |")
-
-        return "\n".join(lines)
+            yield f"| `{relpath}` | {rtype} | {script} |"
 
-    def _section_asset_summary(self) -> str:
+    def _section_asset_summary(self) -> Iterator[str]:
         # Gather non-code files
         asset_exts = {
             "Images": [".png", ".jpg", ".jpeg", ".webp", ".svg", ".bmp"],
@@ -1052,90 +3101,386 @@ class ArchitectureGenerator:
                 uncategorized.extend(files)
 
         if not categorized and not uncategorized:
-            return ""
+            return
 
-        lines = ["## 9. Asset Summary", ""]
+        yield "## 9. Asset Summary"
+        yield ""
 
         for category, files in sorted(categorized.items()):
             if files:
-                lines.append(f"**{category}** ({len(files)} files):")
+                yield f"**{category}** ({len(files)} files):"
                 # Show up to 20 then truncate
                 for f in sorted(files)[:20]:
-                    lines.append(f"- `{f}`")
+                    yield f"- `{f}`"
                 if len(files) > 20:
-                    lines.append(f"- ... and {len(files) - 20} more")
-                lines.append("")
+                    yield f"- ... and {len(files) - 20} more"
+                yield ""
 
         if uncategorized:
-            lines.append(f"**Other** ({len(uncategorized)} files):")
+            yield f"**Other** ({len(uncategorized)} files):"
             for f in sorted(uncategorized)[:15]:
-                lines.append(f"- `{f}`")
+                yield f"- `{f}`"
             if len(uncategorized) > 15:
-                lines.append(f"- ... and {len(uncategorized) - 15} more")
-
-        return "\n".join(lines)
+                yield f"- ... and {len(uncategorized) - 15} more"
 
-    def _section_dependency_graph(self) -> str:
+    def _section_dependency_graph(self) -> Iterator[str]:
         """Build a text-based dependency graph."""
-        lines = ["## 10. Dependency Graph", ""]
-        lines.append("```")
-        lines.append("(script) --preloads/extends--> (dependency)")
-        lines.append("")
+        yield "## 10. Dependency Graph"
+        yield ""
+        yield "```"
+        yield "(script) --preloads/extends--> (dependency)"
+        yield ""
 
+        xref = self.xref
         for relpath, gd in sorted(self.gd_files.items()):
-            deps = []
-            if gd.extends and gd.extends in self.class_name_map:
-                deps.append(f"extends {gd.extends} ({self.class_name_map[gd.extends]})")
-            for p in gd.preloads:
-                deps.append(f"loads {p}")
-
-            if deps:
-                lines.append(f"  {relpath}")
-                for dep in deps:
-                    lines.append(f"    └─→ {dep}")
-
-        lines.append("```")
-        return "\n".join(lines)
-
-    def _section_full_source(self) -> str:
+            # Edges also depend on where the extended class_name currently lives
+            base_path = xref.base_script(relpath) or ""
+            yield from self._fragment("deps", relpath, base_path,
+                                      lambda: self._render_dependency_edges(relpath, gd, base_path))
+
+        if self.tscn_files:
+            yield ""
+            yield "(scene) --instances/attaches--> (dependency)"
+            yield ""
+            graph = self.scene_graph
+            for relpath in sorted(self.tscn_files):
+                yield from self._fragment("scene_deps", relpath, "",
+                                          lambda: self._render_scene_edges(relpath, graph))
+
+        yield "```"
+
+    def _render_scene_edges(self, relpath: str, graph: SceneGraph) -> list[str]:
+        scene_res = res_path(relpath)
+        deps = [f"instances {target}" for target in graph.instances.get(scene_res, [])]
+        deps += [f"script {entry['script']} on {entry['node']}" for entry in graph.scripts.get(scene_res, [])]
+        if not deps:
+            return []
+        lines = [f"  {relpath}"]
+        for dep in deps:
+            lines.append(f"    └─→ {dep}")
+        return lines
+
+    def _render_dependency_edges(self, relpath: str, gd: GDScriptAnalyzer, base_path: str) -> list[str]:
+        deps = []
+        if base_path:
+            deps.append(f"extends {gd.extends} ({base_path})")
+        for p in gd.preloads:
+            deps.append(f"loads {p}")
+
+        if not deps:
+            return []
+        lines = [f"  {relpath}"]
+        for dep in deps:
+            lines.append(f"    └─→ {dep}")
+        return lines
+
+    def _section_full_source(self) -> Iterator[str]:
         """Optionally include full source code of all scripts."""
-        lines = ["## 📝 Full Source Code", ""]
-        lines.append("> Included with `--full-source` flag. Useful for complete AI context.")
-        lines.append("")
-
-        for relpath, gd in sorted(self.gd_files.items()):
-            lines.append(f"### `{relpath}`")
-            lines.append("```gdscript")
-            lines.append(gd.code)
-            lines.append("```")
-            lines.append("")
-
-        return "\n".join(lines)
-
-    def _footer(self) -> str:
+        yield "## 📝 Full Source Code"
+        yield ""
+        yield "> Included with `--full-source` flag. Useful for complete AI context."
+        if self.strip_source_comments:
+            yield "> Comments and blank lines are stripped (`--strip-comments`)."
+        duplicates, _ = self.source_dedup
+        if duplicates:
+            yield f"> {len(duplicates)} duplicate script(s) are referenced instead of repeated."
+        yield ""
+
+        for relpath in sorted(self.gd_files):
+            yield from self._render_full_source(relpath)
+
+    @property
+    def source_dedup(self) -> tuple[dict[str, tuple[str, bool]], dict[str, list[str]]]:
+        """Scripts whose code repeats an earlier script (in path order), for --full-source.
+
+        Returns (duplicate -> (first script, exact), first script -> duplicates).
+        Scripts are matched on the hash of their comment- and blank-line-free code,
+        so copies that only differ in comments are caught too; `exact` tells whether
+        the emitted text is identical as well.
+        """
+        if self._source_dedup is None:
+            duplicates, copies, seen = {}, defaultdict(list), {}
+            for relpath in sorted(self.gd_files):
+                code = self._read_source(relpath)
+                stripped = strip_comments(code)
+                key = hashlib.sha1(stripped.encode("utf-8")).hexdigest()
+                emitted = hashlib.sha1((stripped if self.strip_source_comments else code).encode("utf-8")).hexdigest()
+                if key in seen:
+                    first, first_emitted = seen[key]
+                    duplicates[relpath] = (first, emitted == first_emitted)
+                    copies[first].append(relpath)
+                else:
+                    seen[key] = (relpath, emitted)
+            self._source_dedup = (duplicates, dict(copies))
+        return self._source_dedup
+
+    def _render_full_source(self, relpath: str) -> list[str]:
+        duplicates, copies = self.source_dedup
+        if relpath in duplicates:
+            first, exact = duplicates[relpath]
+            note = f"Identical to `{first}`" if exact else f"Same code as `{first}` apart from comments and blank lines"
+            return [f"### `{relpath}`", f"_{note}, not repeated._", ""]
+
+        source = self._read_source(relpath)
+        if self.strip_source_comments:
+            source = strip_comments(source)
+        lines = [f"### `{relpath}`"]
+        if relpath in copies:
+            lines.append("_Also used as: " + ", ".join(f"`{p}`" for p in copies[relpath]) + "._")
+        lines += ["```gdscript", source, "```", ""]
+        return lines
+
+    def _footer(self) -> Iterator[str]:
         total_funcs = sum(len(gd.functions) + len(gd.static_functions) for gd in self.gd_files.values())
         total_signals = sum(len(gd.signals) for gd in self.gd_files.values())
         total_exports = sum(len(gd.exports) for gd in self.gd_files.values())
 
         parse_errors = sum(1 for gd in self.gd_files.values() if gd.error)
 
-        lines = ["---", ""]
-        lines.append("## Stats Summary")
-        lines.append("")
-        lines.append(f"| Metric | Count |")
-        lines.append(f"|--------|-------|")
-        lines.append(f"| Scripts | {len(self.gd_files)} |")
-        lines.append(f"| Scenes | {len(self.tscn_files)} |")
-        lines.append(f"| Resources | {len(self.tres_files)} |")
-        lines.append(f"| Registered Classes | {len(self.class_name_map)} |")
-        lines.append(f"| Total Functions | {total_funcs} |")
-        lines.append(f"| Total Signals | {total_signals} |")
-        lines.append(f"| Total Exports | {total_exports} |")
-        lines.append(f"| Autoloads | {len(self.project_config.autoloads) if self.project_config else 0} |")
+        yield "---"
+        yield ""
+        yield "## Stats Summary"
+        yield ""
+        yield f"| Metric | Count |"
+        yield f"|--------|-------|"
+        yield f"| Scripts | {len(self.gd_files)} |"
+        yield f"| Scenes | {len(self.tscn_files)} |"
+        yield f"| Resources | {len(self.tres_files)} |"
+        yield f"| Registered Classes | {len(self.class_name_map)} |"
+        yield f"| Total Functions | {total_funcs} |"
+        yield f"| Total Signals | {total_signals} |"
+        yield f"| Total Exports | {total_exports} |"
+        yield f"| Autoloads | {len(self.project_config.autoloads) if self.project_config else 0} |"
         if parse_errors:
-            lines.append(f"| ⚠️ Parse Errors | {parse_errors} |")
+            yield f"| ⚠️ Parse Errors | {parse_errors} |"
 
-        return "\n".join(lines)
+
+# ─────────────────────────────────────────────
+# Watch Mode
+# ─────────────────────────────────────────────
+
+class ChangeCollector:
+    """Collects changed project paths from file events until they settle.
+
+    Also usable as a watchdog event handler: the observer only calls dispatch().
+    """
+
+    def __init__(self, project_path: str, exclude_dirs: set[str], ignore: set[str]):
+        self.project_path = project_path
+        self.exclude_dirs = exclude_dirs
+        self.ignore = {os.path.abspath(p) for p in ignore}
+        self._ignore_dirs = tuple(p + os.sep for p in self.ignore)
+        self.changed: set[str] = set()
+        self.last_event = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, path: str):
+        path = os.path.abspath(path)
+        if path in self.ignore or path.startswith(self._ignore_dirs) or path.endswith(".tmp"):
+            return
+        relpath = os.path.relpath(path, self.project_path)
+        if relpath.startswith("..") or any(part in self.exclude_dirs for part in Path(relpath).parts[:-1]):
+            return
+        with self._lock:
+            self.changed.add(relpath)
+            self.last_event = time.monotonic()
+
+    def dispatch(self, event):
+        # Ignore opened/closed events: our own reads would trigger endless rebuilds
+        if event.is_directory or event.event_type not in ("created", "modified", "deleted", "moved"):
+            return
+        self.add(event.src_path)
+        if getattr(event, "dest_path", None):
+            self.add(event.dest_path)
+
+    def drain(self, debounce: float) -> set[str]:
+        """Return the collected paths once no event arrived for `debounce` seconds."""
+        with self._lock:
+            if not self.changed or time.monotonic() - self.last_event < debounce:
+                return set()
+            changed, self.changed = self.changed, set()
+            return changed
+
+
+def _snapshot(project_path: str, exclude_dirs: set[str]) -> dict[str, tuple[int, int]]:
+    snapshot = {}
+    for root, dirs, files in os.walk(project_path):
+        dirs[:] = [d for d in dirs if d not in exclude_dirs]
+        for filename in files:
+            filepath = os.path.join(root, filename)
+            try:
+                st = os.stat(filepath)
+            except OSError:
+                continue
+            snapshot[filepath] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+def _poll_changes(collector: ChangeCollector, interval: float, stop: threading.Event):
+    """Polling fallback when watchdog is not installed: compare mtime/size snapshots."""
+    previous = _snapshot(collector.project_path, collector.exclude_dirs)
+    while not stop.wait(interval):
+        current = _snapshot(collector.project_path, collector.exclude_dirs)
+        for filepath in previous.keys() | current.keys():
+            if previous.get(filepath) != current.get(filepath):
+                collector.add(filepath)
+        previous = current
+
+
+def watch_project(generator: "ArchitectureGenerator", emit, ignore: set[str],
+                  debounce: float = 0.5, poll_interval: float = 1.0):
+    """Keep the model in memory and call emit() after each settled batch of changes."""
+    collector = ChangeCollector(generator.project_path, generator.exclude_dirs, ignore)
+    stop = threading.Event()
+
+    try:
+        # optional: native file events (inotify / FSEvents / ReadDirectoryChangesW)
+        from watchdog.observers import Observer
+    except ImportError:
+        Observer = None
+
+    if Observer is not None:
+        observer = Observer()
+        observer.schedule(collector, generator.project_path, recursive=True)
+        observer.start()
+        print(f"\n👀 Watching {generator.project_path} (Ctrl+C to stop)")
+    else:
+        observer = None
+        threading.Thread(target=_poll_changes, args=(collector, poll_interval, stop), daemon=True).start()
+        print(f"\n👀 Watching {generator.project_path} by polling every {poll_interval}s "
+              f"(pip install watchdog for native events; Ctrl+C to stop)")
+
+    try:
+        while True:
+            time.sleep(0.1)
+            changed = collector.drain(debounce)
+            if not changed:
+                continue
+            start = time.perf_counter()
+            print(f"\n{len(changed)} file(s) changed: {', '.join(sorted(changed)[:5])}"
+                  + (" ..." if len(changed) > 5 else ""))
+            generator.refresh(changed)
+            emit()
+            print(f"   Regenerated in {time.perf_counter() - start:.2f}s")
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        stop.set()
+        if observer is not None:
+            observer.stop()
+            observer.join()
+
+
+# ─────────────────────────────────────────────
+# Impact Analysis (impact subcommand)
+# ─────────────────────────────────────────────
+
+def project_relpath(path: str, project_path: str) -> str:
+    """res://, absolute or cwd-relative path -> project-relative path."""
+    if path.startswith("res://"):
+        return rel_path(path)
+    if not os.path.isabs(path) and not os.path.exists(path):
+        return os.path.normpath(path)  # already project-relative (e.g. a deleted file)
+    return os.path.relpath(os.path.abspath(path), project_path)
+
+
+def impact_main(argv: list[str]):
+    argparser = argparse.ArgumentParser(
+        prog=f"{os.path.basename(sys.argv[0])} impact",
+        description="List the scripts and scenes transitively affected by a set of changed files.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python godot_architecture_generator.py impact objects/player/player.gd
+  python godot_architecture_generator.py impact --since HEAD~1 --format paths
+  python godot_architecture_generator.py impact res://scenes/game.tscn --index archi_index.json --format json
+        """
+    )
+    argparser.add_argument("files", nargs="*",
+                           help="Changed files (project-relative, absolute or res:// paths)")
+    argparser.add_argument("-p", "--project", default=".",
+                           help="Path to the Godot project root (default: current directory)")
+    argparser.add_argument("--since", default=None, metavar="REV",
+                           help="Also treat files changed since this git revision (and untracked files) as changed")
+    argparser.add_argument("--index", default=None, metavar="PATH",
+                           help="Use the reverse-dependency index of a previous --index run instead of scanning")
+    argparser.add_argument("--format", choices=("text", "json", "paths"), default="text",
+                           help="text (default), json, or paths: one affected file per line")
+    argparser.add_argument("--include-changed", action="store_true",
+                           help="With --format paths, also list the changed files themselves")
+    argparser.add_argument("--exclude", default=".godot,.git,__pycache__,.import",
+                           help="Comma-separated list of directories to exclude when scanning")
+    argparser.add_argument("--cache-dir", default=None,
+                           help="Directory for the parse cache (default: .godot/archi_cache in the project root)")
+    argparser.add_argument("--no-cache", action="store_true", help="Disable the on-disk parse cache")
+    argparser.add_argument("--outline-only", action="store_true",
+                           help="Scan GDScript with the outline scanner (enough for dependency edges)")
+    args = argparser.parse_args(argv)
+
+    project_path = os.path.abspath(args.project)
+    if not os.path.isdir(project_path):
+        print(f"ERROR: '{project_path}' is not a directory.")
+        sys.exit(1)
+
+    changed = [project_relpath(path, project_path) for path in args.files]
+    if args.since:
+        diff = git_output(["diff", "--name-only", "--no-renames", "--relative", args.since], project_path)
+        if diff is None:
+            print(f"ERROR: git diff against '{args.since}' failed.")
+            sys.exit(1)
+        untracked = git_output(["ls-files", "--others", "--exclude-standard"], project_path) or ""
+        changed += [os.path.normpath(p) for p in (diff + untracked).splitlines() if p]
+    changed = list(dict.fromkeys(changed))
+    if not changed:
+        if args.since:
+            print(f"No files changed since {args.since}.", file=sys.stderr)
+            return
+        print("ERROR: no changed files given (pass files or --since REV).")
+        sys.exit(1)
+
+    # Progress messages would pollute machine-readable output
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.index:
+            try:
+                dependents = load_index(args.index)["xref"]["dependents"]
+            except (OSError, ValueError, RuntimeError) as e:
+                print(f"ERROR: cannot read index: {e}")
+                sys.exit(1)
+        else:
+            if not args.outline_only and not has_module("gdtoolkit"):
+                print("ERROR: gdtoolkit is required (or use --outline-only, which does not need it).")
+                sys.exit(1)
+            cache_dir = None if args.no_cache else (args.cache_dir or os.path.join(project_path, ".godot", "archi_cache"))
+            generator = ArchitectureGenerator(project_path, [d.strip() for d in args.exclude.split(",")],
+                                              cache_dir=cache_dir, outline_only=args.outline_only)
+            generator.scan()
+            dependents = generator.xref.dependents
+
+    affected = transitive_dependents(dependents, changed)
+    order = sorted(affected, key=lambda path: (affected[path][2], walk_order_key(path)))
+
+    if args.format == "json":
+        json.dump({
+            "changed": changed,
+            "affected": [{"path": path, "kind": kind, "via": via, "depth": depth}
+                         for path in order for kind, via, depth in [affected[path]]],
+            "scripts": sorted(path for path in affected if path.endswith(".gd")),
+            "scenes": sorted(path for path in affected if path.endswith(".tscn")),
+        }, sys.stdout, indent=2)
+        print()
+    elif args.format == "paths":
+        for path in (changed if args.include_changed else []) + order:
+            print(path)
+    else:
+        print(f"Changed ({len(changed)}):")
+        for path in changed:
+            print(f"  {path}")
+        print(f"\nAffected ({len(affected)}):")
+        for path in order:
+            kind, via, depth = affected[path]
+            print(f"  {path}  ← {kind} {via}" + (f"  (depth {depth})" if depth > 1 else ""))
+        if not affected:
+            print("  (nothing depends on these files)")
 
 
 # ─────────────────────────────────────────────
@@ -1143,6 +3488,10 @@ class ArchitectureGenerator:
 # ─────────────────────────────────────────────
 
 def main():
+    if sys.argv[1:2] == ["impact"]:
+        impact_main(sys.argv[2:])
+        return
+
     argparser = argparse.ArgumentParser(
         description="Generate a comprehensive architecture document for a Godot project.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -1151,20 +3500,85 @@ Examples:
   python godot_architecture_generator.py /path/to/my_game
   python godot_architecture_generator.py . -o architecture.md
   python godot_architecture_generator.py . --full-source
+  python godot_architecture_generator.py . --full-source --strip-comments
   python godot_architecture_generator.py . --exclude addons,test
+  python godot_architecture_generator.py . --jobs 0
+  python godot_architecture_generator.py . --incremental
+  python godot_architecture_generator.py . -o - | less
+  python godot_architecture_generator.py . --max-tokens 32000 -o archi_context.md
+  python godot_architecture_generator.py . --shards documentation/archi --shard-by tokens
+  python godot_architecture_generator.py . --index archi_index.json
+  python godot_architecture_generator.py . --db archi.sqlite
+  python godot_architecture_generator.py . --watch
+  python godot_architecture_generator.py . --outline-only
+  python godot_architecture_generator.py . --profile --profile-out archi_profile.json
+  python godot_architecture_generator.py impact objects/player/player.gd   (see impact --help)
         """
     )
 
     argparser.add_argument("project_path", help="Path to the Godot project root (containing project.godot)")
     argparser.add_argument("-o", "--output", default=None,
-                           help="Output file path (default: PROJECT_ARCHITECTURE.md in project root)")
+                           help="Output file path, or - for stdout (default: PROJECT_ARCHITECTURE.md in project root)")
     argparser.add_argument("--full-source", action="store_true",
-                           help="Include full GDScript source code in the output")
+                           help="Include full GDScript source code in the output (duplicate scripts are referenced)")
+    argparser.add_argument("--strip-comments", action="store_true",
+                           help="Drop comments and blank lines from included source code "
+                                "(like repomix --compress --remove-comments)")
     argparser.add_argument("--exclude", default=".godot,.git,__pycache__,.import",
                            help="Comma-separated list of directories to exclude (default: .godot,.git,__pycache__,.import)")
+    argparser.add_argument("-j", "--jobs", type=int, default=1,
+                           help="Number of worker processes for file analysis (0 = one per CPU, default: 1)")
+    argparser.add_argument("--cache-dir", default=None,
+                           help="Directory for the parse cache (default: .godot/archi_cache in the project root)")
+    argparser.add_argument("--outline-only", action="store_true",
+                           help="Read GDScript declarations with the fast outline scanner instead of a full "
+                                "gdtoolkit parse (gdtoolkit is only used for files the scanner cannot read)")
+    argparser.add_argument("--no-cache", action="store_true",
+                           help="Disable the on-disk parse cache and re-analyze every file")
+    argparser.add_argument("--incremental", action="store_true",
+                           help="Only re-analyze files changed (git diff) since the last recorded run")
+    argparser.add_argument("--max-tokens", type=int, default=None, metavar="N",
+                           help="Write an LLM-ready summary of at most N tokens: autoloads, class registry, "
+                                "public API and signals first, then the most complex functions' source "
+                                "(counted with tiktoken when installed)")
+    argparser.add_argument("--shards", default=None, metavar="DIR",
+                           help="Write the document as shards plus index.md and shards.json into DIR "
+                                "instead of a single file (only changed shards are rewritten)")
+    argparser.add_argument("--shard-by", choices=("dir", "tokens"), default="dir",
+                           help="Shard per top-level directory (default) or by --shard-tokens budget")
+    argparser.add_argument("--shard-tokens", type=int, default=100_000, metavar="N",
+                           help="Approximate token budget per shard with --shard-by tokens (default: 100000)")
+    argparser.add_argument("--index", default=None, metavar="PATH",
+                           help="Also write a machine-readable index (JSON, or MessagePack for *.msgpack)")
+    argparser.add_argument("--db", default=None, metavar="PATH",
+                           help="Also load the analyzer output into an indexed SQLite database (updated incrementally)")
+    argparser.add_argument("--watch", action="store_true",
+                           help="Keep running and regenerate the outputs when project files change")
+    argparser.add_argument("--debounce", type=float, default=0.5,
+                           help="Seconds without file events before regenerating in --watch mode (default: 0.5)")
+    argparser.add_argument("--profile", action="store_true",
+                           help="Print wall time and peak memory per phase and section, and the slowest files")
+    argparser.add_argument("--profile-memory", action="store_true",
+                           help="With --profile, measure exact per-phase peak memory with tracemalloc "
+                                "(slows parsing down several times)")
+    argparser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                           help="Number of slowest files listed by --profile (default: 10)")
+    argparser.add_argument("--profile-out", default=None, metavar="PATH",
+                           help="Also dump the profile: Chrome trace for *.json, cProfile/pstats otherwise "
+                                "(implies --profile)")
 
     args = argparser.parse_args()
 
+    # With "-o -" the document goes to stdout, so progress messages move to stderr
+    to_stdout = args.output == "-"
+    doc_out = sys.stdout
+    if to_stdout and hasattr(doc_out, "reconfigure"):
+        doc_out.reconfigure(encoding="utf-8")
+    with contextlib.redirect_stdout(sys.stderr) if to_stdout else contextlib.nullcontext():
+        run(args, doc_out if to_stdout else None)
+
+
+def run(args: argparse.Namespace, doc_out: Optional[TextIO] = None):
     project_path = os.path.abspath(args.project_path)
 
     # Validate
@@ -1175,24 +3589,138 @@ Examples:
     if not os.path.isfile(os.path.join(project_path, "project.godot")):
         print(f"WARNING: No 'project.godot' found in '{project_path}'. Are you sure this is a Godot project root?")
 
+    if not args.outline_only and not has_module("gdtoolkit"):
+        print("ERROR: gdtoolkit is required. Install it with:")
+        print('  pip install "gdtoolkit==4.*"')
+        print("  (or use --outline-only, which does not need it)")
+        sys.exit(1)
+
+    if args.watch and args.output == "-":
+        print("ERROR: --watch cannot write to stdout, use -o FILE.")
+        sys.exit(1)
+
+    if args.index and args.index.lower().endswith(MSGPACK_EXTENSIONS) and not has_module("msgpack"):
+        print("ERROR: MessagePack index output needs msgpack. Install it with:")
+        print("  pip install msgpack")
+        sys.exit(1)
+
+    if args.shards and args.output == "-":
+        print("ERROR: --shards writes a directory, it cannot be combined with -o -.")
+        sys.exit(1)
+
+    if args.db:
+        try:
+            SymbolDatabase(args.db).close()
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+
+    if args.shard_tokens <= 0:
+        print("ERROR: --shard-tokens must be positive.")
+        sys.exit(1)
+
+    if args.max_tokens is not None and (args.max_tokens <= 0 or args.shards):
+        print("ERROR: --max-tokens needs a positive budget and cannot be combined with --shards.")
+        sys.exit(1)
+
     exclude_dirs = [d.strip() for d in args.exclude.split(",")]
     output_path = args.output or os.path.join(project_path, "PROJECT_ARCHITECTURE.md")
+    shard_dir = os.path.abspath(args.shards) if args.shards else None
+    cache_dir = None if args.no_cache else (args.cache_dir or os.path.join(project_path, ".godot", "archi_cache"))
+
+    profiler = None
+    if args.profile or args.profile_out or args.profile_memory:
+        profiler = Profiler(trace_memory=args.profile_memory,
+                            with_cprofile=bool(args.profile_out) and not args.profile_out.lower().endswith(".json"))
 
     # Run
     generator = ArchitectureGenerator(
         project_path=project_path,
         exclude_dirs=exclude_dirs,
-        include_full_source=args.full_source
+        include_full_source=args.full_source,
+        strip_source_comments=args.strip_comments,
+        jobs=args.jobs,
+        cache_dir=cache_dir,
+        outline_only=args.outline_only,
+        profiler=profiler
     )
-    generator.scan()
-
-    result = generator.generate()
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(result)
-
-    print(f"\n✅ Architecture file generated: {output_path}")
-    print(f"   Size: {len(result):,} characters / ~{len(result) // 4:,} tokens")
+    if args.incremental and generator.cache is None:
+        print("WARNING: --incremental needs the parse cache, running a full scan.")
+    with generator.phase("scan"):
+        if args.incremental and generator.cache is not None:
+            generator.scan_incremental()
+        else:
+            generator.scan()
+
+    def emit():
+        with generator.phase("render"):
+            if shard_dir:
+                shards = generator.write_shards(shard_dir, args.shard_by, args.shard_tokens)
+            elif args.max_tokens:
+                text, tokens = generator.generate_budgeted(args.max_tokens)
+                if doc_out is not None:
+                    doc_out.write(text)
+                else:
+                    with open(output_path + ".tmp", "w", encoding="utf-8") as f:
+                        f.write(text)
+                    os.replace(output_path + ".tmp", output_path)
+                written = len(text)
+            elif doc_out is not None:
+                written = generator.write(doc_out)
+            else:
+                # Stream into a temp file so a failed run never leaves a truncated document
+                tmp_path = output_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    written = generator.write(f)
+                os.replace(tmp_path, output_path)
+
+        with generator.phase("save state"):
+            generator.save_state()
+
+        if shard_dir:
+            largest = max(shards, key=lambda shard: shard["tokens"], default=None)
+            print(f"\n✅ Architecture shards generated: {shard_dir} ({len(shards)} shards + {generator.SHARD_INDEX})")
+            if largest:
+                print(f"   Largest shard: {largest['file']} ({largest['tokens']:,} tokens, "
+                      f"{generator.token_counter.name})")
+        else:
+            print(f"\n✅ Architecture file generated: {'<stdout>' if doc_out is not None else output_path}")
+            if args.max_tokens:
+                print(f"   Size: {written:,} characters / {tokens:,} of {args.max_tokens:,} tokens "
+                      f"({generator.token_counter.name})")
+            else:
+                print(f"   Size: {written:,} characters / ~{written // 4:,} tokens")
+
+        if args.index:
+            with generator.phase("index"):
+                write_index(generator.build_index(), args.index)
+            print(f"✅ Architecture index written: {args.index} ({os.path.getsize(args.index):,} bytes)")
+
+        if args.db:
+            with generator.phase("symbol database"):
+                db = SymbolDatabase(args.db)
+                try:
+                    updated, removed = db.sync(generator)
+                finally:
+                    db.close()
+            print(f"✅ Symbol database updated: {args.db} ({updated} file(s) updated, {removed} removed)")
+
+    emit()
+
+    if profiler is not None:
+        profiler.stop()
+        generator.profiler = None  # only the first run is profiled in --watch mode
+        profiler.report(args.profile_top)
+        if args.profile_out:
+            profiler.dump(args.profile_out)
+            print(f"✅ Profile written: {args.profile_out}")
+
+    if args.watch:
+        ignore = {shard_dir} if shard_dir else {output_path, output_path + ".tmp"}
+        ignore.update(p for p in (args.index, args.db) if p)
+        if args.db:
+            ignore.add(args.db + "-journal")
+        watch_project(generator, emit, ignore, debounce=args.debounce)
 
 
 if __name__ == "__main__":
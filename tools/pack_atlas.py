@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""Regroupe les vignettes de la timeline dans quelques pages d'atlas.
+   Sans atlas, timeline.gd charge une texture par marqueur pendant le
+   défilement ; avec, il ne charge qu'une poignée de pages et découpe chaque
+   vignette avec un AtlasTexture.
+
+   Pour chaque événement de data/timeline_data.json, la première photo (sa
+   version thumbs/ si tools/fix_photos.py l'a générée) est réduite à sa taille
+   d'affichage dans la timeline, puis placée dans les pages par un algorithme
+   MaxRects (meilleur ajustement du petit côté, plus grandes vignettes d'abord).
+
+   Sortie dans data/atlas/ : les pages timeline_atlas_<n>.jpg (.png si une
+   vignette de la page a de la transparence) et l'index timeline_atlas.json
+   (numéro d'événement → page + rectangle). L'index garde une empreinte des
+   sources : relancer sans changement ne réécrit rien.
+
+   Usage: python tools/pack_atlas.py
+          python tools/pack_atlas.py --page-size 4096
+          python tools/pack_atlas.py --padding 4 --force
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+try:
+    from PIL import Image
+except ImportError:
+    print("Installe Pillow : pip install Pillow")
+    sys.exit(1)
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+TIMELINE_JSON = os.path.join(PROJECT_DIR, "data", "timeline_data.json")
+ATLAS_DIR = os.path.join(PROJECT_DIR, "data", "atlas")
+ATLAS_NAME = "timeline_atlas"
+# À incrémenter si le format de l'index change (timeline.gd l'ignore alors)
+INDEX_VERSION = 1
+
+# Taille d'affichage des vignettes : mêmes règles que _add_vignette (timeline.gd)
+VIGNETTE_MAX_W = 400.0
+VIGNETTE_MAX_H = 300.0
+VIGNETTE_MAX_SCALE = 0.5
+
+
+# ─────────────────────────────────────────────
+# Sources
+# ─────────────────────────────────────────────
+
+def res_to_path(res_path: str, project_dir: str) -> str:
+    return os.path.join(project_dir, res_path[len("res://"):].replace("/", os.sep))
+
+
+def vignette_source(photo: str, project_dir: str) -> str:
+    """Chemin res:// réellement affiché par la timeline pour `photo` (vignette réduite si elle existe)."""
+    thumb = photo.replace("/photos/popup/", "/photos/thumbs/")
+    if thumb != photo and os.path.isfile(res_to_path(thumb, project_dir)):
+        return thumb
+    return photo
+
+
+def display_size(width: int, height: int) -> tuple[int, int]:
+    """Taille à l'écran d'une texture width×height dans _add_vignette.
+
+    Deux échelles candidates (hauteur max 300, largeur max 400, chacune
+    plafonnée à 50 %) : celle qui donne la plus grande aire l'emporte.
+    """
+    scale_by_h = min(VIGNETTE_MAX_H / height, VIGNETTE_MAX_SCALE)
+    scale_by_w = min(VIGNETTE_MAX_W / width, VIGNETTE_MAX_SCALE)
+    area_h = (width * scale_by_h) * (height * scale_by_h)
+    area_w = (width * scale_by_w) * (height * scale_by_w)
+    scale = scale_by_h if area_h >= area_w else scale_by_w
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def collect_vignettes(timeline_path: str, project_dir: str) -> list[dict]:
+    """Une entrée par événement ayant une photo lisible : index, photo du JSON, source, taille affichée."""
+    with open(timeline_path, "r", encoding="utf-8") as f:
+        events = json.load(f).get("events", [])
+
+    vignettes = []
+    for index, ev in enumerate(events):
+        photos = ev.get("photos", [])
+        if not photos:
+            continue
+        source = vignette_source(photos[0], project_dir)
+        path = res_to_path(source, project_dir)
+        if not os.path.isfile(path):
+            print(f"  ⚠ Photo introuvable pour l'événement {index} : {source}")
+            continue
+        try:
+            with Image.open(path) as img:
+                width, height = img.size
+        except OSError as e:
+            print(f"  ⚠ Impossible de lire {source}: {e}")
+            continue
+        st = os.stat(path)
+        vignettes.append({
+            "index": index,
+            "photo": photos[0],
+            "source": source,
+            "path": path,
+            "stat": [st.st_size, st.st_mtime_ns],
+            "size": display_size(width, height),
+        })
+    return vignettes
+
+
+# ─────────────────────────────────────────────
+# Placement MaxRects
+# ─────────────────────────────────────────────
+
+class MaxRectsPage:
+    """Une page carrée : liste des rectangles libres maximaux (qui peuvent se chevaucher).
+
+    Chaque placement découpe les rectangles libres qu'il recouvre en au plus
+    quatre morceaux, puis on retire ceux contenus dans un autre.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.free = [(0, 0, size, size)]
+
+    def find(self, width: int, height: int):
+        """Meilleur emplacement (x, y) : plus petit reste sur le petit côté, puis sur le grand."""
+        best, best_score = None, None
+        for fx, fy, fw, fh in self.free:
+            if width <= fw and height <= fh:
+                leftover_w, leftover_h = fw - width, fh - height
+                score = (min(leftover_w, leftover_h), max(leftover_w, leftover_h))
+                if best_score is None or score < best_score:
+                    best, best_score = (fx, fy), score
+        return best, best_score
+
+    def place(self, x: int, y: int, width: int, height: int):
+        split = []
+        for free in self.free:
+            fx, fy, fw, fh = free
+            if x >= fx + fw or x + width <= fx or y >= fy + fh or y + height <= fy:
+                split.append(free)
+                continue
+            if x > fx:
+                split.append((fx, fy, x - fx, fh))
+            if x + width < fx + fw:
+                split.append((x + width, fy, fx + fw - x - width, fh))
+            if y > fy:
+                split.append((fx, fy, fw, y - fy))
+            if y + height < fy + fh:
+                split.append((fx, y + height, fw, fy + fh - y - height))
+        self.free = [
+            r for i, r in enumerate(split)
+            if not any(j != i and contains(o, r) and (o != r or j < i) for j, o in enumerate(split))
+        ]
+
+
+def contains(outer: tuple, inner: tuple) -> bool:
+    ox, oy, ow, oh = outer
+    ix, iy, iw, ih = inner
+    return ox <= ix and oy <= iy and ix + iw <= ox + ow and iy + ih <= oy + oh
+
+
+def pack(sizes: list[tuple[int, int]], page_size: int, padding: int) -> list[tuple[int, int, int]]:
+    """Place chaque rectangle (avec `padding` pixels de marge) → [(page, x, y)] dans l'ordre d'entrée.
+
+    Les plus grands sont placés d'abord ; chacun va sur la page existante où
+    il s'ajuste le mieux, une nouvelle page n'est ouverte qu'en dernier recours.
+    """
+    pages: list[MaxRectsPage] = []
+    placements = [None] * len(sizes)
+    order = sorted(range(len(sizes)), key=lambda i: (max(sizes[i]), sizes[i][0] * sizes[i][1]), reverse=True)
+    for i in order:
+        width, height = sizes[i][0] + padding, sizes[i][1] + padding
+        if width > page_size or height > page_size:
+            raise ValueError(f"vignette {sizes[i][0]}×{sizes[i][1]} plus grande qu'une page de {page_size} px")
+        best = None
+        for page_index, page in enumerate(pages):
+            pos, score = page.find(width, height)
+            if pos and (best is None or score < best[2]):
+                best = (page_index, pos, score)
+        if best is None:
+            pages.append(MaxRectsPage(page_size))
+            best = (len(pages) - 1, (0, 0), None)
+        page_index, (x, y), _ = best
+        pages[page_index].place(x, y, width, height)
+        placements[i] = (page_index, x + padding // 2, y + padding // 2)
+    return placements
+
+
+# ─────────────────────────────────────────────
+# Écriture des pages et de l'index
+# ─────────────────────────────────────────────
+
+def signature(vignettes: list[dict], page_size: int, padding: int, quality: int) -> str:
+    data = [INDEX_VERSION, page_size, padding, quality,
+            [(v["index"], v["photo"], v["source"], v["stat"]) for v in vignettes]]
+    return hashlib.sha1(json.dumps(data).encode("utf-8")).hexdigest()
+
+
+def load_index(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if data.get("version") == INDEX_VERSION else {}
+
+
+def page_bounds(vignettes: list[dict], placements: list, page_index: int) -> tuple[int, int]:
+    """Page rognée à ce qu'elle contient (la dernière est souvent à moitié vide)."""
+    right = bottom = 1
+    for v, (page, x, y) in zip(vignettes, placements):
+        if page == page_index:
+            right = max(right, x + v["size"][0])
+            bottom = max(bottom, y + v["size"][1])
+    return right, bottom
+
+
+def write_atlas(vignettes: list[dict], placements: list, out_dir: str, project_dir: str,
+                quality: int, sig: str) -> dict:
+    page_count = max((p[0] for p in placements), default=-1) + 1
+    pages = [Image.new("RGBA", page_bounds(vignettes, placements, i)) for i in range(page_count)]
+    transparent = [False] * page_count
+
+    for v, (page, x, y) in zip(vignettes, placements):
+        with Image.open(v["path"]) as img:
+            if img.has_transparency_data:
+                scaled = img.convert("RGBA").resize(v["size"], Image.Resampling.LANCZOS)
+                transparent[page] |= scaled.getextrema()[3][0] < 255
+            else:
+                img.draft("RGB", v["size"])
+                scaled = img.convert("RGB").resize(v["size"], Image.Resampling.LANCZOS)
+        pages[page].paste(scaled, (x, y))
+
+    # Pages en JPEG, sauf celles contenant une vignette transparente (PNG pour garder l'alpha)
+    res_dir = "res://" + os.path.relpath(out_dir, project_dir).replace(os.sep, "/")
+    page_files = []
+    for i, page in enumerate(pages):
+        filename = f"{ATLAS_NAME}_{i}.{'png' if transparent[i] else 'jpg'}"
+        tmp_path = os.path.join(out_dir, filename + ".tmp")
+        if transparent[i]:
+            page.save(tmp_path, "PNG", optimize=True)
+        else:
+            page.convert("RGB").save(tmp_path, "JPEG", quality=quality, optimize=True)
+        os.replace(tmp_path, os.path.join(out_dir, filename))
+        page_files.append(filename)
+
+    # Pages d'un précédent passage devenues inutiles
+    for filename in os.listdir(out_dir):
+        if (filename.startswith(ATLAS_NAME + "_") and filename.endswith((".jpg", ".png"))
+                and filename not in page_files):
+            os.remove(os.path.join(out_dir, filename))
+
+    return {
+        "version": INDEX_VERSION,
+        "signature": sig,
+        "pages": [f"{res_dir}/{filename}" for filename in page_files],
+        "events": {
+            str(v["index"]): {
+                "page": page,
+                "rect": [x, y, v["size"][0], v["size"][1]],
+                "photo": v["photo"],
+            }
+            for v, (page, x, y) in zip(vignettes, placements)
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regroupe les vignettes de la timeline dans des pages d'atlas.")
+    parser.add_argument("--timeline", default=TIMELINE_JSON,
+                        help="JSON de la timeline (défaut : data/timeline_data.json)")
+    parser.add_argument("--out", default=ATLAS_DIR, help="Dossier de sortie (défaut : data/atlas)")
+    parser.add_argument("-p", "--project", default=PROJECT_DIR,
+                        help="Racine du projet Godot, pour les chemins res:// (défaut : racine du dépôt)")
+    parser.add_argument("--page-size", type=int, default=2048,
+                        help="Côté max d'une page en pixels (défaut : 2048, sûr sur mobile)")
+    parser.add_argument("--padding", type=int, default=2,
+                        help="Marge entre vignettes contre le débordement du filtrage (défaut : 2)")
+    parser.add_argument("--quality", type=int, default=90, help="Qualité JPEG des pages (défaut : 90)")
+    parser.add_argument("--force", action="store_true", help="Reconstruit l'atlas même si rien n'a changé")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.timeline):
+        print(f"ERROR: Timeline introuvable : {args.timeline}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    project_dir = os.path.abspath(args.project)
+    vignettes = collect_vignettes(args.timeline, project_dir)
+    if not vignettes:
+        print("Aucune photo à regrouper.")
+        return
+
+    os.makedirs(args.out, exist_ok=True)
+    index_path = os.path.join(args.out, ATLAS_NAME + ".json")
+    sig = signature(vignettes, args.page_size, args.padding, args.quality)
+    if not args.force and load_index(index_path).get("signature") == sig:
+        print(f"Atlas à jour : {len(vignettes)} vignette(s).")
+        return
+
+    try:
+        placements = pack([v["size"] for v in vignettes], args.page_size, args.padding)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    index = write_atlas(vignettes, placements, os.path.abspath(args.out), project_dir, args.quality, sig)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp_path, index_path)
+
+    used = sum(v["size"][0] * v["size"][1] for v in vignettes)
+    total = sum(w * h for w, h in (page_bounds(vignettes, placements, i) for i in range(len(index["pages"]))))
+    print(f"{len(vignettes)} vignette(s) dans {len(index['pages'])} page(s) "
+          f"({used / total:.0%} de remplissage) en {time.perf_counter() - start:.2f} s.")
+    print(f"Index : {os.path.relpath(index_path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,9 @@ while true; do
     echo "5) Générer repomix.txt"
     echo "6) Générer archi_file.md"
     echo "7) gited_files_list.py"
-    echo "8) Quitter"
+    echo "8) fix_photos.py"
+    echo "9) pack_atlas.py"
+    echo "10) Quitter"
     echo "--------------------------"
     read -p "Choisissez un numéro: " choice
 
@@ -47,13 +49,19 @@ while true; do
             echo "repomix_by_tools.md généré dans documentation/"
             ;;
         6)
-            python "$TOOLS_DIR/make_archi_file.py" --exclude .git,.godot,asset,documentation,localization,tools -o documentation/archi_file.md $PROJECT_PATH
+            python "$TOOLS_DIR/make_archi_file.py" --incremental --exclude .git,.godot,asset,documentation,localization,tools -o documentation/archi_file.md $PROJECT_PATH
             break
             ;;
         7)
             python "$TOOLS_DIR/gited_files_list.py"
             ;;
         8)
+            python "$TOOLS_DIR/fix_photos.py"
+            ;;
+        9)
+            python "$TOOLS_DIR/pack_atlas.py"
+            ;;
+        10)
             echo "Au revoir !"
             break
             ;;